@@ -0,0 +1,101 @@
+"""Check import time of synthreader against a budget.
+
+Every module is imported in a fresh interpreter, best of several runs, and
+checked against its time budget and the heavy dependencies it must not pull
+in. Exits with status 1 if any budget is exceeded.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --scale 2
+"""
+from typing import List, Dict, Optional, Any
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Module -> (import time budget in seconds, modules it must not import).
+IMPORT_BUDGETS = {
+    'synthreader': (0.1, ['nltk', 'xdl', 'numpy', 'synthreader.tagging']),
+    'synthreader.tagging': (0.5, ['nltk', 'xdl', 'lxml', 'networkx']),
+}
+
+# Code run in a fresh interpreter to time an import. Prints JSON of time taken
+# and forbidden modules that were imported.
+IMPORT_SCRIPT = '''
+import json, sys, time
+start_time = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start_time
+print(json.dumps({{
+    'time': duration,
+    'imported': [name for name in {forbidden!r} if name in sys.modules],
+}}))
+'''
+
+def time_import(module: str, forbidden: List[str]) -> Dict[str, Any]:
+    """Import module in a fresh interpreter and return time taken and which
+    of forbidden were imported.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [env['PYTHONPATH']] if env.get('PYTHONPATH') else [ROOT])
+    output = subprocess.check_output(
+        [sys.executable, '-c',
+         IMPORT_SCRIPT.format(module=module, forbidden=forbidden)],
+        cwd=ROOT, env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+def check_import_budgets(
+    repeat: int = 3, scale: float = 1.
+) -> Dict[str, Dict[str, Any]]:
+    """Time import of every module in IMPORT_BUDGETS and check it against its
+    budget.
+
+    Args:
+        repeat (int): Number of fresh imports of every module. Best time is
+            used.
+        scale (float): Multiplier applied to every time budget, for slow
+            machines.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Dict of {module: result}, where result has
+            keys 'time', 'budget', 'imported' and 'ok'.
+    """
+    results = {}
+    for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+        runs = [time_import(module, forbidden) for _ in range(repeat)]
+        best_time = min([run['time'] for run in runs])
+        imported = runs[0]['imported']
+        results[module] = {
+            'time': best_time,
+            'budget': budget * scale,
+            'imported': imported,
+            'ok': best_time <= budget * scale and not imported,
+        }
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='Fresh imports per module.')
+    parser.add_argument(
+        '--scale', type=float, default=1.,
+        help='Multiplier applied to every time budget.')
+    args = parser.parse_args(argv)
+
+    results = check_import_budgets(repeat=args.repeat, scale=args.scale)
+    for module, result in results.items():
+        status = 'ok' if result['ok'] else 'FAIL'
+        print(f'{module:24} {result["time"]:8.3f}s'
+              f' (budget {result["budget"]:.3f}s) {status}')
+        if result['imported']:
+            print(f'    imported {", ".join(result["imported"])}')
+    return 0 if all([result['ok'] for result in results.values()]) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
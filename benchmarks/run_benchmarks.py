@@ -0,0 +1,272 @@
+"""Benchmark the text to XDL pipeline on a fixed corpus.
+
+Measures throughput (procedures/s, tokens/s), latency percentiles of the
+tag_synthesis, extract_actions and action_list_to_xdl stages, overall and per
+corpus category, and peak memory. Results are written as JSON and can be
+compared against a saved baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py -o results.json
+    python benchmarks/run_benchmarks.py --compare baseline.json
+    python benchmarks/run_benchmarks.py --memory -o results.json
+"""
+from typing import List, Dict, Optional, Any
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from synthreader.tagging import tag_synthesis  # noqa: E402
+from synthreader.interpreting import extract_actions  # noqa: E402
+from synthreader.finishing import action_list_to_xdl  # noqa: E402
+
+CORPUS_FILE = os.path.join(HERE, 'corpus.jsonl')
+
+STAGES = ['tag', 'extract', 'xdl']
+
+PERCENTILES = [50, 90, 99]
+
+# Relative change in a metric that counts as a regression in compare mode.
+DEFAULT_THRESHOLD = 0.2
+
+def load_corpus(file_path: str = CORPUS_FILE) -> List[Dict[str, str]]:
+    """Load benchmark corpus of {'id', 'category', 'text'} dicts."""
+    with open(file_path, encoding='utf-8') as fileobj:
+        return [json.loads(line) for line in fileobj if line.strip()]
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return pct percentile of values, linearly interpolated."""
+    if not values:
+        return 0.
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Return mean, total and percentiles of latencies in seconds."""
+    summary = {
+        'n': len(values),
+        'mean': sum(values) / len(values) if values else 0.,
+        'total': sum(values),
+    }
+    for pct in PERCENTILES:
+        summary[f'p{pct}'] = percentile(values, pct)
+    return summary
+
+def run_procedure(text: str) -> Dict[str, Optional[float]]:
+    """Run procedure through pipeline, returning time of every stage reached.
+    Stages after a failing stage are None.
+    """
+    timings = {stage: None for stage in STAGES}
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            start_time = time.perf_counter()
+            sentences = tag_synthesis(text)
+            timings['tag'] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            action_list = extract_actions(sentences)
+            timings['extract'] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            action_list_to_xdl(action_list)
+            timings['xdl'] = time.perf_counter() - start_time
+        except Exception:
+            pass
+    return timings
+
+def measure_memory(corpus: List[Dict[str, str]]) -> Dict[str, int]:
+    """Return peak Python heap allocation in bytes of every stage, over all
+    procedures in corpus. Run separately from timing as tracing allocations
+    slows everything down.
+    """
+    peaks = {stage: 0 for stage in STAGES}
+    tracemalloc.start()
+    for item in corpus:
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                tracemalloc.reset_peak()
+                sentences = tag_synthesis(item['text'])
+                peaks['tag'] = max(
+                    peaks['tag'], tracemalloc.get_traced_memory()[1])
+
+                tracemalloc.reset_peak()
+                action_list = extract_actions(sentences)
+                peaks['extract'] = max(
+                    peaks['extract'], tracemalloc.get_traced_memory()[1])
+
+                tracemalloc.reset_peak()
+                action_list_to_xdl(action_list)
+                peaks['xdl'] = max(
+                    peaks['xdl'], tracemalloc.get_traced_memory()[1])
+            except Exception:
+                pass
+    tracemalloc.stop()
+    return peaks
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(
+    corpus: List[Dict[str, str]], repeat: int = 3, memory: bool = False
+) -> Dict[str, Any]:
+    """Run every procedure in corpus repeat times after one warm up pass and
+    return benchmark results.
+    """
+    for item in corpus:
+        run_procedure(item['text'])
+
+    latencies = {stage: [] for stage in STAGES}
+    category_latencies = {}
+    failures = {stage: 0 for stage in STAGES}
+    # Throughput only counts procedures that made it through every stage, so
+    # procedures failing early can't make the pipeline look faster.
+    total_time = 0.
+    n_procedures = 0
+    tokens = 0
+    for _ in range(repeat):
+        for item in corpus:
+            timings = run_procedure(item['text'])
+            category = category_latencies.setdefault(
+                item['category'], {stage: [] for stage in STAGES})
+            for stage in STAGES:
+                if timings[stage] is None:
+                    failures[stage] += 1
+                    break
+                latencies[stage].append(timings[stage])
+                category[stage].append(timings[stage])
+            else:
+                total_time += sum(timings.values())
+                n_procedures += 1
+                tokens += len(item['text'].split())
+
+    total_time = total_time or float('inf')
+    results = {
+        'meta': {
+            'commit': get_git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus_sha256': hashlib.sha256(json.dumps(
+                corpus, sort_keys=True).encode('utf-8')).hexdigest(),
+            'procedures': len(corpus),
+            'repeat': repeat,
+        },
+        'throughput': {
+            'procedures_per_s': n_procedures / total_time,
+            'tokens_per_s': tokens / total_time,
+        },
+        'stages': {
+            stage: summarize(latencies[stage]) for stage in STAGES},
+        'categories': {
+            category: {
+                stage: summarize(values[stage]) for stage in STAGES}
+            for category, values in sorted(category_latencies.items())
+        },
+        'failures': failures,
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS.
+        'peak_rss_kb': (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            // (1024 if sys.platform == 'darwin' else 1)),
+    }
+    if memory:
+        results['peak_heap_bytes'] = measure_memory(corpus)
+    return results
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """Compare results with baseline and return list of regressions, where a
+    latency grew or throughput fell by more than threshold, or more
+    procedures failed in any stage.
+    """
+    regressions = []
+    checks = [
+        (f'stages.{stage}.{metric}', ['stages', stage, metric], 1)
+        for stage in STAGES for metric in ['p50', 'p90']
+    ]
+    checks.extend([
+        (f'throughput.{metric}', ['throughput', metric], -1)
+        for metric in ['procedures_per_s', 'tokens_per_s']
+    ])
+    for name, path, direction in checks:
+        new, old = results, baseline
+        for key in path:
+            new, old = new.get(key, {}), old.get(key, {})
+        if not old or not isinstance(old, (int, float)):
+            continue
+        change = (new - old) / old
+        print(f'{name:32} {old:12.6g} -> {new:12.6g} ({change:+.1%})')
+        if change * direction > threshold:
+            regressions.append(name)
+    # Any procedure failing that didn't fail before is a regression, however
+    # fast the rest are.
+    for stage in STAGES:
+        new = results.get('failures', {}).get(stage, 0)
+        old = baseline.get('failures', {}).get(stage, 0)
+        print(f'{"failures." + stage:32} {old:12} -> {new:12}')
+        if new > old:
+            regressions.append(f'failures.{stage}')
+    if results['meta']['corpus_sha256'] != baseline['meta']['corpus_sha256']:
+        print('Warning: corpus differs from baseline corpus.')
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '-o', '--output', help='File to write JSON results to.')
+    parser.add_argument(
+        '--corpus', default=CORPUS_FILE, help='JSONL corpus to benchmark.')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='Passes over the corpus.')
+    parser.add_argument(
+        '--memory', action='store_true',
+        help='Also measure peak heap allocation of every stage.')
+    parser.add_argument(
+        '--compare', help='Baseline JSON results to compare against.')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Relative change counted as a regression in compare mode.')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('synthreader').setLevel(logging.CRITICAL)
+    results = run_benchmarks(
+        load_corpus(args.corpus), repeat=args.repeat, memory=args.memory)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fileobj:
+            json.dump(results, fileobj, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fileobj:
+            baseline = json.load(fileobj)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'Regressions: {", ".join(regressions)}')
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
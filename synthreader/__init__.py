@@ -1 +1,36 @@
-from .main import text_to_xdl
+"""Convert synthetic procedures to XDL.
+
+Public names are imported from their submodules on first access, so importing
+synthreader, or only a subsystem such as synthreader.tagging, doesn't load
+nltk, xdl and every pattern module up front.
+"""
+from typing import Any, List, TYPE_CHECKING
+import importlib
+
+if TYPE_CHECKING:
+    from .main import text_to_xdl
+    from .batch import text_to_xdl_many, iter_text_to_xdl, ConversionResult
+    from .result_cache import ResultCache
+    from .incremental import IncrementalConverter
+
+# Public name -> submodule it is imported from on first access.
+LAZY_IMPORTS = {
+    'text_to_xdl': '.main',
+    'text_to_xdl_many': '.batch',
+    'iter_text_to_xdl': '.batch',
+    'ConversionResult': '.batch',
+    'ResultCache': '.result_cache',
+    'IncrementalConverter': '.incremental',
+}
+
+__all__ = list(LAZY_IMPORTS)
+
+def __getattr__(name: str) -> Any:
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,412 @@
+from typing import List, Dict, Tuple, Iterable, Iterator, Union, Optional, Any
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import csv
+import io
+import json
+import os
+import time
+import logging
+
+from .tagging import tag_synthesis
+from .tagging.pos import get_default_pos_backend
+from .tagging.reagent_names.probabilistic_search import get_feature_table
+from .tagging.reagent_names.database_search import get_reagent_name_index
+from .interpreting import extract_actions
+from .finishing import action_list_to_xdl
+from .error_checking import get_errors
+from .result_cache import ResultCache, CachedResult
+from .logging import get_logger
+
+# Default number of procedures sent to a worker process at a time.
+DEFAULT_CHUNK_SIZE: int = 16
+
+# Procedure converted once by every worker so models, probability tables and
+# the step library are loaded before real work arrives.
+WARM_UP_TEXT: str = (
+    'To a solution of benzaldehyde (10.6 g, 0.1 mol) in ethanol (50 mL) was'
+    ' added sodium hydroxide (4.0 g) dropwise at 0 °C. The mixture was stirred'
+    ' for 2 h and filtered.'
+)
+
+class ConversionResult(object):
+    """Result of converting one procedure to XDL.
+
+    Args:
+        index (int): Position of procedure in batch.
+        xdl (str): XDL string. None if conversion failed.
+        xdl_json (Dict): XDL as JSON dict. None if conversion failed.
+        errors (Dict[str, List[str]]): Errors found in interpretation, from
+            error_checking.get_errors. None if extraction failed.
+        error (str): Error message if conversion failed, otherwise None.
+        timings (Dict[str, float]): Time in seconds taken by each stage,
+            keys 'tag', 'extract', 'xdl' and 'total'.
+        cached (bool): True if result was loaded from a ResultCache.
+    """
+    def __init__(
+        self,
+        index: int,
+        xdl: Optional[str] = None,
+        xdl_json: Optional[Dict] = None,
+        errors: Optional[Dict[str, List[str]]] = None,
+        error: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        cached: bool = False,
+    ):
+        self.index = index
+        self.xdl = xdl
+        self.xdl_json = xdl_json
+        self.errors = errors
+        self.error = error
+        self.timings = timings if timings is not None else {}
+        self.cached = cached
+
+    @property
+    def status(self) -> str:
+        return 'ok' if self.error is None else 'error'
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'index': self.index,
+            'status': self.status,
+            'xdl': self.xdl,
+            'xdl_json': self.xdl_json,
+            'errors': self.errors,
+            'error': self.error,
+            'timings': self.timings,
+            'cached': self.cached,
+        }
+
+    def __repr__(self) -> str:
+        return f'ConversionResult({self.index}, {self.status})'
+
+class InputError(object):
+    """Stands in for a procedure that couldn't be read from input, so that it
+    gets an error result at its position instead of stopping the batch.
+
+    Args:
+        error (str): Error message.
+    """
+    def __init__(self, error: str):
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f'InputError({self.error!r})'
+
+def convert_procedure(
+    synthesis_text: str,
+    index: int = 0,
+    result_cache: Optional[ResultCache] = None,
+) -> ConversionResult:
+    """Convert synthesis text to XDL, recording any error and the time
+    taken by each stage instead of raising. Anything printed along the way is
+    discarded.
+
+    Args:
+        synthesis_text (str): Description of synthetic procedure.
+        index (int): Position of procedure in batch.
+        result_cache (ResultCache): Cache to look up result in before
+            converting, and to store successful conversions in. Optional.
+
+    Returns:
+        ConversionResult: XDL string or error, with timings.
+    """
+    result = ConversionResult(index)
+    start_time = time.perf_counter()
+    if result_cache is not None:
+        try:
+            cached_result = result_cache.get(synthesis_text)
+        except Exception as e:
+            get_logger().warning(f'Result cache lookup failed: {e}')
+            cached_result = None
+        if cached_result is not None:
+            result.xdl = cached_result.xdl
+            result.xdl_json = cached_result.xdl_json
+            result.errors = cached_result.errors
+            result.cached = True
+            result.timings['total'] = time.perf_counter() - start_time
+            return result
+
+    stage = 'tag'
+    stage_start_time = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            labelled_text = tag_synthesis(synthesis_text)
+            stage_start_time = record_stage_time(
+                result, stage, stage_start_time)
+
+            stage = 'extract'
+            action_list = extract_actions(labelled_text)
+            result.errors = get_errors(labelled_text)
+            if result_cache is not None:
+                actions = CachedResult.dump_action_list(action_list)
+            stage_start_time = record_stage_time(
+                result, stage, stage_start_time)
+
+            stage = 'xdl'
+            xdl = action_list_to_xdl(action_list)
+            result.xdl = xdl.as_string()
+            result.xdl_json = xdl.as_json()
+            record_stage_time(result, stage, stage_start_time)
+    except Exception as e:
+        result.error = f'{stage}: {type(e).__name__}: {e}'
+
+    if result_cache is not None and result.error is None:
+        try:
+            result_cache.put(synthesis_text, CachedResult(
+                result.xdl, result.xdl_json, result.errors, actions))
+        except Exception as e:
+            get_logger().warning(f'Result cache store failed: {e}')
+    result.timings['total'] = time.perf_counter() - start_time
+    return result
+
+def record_stage_time(
+        result: ConversionResult, stage: str, stage_start_time: float) -> float:
+    """Record time taken by stage in result and return current time.
+
+    Args:
+        result (ConversionResult): Result to add timing to.
+        stage (str): Name of stage.
+        stage_start_time (float): Time stage started.
+
+    Returns:
+        float: Current time, i.e. start time of next stage.
+    """
+    current_time = time.perf_counter()
+    result.timings[stage] = current_time - stage_start_time
+    return current_time
+
+def warm_up() -> None:
+    """Load everything that is otherwise loaded lazily on first use (POS
+    tagger, reagent name probability tables and database, XDL step library),
+    so that the first procedure converted isn't slower than the rest.
+    """
+    get_default_pos_backend().tagger
+    get_feature_table()
+    get_reagent_name_index()
+    convert_procedure(WARM_UP_TEXT)
+
+#: Result cache of worker process, set by init_worker.
+WORKER_RESULT_CACHE = None
+
+def init_worker(result_cache: Optional[ResultCache] = None) -> None:
+    """Initializer for worker processes. Silences logging and warms up.
+
+    Args:
+        result_cache (ResultCache): Result cache for worker to use. Optional.
+    """
+    global WORKER_RESULT_CACHE
+    logging.getLogger('synthreader').setLevel(logging.CRITICAL)
+    WORKER_RESULT_CACHE = result_cache
+    warm_up()
+
+def convert_procedure_chunk(
+    indexed_texts: List[Tuple[int, Union[str, InputError]]],
+    result_cache: Optional[ResultCache] = None,
+) -> List[ConversionResult]:
+    """Convert chunk of (index, synthesis_text) tuples.
+
+    Args:
+        indexed_texts (List[Tuple[int, Union[str, InputError]]]): List of
+            (index, synthesis_text) tuples. InputErrors are given an error
+            result without converting anything.
+        result_cache (ResultCache): Result cache to use. Defaults to result
+            cache worker was initialised with.
+
+    Returns:
+        List[ConversionResult]: Results in same order as indexed_texts.
+    """
+    if result_cache is None:
+        result_cache = WORKER_RESULT_CACHE
+    return [
+        ConversionResult(index, error=text.error)
+        if isinstance(text, InputError)
+        else convert_procedure(text, index, result_cache)
+        for index, text in indexed_texts
+    ]
+
+def read_procedure_record(
+    record: Any, position: int, text_field: str = 'text', id_field: str = 'id'
+) -> Tuple[Any, Union[str, InputError]]:
+    """Return (procedure_id, text) of a procedure read from a JSONL object or
+    CSV row, with an InputError in place of text if it can't be read.
+
+    Args:
+        record (Any): Object or row read from input.
+        position (int): Position of procedure in input, used as id if record
+            has none or can't be read.
+        text_field (str): Key/column containing procedure text.
+        id_field (str): Key/column containing procedure id.
+
+    Returns:
+        Tuple[Any, Union[str, InputError]]: (procedure_id, text) tuple.
+    """
+    try:
+        text = record[text_field]
+        procedure_id = record.get(id_field, position)
+        if type(text) != str:
+            raise TypeError(f'{text_field!r} is not a string')
+    except (KeyError, TypeError, AttributeError) as e:
+        return position, InputError(f'input: {type(e).__name__}: {e}')
+    return procedure_id, text
+
+def iter_jsonl_procedures(
+    lines: Iterable[str], text_field: str = 'text', id_field: str = 'id'
+) -> Iterator[Tuple[Any, Union[str, InputError]]]:
+    """Yield (procedure_id, text) for every non blank line of JSONL input.
+
+    Lines can either be strings or objects with procedure text under
+    text_field. Lines that can't be read yield an InputError in place of text,
+    so that the error is reported at that position and the batch carries on.
+
+    Args:
+        lines (Iterable[str]): JSONL lines.
+        text_field (str): Key containing procedure text.
+        id_field (str): Key containing procedure id.
+
+    Returns:
+        Iterator[Tuple[Any, Union[str, InputError]]]: (procedure_id, text)
+            tuples. procedure_id is the position of the line among non blank
+            lines if it has no id.
+    """
+    position = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield position, InputError(f'input: {type(e).__name__}: {e}')
+        else:
+            if type(item) == str:
+                item = {text_field: item}
+            yield read_procedure_record(item, position, text_field, id_field)
+        position += 1
+
+def read_procedures(
+    file_path: str, text_field: str = 'text'
+) -> Iterator[Union[str, InputError]]:
+    """Read procedure texts from JSONL or CSV file.
+
+    JSONL lines can either be strings or objects with procedure text under
+    text_field. CSV files must have a header row with a text_field column.
+    Lines or rows that can't be read yield an InputError in place of text.
+
+    Args:
+        file_path (str): Path to .jsonl or .csv file.
+        text_field (str): Key/column containing procedure text.
+
+    Returns:
+        Iterator[Union[str, InputError]]: Procedure texts in file order.
+
+    Raises:
+        ValueError: If file extension is not .jsonl or .csv.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        with open(file_path, encoding='utf-8', newline='') as fileobj:
+            for position, row in enumerate(csv.DictReader(fileobj)):
+                yield read_procedure_record(row, position, text_field)[1]
+
+    elif extension in ['.jsonl', '.json']:
+        with open(file_path, encoding='utf-8') as fileobj:
+            for _, text in iter_jsonl_procedures(fileobj, text_field):
+                yield text
+
+    else:
+        raise ValueError(
+            f'Unsupported procedure file {file_path}. Use .jsonl or .csv.')
+
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of chunk_size items from items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_text_to_xdl(
+    procedures: Union[Iterable[str], str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    text_field: str = 'text',
+    result_cache: Optional[ResultCache] = None,
+) -> Iterator[ConversionResult]:
+    """Convert many procedures to XDL, yielding results in input order as they
+    become available. Procedures are sent to a pool of worker processes in
+    chunks. Failures, including procedures in a file that can't be read, are
+    recorded in the result for that procedure and don't stop the batch.
+
+    Args:
+        procedures (Union[Iterable[str], str]): Procedure texts, or path to
+            JSONL/CSV file of procedures.
+        workers (int): Number of worker processes. Defaults to number of CPUs.
+            If 1 procedures are converted in this process.
+        chunk_size (int): Number of procedures sent to a worker at a time.
+        text_field (str): Key/column containing procedure text if procedures
+            is a file path.
+        result_cache (ResultCache): Cache of previous results to skip
+            conversion of procedures already converted. Optional.
+
+    Returns:
+        Iterator[ConversionResult]: Conversion result for every procedure.
+    """
+    if type(procedures) == str:
+        procedures = read_procedures(procedures, text_field)
+    chunks = iter_chunks(enumerate(procedures), chunk_size)
+
+    if workers == 1:
+        warm_up()
+        for chunk in chunks:
+            yield from convert_procedure_chunk(chunk, result_cache)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(result_cache,),
+    ) as executor:
+        # Keep a bounded number of chunks in flight so huge inputs aren't all
+        # read into memory at once.
+        pending = []
+        for chunk in chunks:
+            pending.append(executor.submit(convert_procedure_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+def text_to_xdl_many(
+    procedures: Union[Iterable[str], str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    text_field: str = 'text',
+    result_cache: Optional[ResultCache] = None,
+) -> List[ConversionResult]:
+    """Convert many procedures to XDL using a pool of worker processes.
+    See iter_text_to_xdl.
+
+    Args:
+        procedures (Union[Iterable[str], str]): Procedure texts, or path to
+            JSONL/CSV file of procedures.
+        workers (int): Number of worker processes. Defaults to number of CPUs.
+            If 1 procedures are converted in this process.
+        chunk_size (int): Number of procedures sent to a worker at a time.
+        text_field (str): Key/column containing procedure text if procedures
+            is a file path.
+        result_cache (ResultCache): Cache of previous results to skip
+            conversion of procedures already converted. Optional.
+
+    Returns:
+        List[ConversionResult]: Conversion result for every procedure, in
+            input order.
+    """
+    return list(iter_text_to_xdl(
+        procedures, workers=workers, chunk_size=chunk_size,
+        text_field=text_field, result_cache=result_cache))
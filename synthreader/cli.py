@@ -0,0 +1,142 @@
+from typing import List, Optional, Iterator, TextIO, Deque, Union, Any
+from collections import deque
+import argparse
+import json
+import sys
+
+from .batch import (
+    iter_text_to_xdl, iter_jsonl_procedures, InputError, DEFAULT_CHUNK_SIZE)
+from .result_cache import ResultCache
+from .profiling import enable_profiling, disable_profiling
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='synthreader',
+        description='Convert synthetic procedures to XDL. Reads one JSON'
+                    ' object per line with an id and procedure text, and'
+                    ' writes one JSON line per result in the same order.'
+    )
+    parser.add_argument(
+        'input', nargs='?', default='-',
+        help='JSONL file of procedures. Reads stdin if not given or -.')
+    parser.add_argument(
+        '-o', '--output', default='-',
+        help='JSONL file to write results to. Writes stdout if not given or -.')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='Number of worker processes. Default 1.')
+    parser.add_argument(
+        '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+        help='Number of procedures sent to a worker at a time.')
+    parser.add_argument(
+        '--cache', default=None,
+        help='SQLite file to cache results in, so procedures already'
+             ' converted by this version of synthreader are skipped.')
+    parser.add_argument(
+        '--profile', default=None,
+        help='Save JSON report of time spent in each stage and pattern match'
+             ' counts to this file. Requires --jobs 1.')
+    parser.add_argument(
+        '--trace', default=None,
+        help='Save Chrome trace of pipeline stages to this file. Requires'
+             ' --jobs 1.')
+    parser.add_argument(
+        '--id-field', default='id', help='Key containing procedure id.')
+    parser.add_argument(
+        '--text-field', default='text', help='Key containing procedure text.')
+    return parser.parse_args(argv)
+
+def iter_procedures(
+    input_lines: Iterator[str],
+    ids: Deque[Any],
+    id_field: str = 'id',
+    text_field: str = 'text',
+) -> Iterator[Union[str, InputError]]:
+    """Yield procedure texts from JSONL lines, appending id to ids for every
+    text yielded. Lines that can't be read yield an InputError, which gets an
+    error result in step with the input.
+
+    Args:
+        input_lines (Iterator[str]): JSONL lines.
+        ids (Deque[Any]): Deque to append ids to.
+        id_field (str): Key containing procedure id.
+        text_field (str): Key containing procedure text.
+
+    Returns:
+        Iterator[Union[str, InputError]]: Procedure texts.
+    """
+    for procedure_id, text in iter_jsonl_procedures(
+            input_lines, text_field, id_field):
+        ids.append(procedure_id)
+        yield text
+
+def run(
+    input_lines: Iterator[str],
+    output: TextIO,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    id_field: str = 'id',
+    text_field: str = 'text',
+    result_cache: Optional[ResultCache] = None,
+) -> None:
+    """Convert procedures in JSONL input_lines and write JSONL results to
+    output as they complete. Only the procedures currently being converted
+    are held in memory, so input of any size can be streamed.
+
+    Args:
+        input_lines (Iterator[str]): JSONL lines of procedures.
+        output (TextIO): Stream to write JSONL results to.
+        jobs (int): Number of worker processes.
+        chunk_size (int): Number of procedures sent to a worker at a time.
+        id_field (str): Key containing procedure id.
+        text_field (str): Key containing procedure text.
+        result_cache (ResultCache): Cache of previous results. Optional.
+    """
+    ids = deque()
+    procedures = iter_procedures(input_lines, ids, id_field, text_field)
+    for result in iter_text_to_xdl(
+            procedures,
+            workers=jobs,
+            chunk_size=chunk_size,
+            result_cache=result_cache):
+        procedure_id = ids.popleft()
+        result_dict = result.as_dict()
+        del result_dict['index']
+        output.write(json.dumps({'id': procedure_id, **result_dict}) + '\n')
+        output.flush()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    profile = args.profile is not None or args.trace is not None
+    if profile and args.jobs != 1:
+        raise SystemExit('--profile and --trace require --jobs 1.')
+    input_file = (
+        sys.stdin if args.input == '-'
+        else open(args.input, encoding='utf-8'))
+    output_file = (
+        sys.stdout if args.output == '-'
+        else open(args.output, 'w', encoding='utf-8'))
+    if profile:
+        enable_profiling(trace=args.trace is not None)
+    try:
+        run(
+            input_file,
+            output_file,
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+            id_field=args.id_field,
+            text_field=args.text_field,
+            result_cache=(
+                ResultCache(args.cache) if args.cache is not None else None),
+        )
+    finally:
+        if profile:
+            profiler = disable_profiling()
+            if args.profile is not None:
+                profiler.save_report(args.profile)
+            if args.trace is not None:
+                profiler.save_chrome_trace(args.trace)
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
@@ -21,11 +21,13 @@ from .constants import (
 from .utils import get_reagent_temp
 from ..words import *
 from ..words.modifiers import *
+from ..profiling import profile_stage
 
 #############################
 ### SEPARATION SANITIZERS ###
 #############################
 
+@profile_stage
 def sanitize_actions(action_list: List[Action]) -> List[Action]:
     """Sanitize all actions in action list so they are ready for their
     respective action -> XDL converter.
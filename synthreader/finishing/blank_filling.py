@@ -28,7 +28,9 @@ from .constants import (
 )
 from ..constants import float_regex_pattern, REFLUX_PLACEHOLDER_TEMP
 from ..logging import get_logger
+from ..profiling import profile_stage
 
+@profile_stage
 def fill_in_blanks(xdl_obj: XDL) -> XDL:
     """Fill in unknown values in procedure using different methods.
 
@@ -84,6 +86,7 @@ def fill_in_missing_through_properties(xdl_obj: XDL) -> XDL:
     return xdl_obj
 
 
+@profile_stage
 def get_prepared_xdl_copy(xdl_obj: XDL) -> XDL:
     xdl_obj_copy = xdl_copy(xdl_obj)
     # Make sure there is no complication in making the fake graph and calling
@@ -19,10 +19,12 @@ from xdl.chemputerxdl.steps import (
     FilterThrough,
 )
 from xdl.steps.special_steps import Wait
+from ..profiling import profile_stage
 
 SYNONYM_CAS_DICT=dict()
 SYNONYM_CAS_DICT['Acetic acid']=64-19-7
 
+@profile_stage
 def tidyup(xdl_obj: XDL) -> XDL:
     """Tidy up any little bits in step list that don't make sense, e.g.
     duplicate StopStir steps.
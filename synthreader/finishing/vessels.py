@@ -13,6 +13,7 @@ from .constants import (
     TRANSFER_BEFORE_STEPS,
     FINAL_TRY_STEP_VESSEL_CHAINS
 )
+from ..profiling import profile_stage
 
 # Bug catcher
 for step, vessels in STEP_VESSEL_CHAINS.items():
@@ -460,6 +461,7 @@ def add_missing_transfer_steps(steps: List[Step], forced_vessels) -> List[Step]:
         steps.insert(pos, step)
     return steps
 
+@profile_stage
 def assign_vessels(
     steps: List[Step],
     forced_vessels: List[Tuple[Step, str]]
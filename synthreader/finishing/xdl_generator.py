@@ -17,6 +17,7 @@ from .tidyup import tidyup
 from ..words.action_words import *
 from ..words import VesselWord, AuxiliaryVerbWord
 from ..words.modifiers import TimeModifier
+from ..profiling import profile_stage
 
 #: Dict of { word_type: word_to_xdl_converter_function }
 RENDER_XDL_DICT: Dict[Word, Callable] = {
@@ -75,6 +76,7 @@ def action_to_xdl(
     else:
         return RENDER_XDL_DICT[type(action.action)](action)
 
+@profile_stage
 def combine_require_actions(action_list: List[Action]):
     for i in reversed(range(len(action_list))):
         action = action_list[i]
@@ -84,6 +86,7 @@ def combine_require_actions(action_list: List[Action]):
             action_list.pop(i)
     return action_list
 
+@profile_stage
 def postprocess_xdl_steps(
     xdl_steps: List[Step],
     step_action_map: Dict[int, Action]
@@ -106,6 +109,7 @@ def add_filter_anticlogging(xdl_steps: List[Step]):
                 xdl_steps[i - 1].anticlogging = True
     return xdl_steps
 
+@profile_stage
 def convert_wash_flask_steps(steps, step_action_map):
     """'The flask from which 2 is transferred is washed with CH2Cl2 (10 mL) to
     ensure that no product is left.' Should be Transfer, Add, Transfer instead
@@ -250,6 +254,7 @@ def convert_wash_solid_to_elution(xdl_steps):
         xdl_steps.pop(i)
     return xdl_steps
 
+@profile_stage
 def get_forced_vessels(xdl_steps):
     # Get forced vessels
     forced_vessels = []
@@ -294,6 +299,7 @@ def get_forced_vessels(xdl_steps):
     return forced_vessels
 
 
+@profile_stage
 def action_list_to_xdl(action_list: List[Action]) -> XDL:
     """Convert action list tot XDL object.
 
@@ -502,6 +508,7 @@ def add_dry_after_filter_wash(xdl_obj: XDL) -> XDL:
                     steps.insert(i + 1, Dry(vessel=steps[i].vessel))
     return xdl_obj
 
+@profile_stage
 def add_dry_after_filter_wash(xdl_obj: XDL) -> XDL:
     """If there is a sequence Filter, WashSolid, WashSolid... without a Dry step
     at the end, assume there should be a Dry step there and add one. There can
@@ -548,6 +555,7 @@ def add_dry_after_filter_wash(xdl_obj: XDL) -> XDL:
                     steps.insert(i + 1, Dry(vessel=steps[i].vessel))
     return xdl_obj
 
+@profile_stage
 def convert_solution_add_to_transfer(steps):
     """If something is dissolved then added to the main reaction mixture, the
     Add step should be replaced with a Transfer step.
@@ -579,6 +587,7 @@ def convert_solution_add_to_transfer(steps):
     for i, step in reversed(insertions):
         steps.insert(i, step)
 
+@profile_stage
 def get_hardware(steps):
     """Get hardware necessary for given steps."""
     components = []
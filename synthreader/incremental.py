@@ -0,0 +1,111 @@
+from typing import List, Dict, Optional, Any
+import copy
+import pickle
+
+from xdl import XDL
+
+from .tagging import tag_synthesis
+from .tagging.pos import PosTaggingBackend
+from .tagging.sentence_cache import SentenceCache
+from .interpreting.interpreter import (
+    interpret_sentences, collect_actions, refers_to_previous_sentences)
+from .finishing import action_list_to_xdl
+from .result_cache import CachedResult
+
+class IncrementalConverter(object):
+    """Converts successive versions of a procedure to XDL, reusing as much of
+    the previous conversion as possible, with output identical to text_to_xdl.
+
+    - Tagging: only sentences whose text or tagging context changed are
+      re-tagged, using a SentenceCache.
+    - Interpretation: sentences up to the first sentence whose tagged output
+      changed are reused from the previous run. Sentences after it are
+      interpreted again, unless one of them refers to previous sentences, in
+      which case everything is. Collecting and postprocessing the action list
+      always runs on the whole procedure, as it looks across sentences.
+    - Finishing: XDL is generated from the whole action list, as finishing
+      passes look at every action in the procedure. If the action list is
+      unchanged the previous XDL is reused.
+
+    Args:
+        pos_backend (PosTaggingBackend): Backend to tokenize and POS tag text
+            with. If not given default NLTK backend is used.
+        sentence_cache (SentenceCache): Cache of tagged sentences. If not given
+            a new one is created.
+    """
+    def __init__(
+        self,
+        pos_backend: Optional[PosTaggingBackend] = None,
+        sentence_cache: Optional[SentenceCache] = None,
+    ):
+        self.pos_backend = pos_backend
+        self.sentence_cache = (
+            sentence_cache if sentence_cache is not None else SentenceCache())
+        #: Pickled tagged sentences of previous run.
+        self.tagged: List[bytes] = []
+        #: Pickled interpreted sentences of previous run.
+        self.interpreted: Optional[bytes] = None
+        #: Pickled action list of previous run.
+        self.actions: Optional[bytes] = None
+        #: XDL generated by previous run.
+        self.xdl: Optional[XDL] = None
+        #: What was reused by the last call of convert.
+        self.last_stats: Dict[str, Any] = {}
+
+    def convert(self, synthesis_text: str) -> XDL:
+        """Convert synthesis text to XDL, reusing the previous conversion
+        where it is unaffected by changes to the text.
+
+        Args:
+            synthesis_text (str): Description of synthetic procedure.
+
+        Returns:
+            XDL: XDL object of synthesis text interpretation.
+        """
+        misses = self.sentence_cache.misses
+        sentences = tag_synthesis(
+            synthesis_text, self.pos_backend, self.sentence_cache)
+        tagged = [
+            pickle.dumps(sentence, pickle.HIGHEST_PROTOCOL)
+            for sentence in sentences
+        ]
+
+        n_reused = 0
+        while (n_reused < min(len(tagged), len(self.tagged))
+               and tagged[n_reused] == self.tagged[n_reused]):
+            n_reused += 1
+        if any([refers_to_previous_sentences(sentence)
+                for sentence in sentences[n_reused:]]):
+            n_reused = 0
+
+        action_sentences = []
+        if n_reused:
+            action_sentences = pickle.loads(self.interpreted)[:n_reused]
+        action_sentences.extend(interpret_sentences(sentences[n_reused:]))
+        # Stored before collect_actions, which modifies Actions in sentences.
+        interpreted = pickle.dumps(action_sentences, pickle.HIGHEST_PROTOCOL)
+        action_list = collect_actions(action_sentences)
+        actions = CachedResult.dump_action_list(action_list)
+
+        reused_xdl = self.xdl is not None and actions == self.actions
+        if not reused_xdl:
+            self.xdl = action_list_to_xdl(action_list)
+
+        self.tagged = tagged
+        self.interpreted = interpreted
+        self.actions = actions
+        self.last_stats = {
+            'sentences': len(sentences),
+            'retagged_sentences': self.sentence_cache.misses - misses,
+            'reused_sentences': n_reused,
+            'reused_xdl': reused_xdl,
+        }
+        return copy.deepcopy(self.xdl)
+
+    def reset(self) -> None:
+        """Forget previous conversion. Cached tagged sentences are kept."""
+        self.tagged = []
+        self.interpreted = None
+        self.actions = None
+        self.xdl = None
+        self.last_stats = {}
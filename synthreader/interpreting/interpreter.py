@@ -1,6 +1,7 @@
 import copy
 from typing import List
 import re
+import functools
 from ..logging import get_logger
 from .constants import (
     MODIFIER_SEARCH_CONTINUE_WORDS,
@@ -50,8 +51,36 @@ from ..words.modifiers import (
     MethodModifier,
     AdditionModifier,
 )
-from ..utils import apply_pattern
+from ..utils import compile_patterns
+from ..profiling import profile_stage
 
+def make_actions(
+    subject_indexes: List[int], action_indexes: List[int], words: List[Word]
+) -> List[Action]:
+    """Make Action objects from words matching an extract action pattern.
+
+    Args:
+        subject_indexes (List[int]): Index in words of subject of each action.
+        action_indexes (List[int]): Index in words of each action.
+        words (List[Word]): Words matching extract action pattern.
+
+    Returns:
+        List[Action]: Action for every action index.
+    """
+    return [
+        Action(subject=words[subject_indexes[pos]],
+               action=words[i],
+               words=words,
+               action_order_pos=pos,)
+        for pos, i in enumerate(action_indexes)
+    ]
+
+EXTRACT_ACTION_PATTERN_SET = compile_patterns([
+    (pattern, functools.partial(make_actions, subject_indexes, action_indexes))
+    for pattern, subject_indexes, action_indexes in EXTRACT_ACTION_PATTERNS
+])
+
+@profile_stage
 def combine_actions_and_modifiers(
         sentences: List[List[Word]]) -> List[List[Word]]:
     """
@@ -167,6 +196,7 @@ def combine_actions_and_modifiers(
             j += 1
     return sentences
 
+@profile_stage
 def combine_actions_and_modifiers_backwards(
         sentences: List[List[Word]]) -> List[List[Word]]:
     """Combine actions and modifiers in sentences like
@@ -221,6 +251,7 @@ def combine_actions_and_modifiers_backwards(
             j += 1
     return sentences
 
+@profile_stage
 def fill_in_modifier_blanks(sentences: List[List[Word]]) -> List[List[Word]]:
     """If modifiers refer to something else in sentence, find this item in the
     sentence and update the modifier attributes accordingly.
@@ -267,6 +298,7 @@ def fill_in_modifier_blanks(sentences: List[List[Word]]) -> List[List[Word]]:
                         look_back_word_i = len(sentences[look_back_sent_i])
     return sentences
 
+@profile_stage
 def grab_unbound_modifiers(sentences: List[List[Word]]) -> List[List[Word]]:
     """Grab modifiers that have been missed in previous modifier combining.
     This is very vague as the modifiers are just looked for anywhere in the
@@ -373,6 +405,7 @@ def reagents_grab_unbound_quantities(
                         k -= 1
     return sentences
 
+@profile_stage
 def remove_meaningless_words(sentences: List[List[Word]]) -> List[List[Word]]:
     """Remove meaningless words that don't really add any meaning and makes
     patterns harder to match i.e. 'was then rinsed' -> 'was rinsed'.
@@ -390,11 +423,14 @@ def remove_meaningless_words(sentences: List[List[Word]]) -> List[List[Word]]:
         j = len(sentence) - 1
         while j >= 0:
             word = sentences[i][j]
+            # str of compound words is built from all child words, so only
+            # build it once rather than once per meaningless word.
+            word_str = str(word)
             for meaningless_word in MEANINGLESS_WORDS:
                 # Meaningless word is more than one words e.g.
                 # 'which precipitated'
                 if type(meaningless_word) == list:
-                    if str(word) == meaningless_word[0]:
+                    if word_str == meaningless_word[0]:
                         match = True
                         for k in range(len(meaningless_word)):
                             if (not (j + k < len(sentence)
@@ -409,12 +445,12 @@ def remove_meaningless_words(sentences: List[List[Word]]) -> List[List[Word]]:
 
                 # Meaningless word is single word
                 else:
-                    if str(word) == meaningless_word:
+                    if word_str == meaningless_word:
                         sentences[i].pop(j)
                         break
 
                     # 'continued stirring' -> 'stirring'
-                    elif (str(word) == 'continued'
+                    elif (word_str == 'continued'
                           and j + 1 < len(sentence)
                           and isinstance(sentence[j + 1], ActionWord)):
                         sentences[i].pop(j)
@@ -423,6 +459,7 @@ def remove_meaningless_words(sentences: List[List[Word]]) -> List[List[Word]]:
         i -= 1
     return sentences
 
+@profile_stage
 def prioritise_competing_temperature_modifiers(
         sentences: List[List[Word]]) -> List[List[Word]]:
     """If something is heated to 'to 150C using an oil bath', the 150C exact
@@ -468,6 +505,7 @@ def prioritise_competing_temperature_modifiers(
 
     return sentences
 
+@profile_stage
 def ignore_details(sentences: List[List[Word]]) -> List[List[Word]]:
     """Remove all DetailsModifiers so they don't mess up the action list pattern
     matching.
@@ -484,6 +522,7 @@ def ignore_details(sentences: List[List[Word]]) -> List[List[Word]]:
                 sentence.pop(j)
     return sentences
 
+@profile_stage
 def split_reagent_groups(sentences: List[List[Word]]) -> List[List[Word]]:
     """Split ReagentGroupWords if it looks like each half of reagent group word
     belongs to a different verb.
@@ -537,6 +576,7 @@ def split_reagent_groups(sentences: List[List[Word]]) -> List[List[Word]]:
             j += 1
     return sentences
 
+@profile_stage
 def pop_adverbs(sentences: List[List[Word]]) -> List[List[Word]]:
     """Convert 'slowly acidified' to 'acidified' to simplify things. If word
     before verb is a recognised modifier then add it to actions modifier list.
@@ -586,6 +626,7 @@ def preprocess_tagged_sentences(
     split_reagent_groups(sentences)
     return sentences
 
+@profile_stage
 def postprocess_action_list(action_list: List[Action]) -> List[Action]:
     action_list = grab_modifiers_from_previous_actions(action_list)
     action_list = [action for action in action_list if type(
@@ -736,6 +777,7 @@ def order_duplicate_additions(action_list):
     return action_list
 
 
+@profile_stage
 def extract_actions(sentences: List[List[Word]]) -> List[Action]:
     """Convert sentences into list of Actions.
 
@@ -745,25 +787,51 @@ def extract_actions(sentences: List[List[Word]]) -> List[Action]:
     Returns:
         List[Action]: List of actions extracted from sentences.
     """
-    logger = get_logger()
+    return collect_actions(interpret_sentences(sentences))
+
+def interpret_sentences(sentences: List[List[Word]]) -> List[List[Word]]:
+    """Prepare tagged sentences and convert Action patterns in them into Action
+    objects. Every sentence is interpreted on its own, apart from sentences
+    where refers_to_previous_sentences is True, which also depend on the
+    sentences before them.
+
+    Args:
+        sentences (List[List[Word]]): Tagged sentences.
+
+    Returns:
+        List[List[Word]]: Sentences containing Action objects.
+    """
     preprocess_tagged_sentences(sentences)
+    EXTRACT_ACTION_PATTERN_SET.apply(sentences)
+    return sentences
+
+def refers_to_previous_sentences(sentence: List[Word]) -> bool:
+    """Return True if interpreting tagged sentence depends on the sentences
+    before it, i.e. it has an 'at this temperature' modifier that
+    fill_in_modifier_blanks looks back for.
+
+    Args:
+        sentence (List[Word]): Tagged sentence.
+
+    Returns:
+        bool: True if sentence can't be interpreted on its own.
+    """
+    return any([type(word) == TemperatureModifier
+                and str(word) == 'at this temperature'
+                for word in sentence])
 
-    action_sentences = sentences
-    # Convert Action patterns into Action objects.
-    for pattern, subject_indexes, action_indexes in EXTRACT_ACTION_PATTERNS:
-        apply_pattern(
-            pattern,
-            lambda words: [
-                Action(subject=words[subject_indexes[pos]],
-                       action=words[i],
-                       words=words,
-                       action_order_pos=pos,)
-                for pos, i in enumerate(action_indexes)
-            ],
-            action_sentences
-        )
-
-    # Pull Action objects out of sentences in order and append to action_list.
+def collect_actions(action_sentences: List[List[Word]]) -> List[Action]:
+    """Pull Action objects out of interpreted sentences in order and
+    postprocess them into the final action list.
+
+    Args:
+        action_sentences (List[List[Word]]): Sentences returned by
+            interpret_sentences.
+
+    Returns:
+        List[Action]: List of actions extracted from sentences.
+    """
+    logger = get_logger()
     action_list = []
     for sentence in action_sentences:
         for i, word in enumerate(sentence):
@@ -1,30 +1,58 @@
 from typing import Optional
+from concurrent.futures import Executor
 import logging
 from .tagging import tag_synthesis
 from .interpreting import extract_actions
 from .finishing import action_list_to_xdl #有一个chempiler下不下来
 from .logging import get_logger
+from .error_checking import get_errors
+from .result_cache import ResultCache, CachedResult
 
-def text_to_xdl(synthesis_text: str, save_file: Optional[str] = None) -> str:
+def text_to_xdl(
+    synthesis_text: str,
+    save_file: Optional[str] = None,
+    result_cache: Optional[ResultCache] = None,
+    executor: Optional[Executor] = None,
+) -> str:
     """Convert synthesis text to XDL file of procedure described.
 
     Args:
         synthesis_text (str): Description of synthetic procedure.
         save_file (str): File path to save XDL to. Optional.
+        result_cache (ResultCache): Cache of previous results. If the action
+            list for synthesis_text is cached, tagging and action extraction
+            are skipped. Optional.
+        executor (Executor): If given, shards of sentences of long procedures
+            are tagged in parallel with this executor. Optional.
 
     Returns:
         str: Raw XDL str of synthesis text interpretation.
     """
     logger = get_logger()
     logger.setLevel(logging.INFO)
-    logger.info('Tagging entities in text...')
-    labelled_text = tag_synthesis(synthesis_text)
-    print(labelled_text)
-    logger.info('Extracting actions from tagged text...')
-    action_list = extract_actions(labelled_text)
-    print(action_list)
+    cached_result = None
+    if result_cache is not None:
+        cached_result = result_cache.get(synthesis_text)
+
+    if cached_result is not None and cached_result.actions is not None:
+        logger.info('Loading actions from result cache...')
+        action_list = cached_result.load_action_list()
+    else:
+        logger.info('Tagging entities in text...')
+        labelled_text = tag_synthesis(synthesis_text, executor=executor)
+        print(labelled_text)
+        logger.info('Extracting actions from tagged text...')
+        action_list = extract_actions(labelled_text)
+        print(action_list)
+        if result_cache is not None:
+            errors = get_errors(labelled_text)
+            actions = CachedResult.dump_action_list(action_list)
+
     logger.info('Converting actions to XDL...')
     xdl = action_list_to_xdl(action_list)
+    if result_cache is not None and cached_result is None:
+        result_cache.put(synthesis_text, CachedResult(
+            xdl.as_string(), xdl.as_json(), errors, actions))
     if save_file:
         xdl.save(save_file)
         logger.info(f'Saved to {save_file}')
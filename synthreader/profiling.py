@@ -0,0 +1,251 @@
+from typing import List, Dict, Callable, Optional, Any
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+
+class StageStats(object):
+    """Totals for every call of a named pipeline stage.
+
+    Args:
+        name (str): Name of stage.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.time = 0.
+        self.words_in = 0
+        self.words_out = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'time': self.time,
+            'mean_time': self.time / self.calls if self.calls else 0.,
+            'words_in': self.words_in,
+            'words_out': self.words_out,
+        }
+
+class Profiler(object):
+    """Records wall time, call count and words in/out of every stage decorated
+    with profile_stage, and the number of matches of every pattern applied
+    with apply_pattern or a PatternSet, while it is enabled.
+
+    Args:
+        trace (bool): If True, keep an event for every stage call so a Chrome
+            trace can be exported.
+    """
+    def __init__(self, trace: bool = True):
+        self.trace = trace
+        self.stages: Dict[str, StageStats] = {}
+        self.pattern_matches: Dict[str, int] = {}
+        self.trace_events: List[Dict[str, Any]] = []
+        self.start_time = time.perf_counter()
+
+    def record_stage(
+        self,
+        name: str,
+        start_time: float,
+        duration: float,
+        words_in: Optional[int] = None,
+        words_out: Optional[int] = None,
+    ) -> None:
+        """Record call of stage.
+
+        Args:
+            name (str): Name of stage.
+            start_time (float): perf_counter time stage started.
+            duration (float): Time in seconds stage took.
+            words_in (int): Number of words passed to stage.
+            words_out (int): Number of words after stage.
+        """
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        stats.calls += 1
+        stats.time += duration
+        stats.words_in += words_in or 0
+        stats.words_out += words_out or 0
+        if self.trace:
+            self.trace_events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': (start_time - self.start_time) * 1e6,
+                'dur': duration * 1e6,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': {'words_in': words_in, 'words_out': words_out},
+            })
+
+    def count_pattern_match(self, pattern: List[Any], word_class: Any) -> None:
+        """Count match of pattern.
+
+        Args:
+            pattern (List[Any]): Pattern that matched.
+            word_class (Any): Class or function match was replaced with.
+        """
+        name = get_pattern_name(pattern, word_class)
+        self.pattern_matches[name] = self.pattern_matches.get(name, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        """Return report of stages, slowest first, and pattern match counts,
+        most matched first.
+
+        Returns:
+            Dict[str, Any]: Dict with 'stages' and 'pattern_matches' keys.
+        """
+        return {
+            'stages': [
+                stats.as_dict() for stats in sorted(
+                    self.stages.values(), key=lambda stats: -stats.time)
+            ],
+            'pattern_matches': dict(sorted(
+                self.pattern_matches.items(), key=lambda item: -item[1])),
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Return stage calls in Chrome trace event format, for loading into
+        chrome://tracing or Perfetto.
+
+        Returns:
+            Dict[str, Any]: Trace event JSON object.
+        """
+        return {'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}
+
+    def save_report(self, save_file: str) -> None:
+        """Save report as JSON file.
+
+        Args:
+            save_file (str): Path to save report to.
+        """
+        with open(save_file, 'w', encoding='utf-8') as fileobj:
+            json.dump(self.report(), fileobj, indent=2)
+
+    def save_chrome_trace(self, save_file: str) -> None:
+        """Save Chrome trace event JSON file.
+
+        Args:
+            save_file (str): Path to save trace to.
+        """
+        with open(save_file, 'w', encoding='utf-8') as fileobj:
+            json.dump(self.chrome_trace(), fileobj)
+
+#: Profiler recording stages, None when profiling is disabled.
+PROFILER = None
+
+def enable_profiling(trace: bool = True) -> Profiler:
+    """Start recording stages in a new Profiler.
+
+    Args:
+        trace (bool): If True, keep events for Chrome trace export.
+
+    Returns:
+        Profiler: Profiler recording stages.
+    """
+    global PROFILER
+    PROFILER = Profiler(trace=trace)
+    return PROFILER
+
+def disable_profiling() -> Optional[Profiler]:
+    """Stop recording stages.
+
+    Returns:
+        Optional[Profiler]: Profiler that was recording, or None.
+    """
+    global PROFILER
+    profiler = PROFILER
+    PROFILER = None
+    return profiler
+
+@contextmanager
+def profiling(trace: bool = True):
+    """Context manager that records stages run inside it.
+
+    Args:
+        trace (bool): If True, keep events for Chrome trace export.
+
+    Yields:
+        Profiler: Profiler recording stages.
+    """
+    profiler = enable_profiling(trace=trace)
+    try:
+        yield profiler
+    finally:
+        disable_profiling()
+
+def count_words(obj: Any) -> Optional[int]:
+    """Return number of words in sentences, number of items in other lists,
+    number of steps in XDL objects, otherwise None.
+    """
+    if type(obj) == list:
+        if obj and type(obj[0]) == list:
+            return sum([len(item) for item in obj])
+        return len(obj)
+    steps = getattr(obj, 'steps', None)
+    if type(steps) == list:
+        return len(steps)
+    return None
+
+def profile_stage(
+    func: Optional[Callable] = None, name: Optional[str] = None
+) -> Callable:
+    """Decorator recording calls of func as a pipeline stage when profiling is
+    enabled. When profiling is disabled the only cost is one global lookup.
+    Words in are counted from the first argument, words out from the return
+    value, or the first argument after the call if that can't be counted.
+
+    Args:
+        func (Callable): Function to decorate.
+        name (str): Stage name. Defaults to function name.
+
+    Returns:
+        Callable: Decorated function.
+    """
+    if func is None:
+        return functools.partial(profile_stage, name=name)
+    stage_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = PROFILER
+        if profiler is None:
+            return func(*args, **kwargs)
+        words_in = count_words(args[0]) if args else None
+        start_time = time.perf_counter()
+        result = func(*args, **kwargs)
+        duration = time.perf_counter() - start_time
+        words_out = count_words(result)
+        if words_out is None and args:
+            words_out = count_words(args[0])
+        profiler.record_stage(
+            stage_name, start_time, duration, words_in, words_out)
+        return result
+
+    return wrapper
+
+def get_pattern_item_name(item: Any) -> str:
+    """Return readable name of pattern item, e.g. "Optional(NumberWord)"."""
+    if type(item) == type:
+        return item.__name__
+    elif type(item) == str:
+        return repr(item)
+    elif type(item) == list:
+        return f"[{', '.join([get_pattern_item_name(i) for i in item])}]"
+    for attr in ['word', 'pos', 'regexp', 'words']:
+        if hasattr(item, attr):
+            return (f'{type(item).__name__}'
+                    f'({get_pattern_item_name(getattr(item, attr))})')
+    return type(item).__name__
+
+def get_pattern_name(pattern: List[Any], word_class: Any) -> str:
+    """Return readable name of pattern for reports, e.g.
+    "[NumberWord, 'to', NumberWord] -> RangeWord".
+    """
+    class_name = getattr(word_class, '__name__', None)
+    if class_name is None:
+        class_name = getattr(
+            getattr(word_class, 'func', None), '__name__', repr(word_class))
+    return f'{get_pattern_item_name(list(pattern))} -> {class_name}'
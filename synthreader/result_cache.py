@@ -0,0 +1,326 @@
+from typing import List, Dict, Optional, Any
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+import xdl
+
+from .words.action_words import Action
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+
+#: Directory of xdl package, hashed into the code fingerprint.
+XDL_PACKAGE_DIR = os.path.abspath(os.path.dirname(xdl.__file__))
+
+# Extensions of files that affect conversion output. Hashed into the code
+# fingerprint so any code, constants or probability table change invalidates
+# cached results.
+FINGERPRINT_FILE_EXTENSIONS = ['.py', '.tsv']
+
+# Default maximum total size in bytes of cached results.
+RESULT_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+
+# Seconds to wait for other processes to release the database.
+RESULT_CACHE_TIMEOUT: float = 60.
+
+def hash_directory(directory: str, hasher: 'hashlib._Hash') -> None:
+    """Add relative paths and contents of all fingerprinted files in directory
+    to hasher, in a deterministic order.
+
+    Args:
+        directory (str): Directory to hash.
+        hasher (hashlib._Hash): Hash object to update.
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted([d for d in dirs if d != '__pycache__'])
+        for file_name in sorted(files):
+            if os.path.splitext(file_name)[1] in FINGERPRINT_FILE_EXTENSIONS:
+                file_path = os.path.join(root, file_name)
+                hasher.update(
+                    os.path.relpath(file_path, directory).encode('utf-8'))
+                with open(file_path, 'rb') as fileobj:
+                    hasher.update(fileobj.read())
+
+CODE_FINGERPRINT = None
+
+def get_code_fingerprint() -> str:
+    """Return fingerprint of synthreader and xdl code and data, calculating it
+    the first time this is called.
+
+    Returns:
+        str: Hex digest identifying the current synthreader and xdl versions.
+    """
+    global CODE_FINGERPRINT
+    if CODE_FINGERPRINT is None:
+        hasher = hashlib.sha256()
+        hasher.update(str(xdl.__version__).encode('utf-8'))
+        hash_directory(HERE, hasher)
+        hash_directory(XDL_PACKAGE_DIR, hasher)
+        CODE_FINGERPRINT = hasher.hexdigest()
+    return CODE_FINGERPRINT
+
+class CachedResult(object):
+    """Result of converting procedure to XDL stored in ResultCache.
+
+    Args:
+        xdl (str): XDL string.
+        xdl_json (Dict): XDL as JSON dict.
+        errors (Dict[str, List[str]]): Errors from error_checking.get_errors.
+        actions (bytes): Pickled list of actions extracted from procedure,
+            from dump_action_list.
+    """
+    def __init__(
+        self,
+        xdl: str,
+        xdl_json: Optional[Dict] = None,
+        errors: Optional[Dict[str, List[str]]] = None,
+        actions: Optional[bytes] = None,
+    ):
+        self.xdl = xdl
+        self.xdl_json = xdl_json
+        self.errors = errors
+        self.actions = actions
+
+    @staticmethod
+    def dump_action_list(action_list: List[Action]) -> bytes:
+        """Pickle action list. Should be done before converting actions to XDL,
+        as that modifies them.
+
+        Args:
+            action_list (List[Action]): Actions extracted from procedure.
+
+        Returns:
+            bytes: Pickled action list.
+        """
+        return pickle.dumps(action_list, pickle.HIGHEST_PROTOCOL)
+
+    def load_action_list(self) -> Optional[List[Action]]:
+        """Return new copy of cached action list, or None if not stored."""
+        if self.actions is None:
+            return None
+        return pickle.loads(self.actions)
+
+class ResultCache(object):
+    """Content addressed on disk cache of conversion results, stored in a
+    SQLite database. Results are keyed on a hash of the procedure text and the
+    code fingerprint, so results from other versions of synthreader or xdl are
+    never returned.
+
+    Least recently used results are evicted as soon as the total size of
+    stored results goes over max_bytes. The total is kept up to date in the
+    database, so it is checked on every put by every process sharing it, and
+    when the cache is opened. The database is opened in WAL mode with a
+    separate connection in every process, so it is safe to share between the
+    workers of a batch run.
+
+    Args:
+        db_path (str): Path to SQLite database. Created if it doesn't exist.
+        max_bytes (int): Maximum total size of stored results in bytes.
+    """
+    def __init__(
+        self, db_path: str, max_bytes: int = RESULT_CACHE_MAX_BYTES
+    ):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.fingerprint = get_code_fingerprint()
+        self._connection = None
+        self._connection_pid = None
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' key TEXT PRIMARY KEY,'
+                ' fingerprint TEXT NOT NULL,'
+                ' xdl TEXT NOT NULL,'
+                ' xdl_json TEXT,'
+                ' errors TEXT,'
+                ' actions BLOB,'
+                ' size INTEGER NOT NULL,'
+                ' last_access REAL NOT NULL)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_last_access'
+                ' ON results (last_access)'
+            )
+            # Single row with running total size of results.
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_size ('
+                ' id INTEGER PRIMARY KEY CHECK (id = 0),'
+                ' total INTEGER NOT NULL)'
+            )
+            self.connection.execute(
+                'INSERT OR IGNORE INTO cache_size'
+                ' SELECT 0, COALESCE(SUM(size), 0) FROM results'
+            )
+        self.evict()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_connection_pid'] = None
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections can't be shared between processes, so open a new one if
+        # this object has been copied into a worker process.
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.db_path, timeout=RESULT_CACHE_TIMEOUT)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def key(self, synthesis_text: str) -> str:
+        """Return cache key for synthesis text.
+
+        Args:
+            synthesis_text (str): Description of synthetic procedure.
+
+        Returns:
+            str: Hex digest of code fingerprint and synthesis text.
+        """
+        hasher = hashlib.sha256(self.fingerprint.encode('utf-8'))
+        hasher.update(synthesis_text.encode('utf-8'))
+        return hasher.hexdigest()
+
+    def get(self, synthesis_text: str) -> Optional[CachedResult]:
+        """Return cached result for synthesis text.
+
+        Args:
+            synthesis_text (str): Description of synthetic procedure.
+
+        Returns:
+            Optional[CachedResult]: Cached result, or None if text isn't
+                cached for the current code fingerprint.
+        """
+        key = self.key(synthesis_text)
+        with self.connection:
+            row = self.connection.execute(
+                'SELECT xdl, xdl_json, errors, actions FROM results'
+                ' WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                'UPDATE results SET last_access = ? WHERE key = ?',
+                (time.time(), key)
+            )
+        xdl_str, xdl_json, errors, actions = row
+        return CachedResult(
+            xdl=xdl_str,
+            xdl_json=json.loads(xdl_json) if xdl_json else None,
+            errors=json.loads(errors) if errors else None,
+            actions=actions,
+        )
+
+    def put(self, synthesis_text: str, result: CachedResult) -> None:
+        """Store result for synthesis text, evicting least recently used
+        results if the cache is over max_bytes.
+
+        Args:
+            synthesis_text (str): Description of synthetic procedure.
+            result (CachedResult): Result to store.
+        """
+        xdl_json = (
+            json.dumps(result.xdl_json) if result.xdl_json is not None
+            else None)
+        errors = (
+            json.dumps(result.errors) if result.errors is not None else None)
+        size = (
+            len(result.xdl)
+            + len(xdl_json or '')
+            + len(errors or '')
+            + len(result.actions or b'')
+        )
+        key = self.key(synthesis_text)
+        with self.connection:
+            # Size of any result being replaced comes off the total. Done
+            # first so the transaction holds the write lock from the start.
+            self.connection.execute(
+                'UPDATE cache_size SET total = total + ? - COALESCE('
+                ' (SELECT size FROM results WHERE key = ?), 0)',
+                (size, key)
+            )
+            self.connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    self.fingerprint,
+                    result.xdl,
+                    xdl_json,
+                    errors,
+                    result.actions,
+                    size,
+                    time.time(),
+                )
+            )
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        """Return total size of stored results in bytes."""
+        return self.connection.execute(
+            'SELECT total FROM cache_size').fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def evict(self) -> None:
+        """Delete least recently used results until total size of results is
+        at most max_bytes.
+        """
+        with self.connection:
+            # Write lock taken up front so processes evicting at the same time
+            # don't both take the same results off the total.
+            self.connection.execute('BEGIN IMMEDIATE')
+            excess = self.size() - self.max_bytes
+            if excess <= 0:
+                return
+            rows = self.connection.execute(
+                'SELECT key, size FROM results ORDER BY last_access')
+            keys = []
+            freed = 0
+            for key, size in rows:
+                if freed >= excess:
+                    break
+                keys.append((key,))
+                freed += size
+            self.connection.executemany(
+                'DELETE FROM results WHERE key = ?', keys)
+            self.connection.execute(
+                'UPDATE cache_size SET total = total - ?', (freed,))
+
+    def invalidate(self, stale_only: bool = False) -> None:
+        """Delete cached results.
+
+        Args:
+            stale_only (bool): If True only delete results stored by other
+                versions of the code, which can never be returned.
+        """
+        with self.connection:
+            if stale_only:
+                self.connection.execute(
+                    'DELETE FROM results WHERE fingerprint != ?',
+                    (self.fingerprint,)
+                )
+            else:
+                self.connection.execute('DELETE FROM results')
+            self.connection.execute(
+                'UPDATE cache_size SET total ='
+                ' (SELECT COALESCE(SUM(size), 0) FROM results)'
+            )
+        self.connection.execute('VACUUM')
+
+    def close(self) -> None:
+        """Close database connection of this process."""
+        if (self._connection is not None
+                and self._connection_pid == os.getpid()):
+            self._connection.close()
+        self._connection = None
+        self._connection_pid = None
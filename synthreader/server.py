@@ -0,0 +1,376 @@
+"""HTTP service converting procedures to XDL with a pool of warm workers.
+
+Usage:
+    python -m synthreader.server --port 8000 --workers 4
+
+Endpoints:
+    POST /convert   {"text": "...", "id": ...} -> conversion result JSON
+    GET /health     Worker and queue status.
+    GET /metrics    Request counts and latency percentiles.
+"""
+from typing import List, Dict, Tuple, Optional, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import json
+import os
+import threading
+import time
+
+from .batch import init_worker, convert_procedure_chunk
+from .result_cache import ResultCache
+from .logging import get_logger
+
+# Number of requests per worker that can wait for a worker before new
+# requests are rejected.
+DEFAULT_QUEUE_SIZE_PER_WORKER: int = 8
+
+# Seconds to wait for a conversion before giving up on the request.
+DEFAULT_REQUEST_TIMEOUT: float = 60.
+
+# Number of most recent request latencies kept for percentiles.
+LATENCY_WINDOW: int = 1000
+
+# Maximum request body size in bytes.
+MAX_REQUEST_BYTES: int = 1024 ** 2
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return pct percentile of values, nearest rank."""
+    if not values:
+        return 0.
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def terminate_executor(executor: ProcessPoolExecutor) -> None:
+    """Shut down executor without waiting, terminating its worker processes
+    so that conversions stuck in them stop. Their futures fail with
+    BrokenProcessPool.
+
+    Args:
+        executor (ProcessPoolExecutor): Pool to terminate.
+    """
+    # ProcessPoolExecutor has no public way to stop work that is already
+    # running, so worker processes are taken before shutdown forgets them.
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+class ServiceMetrics(object):
+    """Thread safe request counts and recent latencies."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float, error: bool) -> None:
+        with self.lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.latencies.append(latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = list(self.latencies)
+            return {
+                'uptime': time.time() - self.start_time,
+                'requests': self.requests,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'restarts': self.restarts,
+                'in_flight': self.in_flight,
+                'latency': {
+                    'p50': percentile(latencies, 50),
+                    'p90': percentile(latencies, 90),
+                    'p99': percentile(latencies, 99),
+                    'max': max(latencies) if latencies else 0.,
+                },
+            }
+
+class ConversionService(object):
+    """Pool of warm worker processes converting procedures, with a bounded
+    number of requests allowed to wait for a worker.
+
+    Args:
+        workers (int): Number of worker processes.
+        queue_size (int): Number of requests that can wait for a free worker
+            before new requests are rejected. Defaults to
+            DEFAULT_QUEUE_SIZE_PER_WORKER per worker.
+        request_timeout (float): Seconds to wait for a conversion. If a
+            conversion already in a worker takes longer, the worker pool is
+            restarted.
+        result_cache (ResultCache): Cache of previous results. Optional.
+    """
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        if queue_size is None:
+            queue_size = workers * DEFAULT_QUEUE_SIZE_PER_WORKER
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.request_timeout = request_timeout
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.metrics = ServiceMetrics()
+        self.result_cache = result_cache
+        self.executor_lock = threading.Lock()
+        self.executor = self.make_executor()
+        self.ready = False
+
+    def make_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(self.result_cache,),
+        )
+
+    def warm_up(self) -> None:
+        """Start all worker processes and wait for them to warm up."""
+        executor = self.executor
+        futures = [executor.submit(os.getpid) for _ in range(self.workers)]
+        try:
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            # Pool was replaced while warming up, the new one warms up itself.
+            if executor is not self.executor:
+                return
+            raise
+        if executor is self.executor:
+            self.ready = True
+
+    def restart(self, old: ProcessPoolExecutor, reason: str) -> None:
+        """Replace worker pool with a new one, warmed up in the background,
+        and terminate the workers of the old one. The service reports not
+        ready until the new pool is warm. Conversions still running in the old
+        pool fail.
+
+        Args:
+            old (ProcessPoolExecutor): Pool that is broken or stuck. Nothing is
+                done if it has already been replaced.
+            reason (str): Reason for restart, logged.
+        """
+        with self.executor_lock:
+            if old is not self.executor:
+                return
+            self.ready = False
+            self.executor = self.make_executor()
+            with self.metrics.lock:
+                self.metrics.restarts += 1
+        get_logger().warning(f'{reason}, restarting worker pool.')
+        terminate_executor(old)
+        threading.Thread(target=self.warm_up, daemon=True).start()
+
+    def finished(self, future: Future) -> None:
+        """Free the slot of a request once its conversion has actually
+        finished, so that conversions still running after their request timed
+        out keep counting against capacity.
+        """
+        with self.metrics.lock:
+            self.metrics.in_flight -= 1
+        self.slots.release()
+
+    def convert(self, synthesis_text: str) -> Tuple[int, Dict[str, Any]]:
+        """Convert synthesis text in worker process.
+
+        Args:
+            synthesis_text (str): Description of synthetic procedure.
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: HTTP status and response body.
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.metrics.lock:
+                self.metrics.rejected += 1
+            return 503, {'error': 'Server busy, retry later.'}
+        start_time = time.perf_counter()
+        executor = self.executor
+        try:
+            future = executor.submit(
+                convert_procedure_chunk, [(0, synthesis_text)])
+        except (BrokenProcessPool, RuntimeError):
+            self.slots.release()
+            self.restart(executor, 'Worker process died')
+            self.metrics.record(time.perf_counter() - start_time, True)
+            return 500, {'error': 'Worker process failed.'}
+        with self.metrics.lock:
+            self.metrics.in_flight += 1
+        future.add_done_callback(self.finished)
+
+        try:
+            result = future.result(timeout=self.request_timeout)[0]
+        except TimeoutError:
+            with self.metrics.lock:
+                self.metrics.timeouts += 1
+            # A conversion that can't be cancelled has already been handed to
+            # a worker, which could be stuck on it for good, so the pool is
+            # replaced rather than losing that worker and its slot. Not while
+            # warming up, as then the request was most likely waiting for
+            # workers to start.
+            if not future.cancel() and self.ready:
+                self.restart(executor, 'Conversion timed out')
+            return 504, {'error': 'Conversion timed out.'}
+        except BrokenProcessPool:
+            self.restart(executor, 'Worker process died')
+            self.metrics.record(time.perf_counter() - start_time, True)
+            return 500, {'error': 'Worker process failed.'}
+        latency = time.perf_counter() - start_time
+        self.metrics.record(latency, result.error is not None)
+        response = result.as_dict()
+        del response['index']
+        response['latency'] = latency
+        return 200, response
+
+    def health(self) -> Dict[str, Any]:
+        with self.metrics.lock:
+            in_flight = self.metrics.in_flight
+        return {
+            'status': 'ok' if self.ready else 'starting',
+            'workers': self.workers,
+            'in_flight': in_flight,
+            'capacity': self.capacity,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'SynthReader'
+
+    def send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 503:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if self.path == '/health':
+            health = service.health()
+            self.send_json(200 if service.ready else 503, health)
+        elif self.path == '/metrics':
+            self.send_json(200, service.metrics.as_dict())
+        else:
+            self.send_json(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self) -> None:
+        if self.path != '/convert':
+            self.send_json(404, {'error': f'Unknown path {self.path}'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {'error': 'Request too large.'})
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+            synthesis_text = request['text']
+            if type(synthesis_text) != str:
+                raise ValueError('text must be a string.')
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {'error': f'Bad request: {e}'})
+            return
+        status, response = self.server.service.convert(synthesis_text)
+        if 'id' in request:
+            response['id'] = request['id']
+        self.send_json(status, response)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        get_logger().debug(format % args)
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server handing requests to a ConversionService.
+
+    Args:
+        address (Tuple[str, int]): Host and port to listen on.
+        service (ConversionService): Service converting procedures.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ConversionService):
+        super().__init__(address, ConversionRequestHandler)
+        self.service = service
+
+def serve(
+    host: str = '127.0.0.1',
+    port: int = 8000,
+    workers: int = 1,
+    queue_size: Optional[int] = None,
+    request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    result_cache: Optional[ResultCache] = None,
+) -> None:
+    """Warm up worker pool and serve conversion requests until interrupted.
+
+    Args:
+        host (str): Host to listen on.
+        port (int): Port to listen on.
+        workers (int): Number of worker processes.
+        queue_size (int): Number of requests that can wait for a free worker.
+        request_timeout (float): Seconds to wait for a conversion.
+        result_cache (ResultCache): Cache of previous results. Optional.
+    """
+    logger = get_logger()
+    service = ConversionService(
+        workers=workers,
+        queue_size=queue_size,
+        request_timeout=request_timeout,
+        result_cache=result_cache,
+    )
+    server = ConversionServer((host, port), service)
+    logger.info(f'Warming up {workers} workers...')
+    service.warm_up()
+    logger.info(f'Serving on http://{host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m synthreader.server',
+        description='Serve procedure to XDL conversions over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+        '-j', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--queue-size', type=int, default=None,
+        help='Requests that can wait for a worker before requests are'
+             ' rejected with 503.')
+    parser.add_argument(
+        '--timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT,
+        help='Seconds to wait for a conversion.')
+    parser.add_argument(
+        '--cache', default=None, help='SQLite file to cache results in.')
+    args = parser.parse_args(argv)
+    get_logger().setLevel('INFO')
+    serve(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        request_timeout=args.timeout,
+        result_cache=(
+            ResultCache(args.cache) if args.cache is not None else None),
+    )
+
+if __name__ == '__main__':
+    main()
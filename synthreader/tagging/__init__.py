@@ -1 +1,3 @@
 from .tagger import tag_synthesis
+from .pos import PosTaggingBackend, NLTKBackend
+from .sentence_cache import SentenceCache
@@ -2,8 +2,15 @@ from typing import List
 from .constants import (
     PAST_ACTION_PATTERNS, PRESENT_ACTION_PATTERNS, DISCONTINUE_ACTION_PATTERNS)
 from ...words import Word, DiscontinueWord
-from ...utils import apply_pattern, trim_patterns
+from ...utils import compile_patterns
+from ...profiling import profile_stage
 
+PAST_ACTION_PATTERN_SET = compile_patterns(PAST_ACTION_PATTERNS)
+PRESENT_ACTION_PATTERN_SET = compile_patterns(PRESENT_ACTION_PATTERNS)
+DISCONTINUE_ACTION_PATTERN_SET = compile_patterns(
+    DISCONTINUE_ACTION_PATTERNS, DiscontinueWord)
+
+@profile_stage
 def past_tense_action_tag(
         sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Find past tense actions in sentences i.e. 'stirred' and return sentences
@@ -16,8 +23,7 @@ def past_tense_action_tag(
         List[List[Word]]: Sentences with action phrases combined into
             ActionWords.
     """
-    for pattern in trim_patterns(PAST_ACTION_PATTERNS, word_bank):
-        apply_pattern(pattern[0], pattern[1], sentences)
+    PAST_ACTION_PATTERN_SET.apply(sentences, word_bank)
     # Need this not to mess up the combined organic extracts
     for sentence in sentences:
         for i in range(1, len(sentence)):
@@ -26,6 +32,7 @@ def past_tense_action_tag(
                 sentence[i] = Word('combined', 'JJ')
     return sentences
 
+@profile_stage
 def present_tense_action_tag(
         sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Find  present tense actions, i.e. 'stirring' in sentences and return
@@ -38,11 +45,8 @@ def present_tense_action_tag(
         List[List[Word]]: Sentences with action phrases combined into
             ActionWords.
     """
-    for pattern in trim_patterns(PRESENT_ACTION_PATTERNS, word_bank):
-        apply_pattern(pattern[0], pattern[1], sentences)
-    return sentences
+    return PRESENT_ACTION_PATTERN_SET.apply(sentences, word_bank)
 
+@profile_stage
 def discontinue_action_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    for pattern in DISCONTINUE_ACTION_PATTERNS:
-        apply_pattern(pattern, DiscontinueWord, sentences)
-    return sentences
+    return DISCONTINUE_ACTION_PATTERN_SET.apply(sentences)
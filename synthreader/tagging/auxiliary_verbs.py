@@ -1,6 +1,7 @@
 from typing import List
 from ..words import Word, AuxiliaryVerbWord
 from ..utils import apply_pattern
+from ..profiling import profile_stage
 
 AUXILIARY_VERB_PATTERNS: List[List[str]] = [
     ['was'],
@@ -11,6 +12,7 @@ AUXILIARY_VERB_PATTERNS: List[List[str]] = [
     ['can', 'be'],
 ]
 
+@profile_stage
 def auxiliary_verb_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Find auxiliary verbs in sentences and return sentences with
     AuxiliaryVerbWords.
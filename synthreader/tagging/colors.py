@@ -1,6 +1,7 @@
 from typing import List
-from ..utils import apply_pattern, trim_patterns
+from ..utils import apply_pattern, PatternVocabulary
 from ..words import Word, ColorWord
+from ..profiling import profile_stage
 
 COLORS = [
     'blue',
@@ -27,6 +28,9 @@ for color in COLORS:
 
 COLOR_PATTERNS = sorted(COLOR_PATTERNS, key=lambda x: 1 / len(x))
 
+COLOR_VOCABULARY = PatternVocabulary(COLOR_PATTERNS)
+
+@profile_stage
 def color_tag(sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Tag colors in sentences.
 
@@ -36,6 +40,6 @@ def color_tag(sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     Returns:
         List[List[Word]]: Sentences with colors tagged.
     """
-    for pattern in trim_patterns(COLOR_PATTERNS, word_bank):
+    for pattern in COLOR_VOCABULARY.trim(word_bank):
         apply_pattern(pattern, ColorWord, sentences)
     return sentences
@@ -1,6 +1,8 @@
 from ..words import DetailsWord, ActionWord, VolumeWord
 from ..words.modifiers import TemperatureModifier, TimeModifier
+from ..profiling import profile_stage
 
+@profile_stage
 def details_tag(sentences):
     for sentence in sentences:
         j = 0
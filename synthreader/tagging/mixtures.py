@@ -6,6 +6,7 @@ from ..words import (
     AbstractReagentWord,
 )
 from ..utils import apply_pattern, Optional, Pos
+from ..profiling import profile_stage
 
 MIXTURE_PATTERNS: List[List[Union[str, Type[Word]]]] = [
     [Pos('DT'), Optional(Pos('JJ')), 'mixture', 'of', AbstractReagentWord],
@@ -15,6 +16,7 @@ MIXTURE_PATTERNS: List[List[Union[str, Type[Word]]]] = [
 
 MIXTURE_PATTERNS = sorted(MIXTURE_PATTERNS, key=lambda x: 1 / len(x))
 
+@profile_stage
 def mixture_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Find mixture phrases in sentences and return sentences with MixtureWords.
 
@@ -40,11 +40,11 @@ from ..words import (
 )
 # InertAtmosphereWord)
 from ..utils import (
-    apply_pattern,
-    trim_patterns,
+    compile_patterns,
     Pos,
     Optional
 )
+from ..profiling import profile_stage
 
 MODIFIER_PATTERNS: List[
     Tuple[List[Union[str, int, Type[Word]]], Type[Modifier]]] = [
@@ -357,6 +357,9 @@ VESSEL_MODIFIER_PATTERNS: List[
 ]
 MODIFIER_PATTERNS.extend(VESSEL_MODIFIER_PATTERNS)
 
+MODIFIER_PATTERN_SET = compile_patterns(MODIFIER_PATTERNS)
+
+@profile_stage
 def pattern_modifier_tag(
         sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Look for phrases that modify actions in sentences and combine them into
@@ -370,14 +373,9 @@ def pattern_modifier_tag(
         List[List[Word]]: Sentences with phrases that modify actions combined
             into Modifier objects.
     """
-    for pattern in trim_patterns(MODIFIER_PATTERNS, word_bank):
-        if len(pattern) == 2:
-            sentences = apply_pattern(pattern[0], pattern[1], sentences)
-        elif len(pattern) == 3:
-            sentences = apply_pattern(
-                pattern[0], pattern[1], sentences, replace_pos=pattern[2])
-    return sentences
+    return MODIFIER_PATTERN_SET.apply(sentences, word_bank)
 
+@profile_stage
 def non_pattern_modifier_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Look for phrases that modify actions in sentences and combine them into
     Modifiers. This is for specific situations where Word objects need to be
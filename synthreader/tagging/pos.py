@@ -1,8 +1,11 @@
-from typing import List
-import nltk
-import re
+from typing import List, Tuple, Dict, Optional, TYPE_CHECKING
 
 from ..words import Word
+from .preprocessing import Rewriter
+from ..profiling import profile_stage
+
+if TYPE_CHECKING:
+    import nltk
 
 # Tactical replacements like in preprocessing, applied here so they are isolated
 # to individual sentences.
@@ -21,7 +24,120 @@ SENTENCE_REPLACEMENTS: List[str] = [
     # (r'(is )(equipped|fitted) (with|for) (.*?(?=charged ))', r''),
 ]
 
-def tokenize_and_pos_tag(synthesis_text: str) -> List[List[Word]]:
+SENTENCE_REWRITER = Rewriter(SENTENCE_REPLACEMENTS)
+
+# Maximum number of tokenized sentences to keep POS tags cached for.
+POS_TAG_CACHE_SIZE: int = 100000
+
+class PosTaggingBackend(object):
+    """Interface for tokenizing text and assigning part-of-speech tags.
+    Subclass this and pass an instance to tag_synthesis to use a different
+    tokenizer/tagger, everything downstream only sees the Word objects made
+    from the output.
+    """
+    def sent_tokenize(self, text: str) -> List[str]:
+        """Split text into sentences.
+
+        Args:
+            text (str): Text to split into sentences.
+
+        Returns:
+            List[str]: List of sentences.
+        """
+        raise NotImplementedError()
+
+    def word_tokenize(self, sentence: str) -> List[str]:
+        """Split sentence into tokens.
+
+        Args:
+            sentence (str): Sentence to split into tokens.
+
+        Returns:
+            List[str]: List of tokens.
+        """
+        raise NotImplementedError()
+
+    def pos_tag_sents(
+        self, sentences: List[List[str]]
+    ) -> List[List[Tuple[str, str]]]:
+        """Assign part-of-speech tags to every token in every sentence.
+
+        Args:
+            sentences (List[List[str]]): Tokenized sentences.
+
+        Returns:
+            List[List[Tuple[str, str]]]: Sentences as lists of
+                (token, pos_tag) tuples.
+        """
+        raise NotImplementedError()
+
+class NLTKBackend(PosTaggingBackend):
+    """NLTK tokenizers with the perceptron tagger, loaded once and used to tag
+    all sentences in a batch. Tags are cached for each tokenized sentence, as
+    the tagger only looks at tokens within the sentence being tagged.
+
+    Args:
+        cache_size (int): Maximum number of tokenized sentences to cache tags
+            for. Cache is cleared when this is reached.
+    """
+    def __init__(self, cache_size: int = POS_TAG_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._tagger = None
+
+    @property
+    def tagger(self) -> 'nltk.tag.PerceptronTagger':
+        if self._tagger is None:
+            import nltk
+            self._tagger = nltk.tag.PerceptronTagger()
+        return self._tagger
+
+    def sent_tokenize(self, text: str) -> List[str]:
+        import nltk
+        return nltk.sent_tokenize(text)
+
+    def word_tokenize(self, sentence: str) -> List[str]:
+        import nltk
+        return nltk.word_tokenize(sentence)
+
+    def pos_tag_sents(
+        self, sentences: List[List[str]]
+    ) -> List[List[Tuple[str, str]]]:
+        keys = [tuple(sentence) for sentence in sentences]
+        # Tags of this batch are kept here, as cached tags can be cleared
+        # from the cache before the batch is finished.
+        tags = {key: self.cache.get(key) for key in keys}
+        uncached = [key for key, pos_tags in tags.items() if pos_tags is None]
+        if uncached:
+            if len(self.cache) + len(uncached) > self.cache_size:
+                self.cache.clear()
+            tagged_sentences = self.tagger.tag_sents(
+                [list(key) for key in uncached])
+            for key, tagged_sentence in zip(uncached, tagged_sentences):
+                tags[key] = self.cache[key] = tuple(
+                    [pos_tag for _, pos_tag in tagged_sentence])
+        return [
+            list(zip(key, tags[key])) for key in keys
+        ]
+
+DEFAULT_POS_BACKEND = None
+
+def get_default_pos_backend() -> PosTaggingBackend:
+    """Return default POS tagging backend, creating it the first time this is
+    called.
+
+    Returns:
+        PosTaggingBackend: Default POS tagging backend.
+    """
+    global DEFAULT_POS_BACKEND
+    if DEFAULT_POS_BACKEND is None:
+        DEFAULT_POS_BACKEND = NLTKBackend()
+    return DEFAULT_POS_BACKEND
+
+@profile_stage
+def tokenize_and_pos_tag(
+    synthesis_text: str, backend: Optional[PosTaggingBackend] = None
+) -> List[List[Word]]:
     """
     Split synthesis text into sentences/words and get part-of-speech tags for
     each word.
@@ -29,20 +145,85 @@ def tokenize_and_pos_tag(synthesis_text: str) -> List[List[Word]]:
     Args:
         synthesis_text (str): Synthetic procedure description to tokenize and
             assign part-of-speech tags.
+        backend (PosTaggingBackend): Backend to tokenize and tag text with. If
+            not given default NLTK backend is used.
 
     Returns:
         List[List[Word]: List of sentences, which are lists of Word objects.
     """
-    sentences = nltk.sent_tokenize(synthesis_text)
-    for i in range(len(sentences)):
-        for regex, replacement in SENTENCE_REPLACEMENTS:
-            sentences[i] = re.sub(regex, replacement, sentences[i])
+    return tokenize_and_pos_tag_many([synthesis_text], backend)[0]
+
+def tokenize_and_pos_tag_many(
+    synthesis_texts: List[str], backend: Optional[PosTaggingBackend] = None
+) -> List[List[List[Word]]]:
+    """Tokenize and get part-of-speech tags for many synthesis texts, tagging
+    sentences from all texts in one batch.
+
+    Args:
+        synthesis_texts (List[str]): Synthetic procedure descriptions to
+            tokenize and assign part-of-speech tags.
+        backend (PosTaggingBackend): Backend to tokenize and tag text with. If
+            not given default NLTK backend is used.
+
+    Returns:
+        List[List[List[Word]]]: List of sentences for every synthesis text.
+    """
+    if backend is None:
+        backend = get_default_pos_backend()
+
+    text_sentences = [
+        split_sentences(synthesis_text, backend)
+        for synthesis_text in synthesis_texts
+    ]
+    tagged_sentences = tokenize_and_pos_tag_sentences(
+        [sent for sentences in text_sentences for sent in sentences], backend)
+
+    i = 0
+    texts = []
+    for sentences in text_sentences:
+        texts.append(tagged_sentences[i:i + len(sentences)])
+        i += len(sentences)
+    return texts
+
+def split_sentences(
+    synthesis_text: str, backend: Optional[PosTaggingBackend] = None
+) -> List[str]:
+    """Split synthesis text into sentences and apply sentence replacements.
+
+    Args:
+        synthesis_text (str): Synthetic procedure description to split.
+        backend (PosTaggingBackend): Backend to split text with. If not given
+            default NLTK backend is used.
+
+    Returns:
+        List[str]: Sentences with SENTENCE_REPLACEMENTS applied.
+    """
+    if backend is None:
+        backend = get_default_pos_backend()
+    return [
+        SENTENCE_REWRITER.rewrite(sent)
+        for sent in backend.sent_tokenize(synthesis_text)
+    ]
+
+def tokenize_and_pos_tag_sentences(
+    sentences: List[str], backend: Optional[PosTaggingBackend] = None
+) -> List[List[Word]]:
+    """Tokenize sentences and get part-of-speech tags for every word, tagging
+    all sentences in one batch.
 
-    sentences = [nltk.word_tokenize(sent) for sent in sentences]
-    sentences = [nltk.pos_tag(sent) for sent in sentences]
-    for i in range(len(sentences)):
-        for j in range(len(sentences[i])):
-            word, pos_tag = sentences[i][j]
-            sentences[i][j] = Word(word, pos_tag)
+    Args:
+        sentences (List[str]): Sentences returned by split_sentences.
+        backend (PosTaggingBackend): Backend to tokenize and tag text with. If
+            not given default NLTK backend is used.
 
-    return sentences
+    Returns:
+        List[List[Word]]: List of sentences, which are lists of Word objects.
+    """
+    if backend is None:
+        backend = get_default_pos_backend()
+    tagged_sentences = backend.pos_tag_sents(
+        [backend.word_tokenize(sent) for sent in sentences])
+    return [
+        [Word(word, pos_tag) for word, pos_tag in sent]
+        for sent in tagged_sentences
+    ]
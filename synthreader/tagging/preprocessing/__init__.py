@@ -1 +1,3 @@
-from .preprocessing import preprocess
+from .preprocessing import (
+    preprocess, preprocess_stats, reset_preprocess_stats)
+from .rewriter import Rewriter
@@ -1,8 +1,15 @@
 import re
-from typing import List, Tuple
+from typing import List, Tuple, Dict, Any
 from .constants import (
     HTML_REPLACEMENTS, MISSING_SPACE_REPLACEMENTS, TACTICAL_REPLACEMENTS)
+from .rewriter import Rewriter
+from ...profiling import profile_stage
 
+# All preprocessing replacements compiled once, in the order they are applied.
+PREPROCESS_REWRITER = Rewriter(
+    HTML_REPLACEMENTS + MISSING_SPACE_REPLACEMENTS + TACTICAL_REPLACEMENTS)
+
+@profile_stage
 def preprocess(synthesis_text: str) -> str:
     """Preprocess synthesis text. Tasks are:
     1) Remove any HTML remnants (common in texts from Reaxys)
@@ -18,13 +25,24 @@ def preprocess(synthesis_text: str) -> str:
         str: Synthetic procedure cleaned up and ready for tagging.
     """
     s = synthesis_text
-    s = apply_regex_replacements(s, HTML_REPLACEMENTS)
     # s = remove_nmr(s)
-    s = apply_regex_replacements(s, MISSING_SPACE_REPLACEMENTS)
-    s = apply_regex_replacements(s, TACTICAL_REPLACEMENTS)
+    s = PREPROCESS_REWRITER.rewrite(s)
 
     return s
 
+def preprocess_stats() -> List[Dict[str, Any]]:
+    """Return hit counts and time spent on every preprocessing replacement
+    since the last call to reset_preprocess_stats.
+
+    Returns:
+        List[Dict[str, Any]]: Stats for every replacement, in order applied.
+    """
+    return PREPROCESS_REWRITER.stats()
+
+def reset_preprocess_stats() -> None:
+    """Reset preprocessing replacement hit counts and times."""
+    PREPROCESS_REWRITER.reset_stats()
+
 def remove_nmr(synthesis_text: str) -> str:
     """Remove NMR from end of synthesis text.
 
@@ -0,0 +1,333 @@
+from typing import List, Tuple, Dict, Union, Optional, Any
+import re
+import time
+
+# Characters with special meaning in regex patterns outside of character sets.
+REGEX_SPECIAL_CHARS = '.^$*+?{}[]\\|()'
+
+# Escaped characters that just mean the literal character.
+REGEX_LITERAL_ESCAPES = '.^$*+?{}[]\\|()-/ #&~"\'%,:;<=>@`!'
+
+# Escapes followed by a character code, with number of hex digits in code.
+REGEX_CODE_ESCAPES: Dict[str, int] = {'x': 2, 'u': 4, 'U': 8}
+
+def get_literal_runs(pattern: str) -> Union[List[str], None]:
+    """Return runs of literal characters that every match of pattern must
+    contain, i.e. 'wenty' for r'(^| )([t|T])wenty[ ]'. Anything inside groups
+    or character sets is ignored, so this is conservative.
+
+    Args:
+        pattern (str): Regex pattern.
+
+    Returns:
+        Union[List[str], None]: List of literal runs. None if pattern uses
+            top level alternation or inline flags, so no literal is required.
+    """
+    if '(?' in pattern and re.search(r'\(\?[aiLmsux]', pattern):
+        return None
+
+    runs = []
+    run = ''
+    i = 0
+    depth = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escaped = pattern[i + 1: i + 2]
+            end = i + 2
+            if escaped in REGEX_CODE_ESCAPES:
+                end += REGEX_CODE_ESCAPES[escaped]
+            elif escaped == 'N':
+                # Named character, i.e. \N{DEGREE SIGN}.
+                end = pattern.find('}', end) + 1 or len(pattern)
+            elif escaped.isdigit():
+                # Octal escape or group reference, skipped with all digits
+                # after it.
+                while pattern[end: end + 1].isdigit():
+                    end += 1
+            elif depth == 0 and escaped and escaped in REGEX_LITERAL_ESCAPES:
+                run += escaped
+                i = end
+                continue
+            # Escape that doesn't just mean the escaped character ends the run.
+            if depth == 0:
+                runs.append(run)
+                run = ''
+            i = end
+            continue
+        if char == '[':
+            # Skip character set, ']' straight after '[' or '[^' is literal.
+            i += 1
+            if pattern[i: i + 1] == '^':
+                i += 1
+            if pattern[i: i + 1] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            if depth == 0:
+                runs.append(run)
+                run = ''
+            i += 1
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0:
+            if char == '|':
+                return None
+            elif char in '?*{':
+                # Previous character is optional.
+                run = run[:-1]
+                if char == '{':
+                    # Skip repeat count.
+                    while i < len(pattern) and pattern[i] != '}':
+                        i += 1
+            if char in REGEX_SPECIAL_CHARS:
+                runs.append(run)
+                run = ''
+            else:
+                run += char
+        if depth > 0 and run:
+            runs.append(run)
+            run = ''
+        i += 1
+    runs.append(run)
+    return [run for run in runs if run]
+
+def get_literal(pattern: str) -> Union[str, None]:
+    """Return literal string matched by pattern if pattern only matches one
+    literal string, otherwise None.
+
+    Args:
+        pattern (str): Regex pattern.
+
+    Returns:
+        Union[str, None]: Literal string pattern matches, or None.
+    """
+    if not pattern or any(char in REGEX_SPECIAL_CHARS for char in pattern):
+        return None
+    return pattern
+
+class RuleStats(object):
+    """Hit counts and time taken for a rewrite rule.
+
+    Args:
+        pattern (str): Pattern of rule.
+        replacement (str): Replacement of rule.
+    """
+    def __init__(self, pattern: str, replacement: str):
+        self.pattern = pattern
+        self.replacement = replacement
+        self.reset()
+
+    def reset(self) -> None:
+        #: Number of times rule has been applied to text.
+        self.calls = 0
+        #: Number of times rule has been skipped as required literal not found.
+        self.skips = 0
+        #: Total number of replacements made.
+        self.hits = 0
+        #: Total time in seconds spent applying rule.
+        self.time = 0.
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'pattern': self.pattern,
+            'replacement': self.replacement,
+            'calls': self.calls,
+            'skips': self.skips,
+            'hits': self.hits,
+            'time': self.time,
+        }
+
+class RewriteRule(object):
+    """Single compiled regex replacement, with required literal used to skip
+    the rule when it can't match.
+
+    Args:
+        pattern (str): Regex pattern to replace.
+        replacement (str): Replacement passed to re.sub.
+    """
+    def __init__(self, pattern: str, replacement: str):
+        self.regex = re.compile(pattern)
+        self.replacement = replacement
+        runs = get_literal_runs(pattern)
+        self.required_literal = max(runs, key=len) if runs else ''
+        self.stats = RuleStats(pattern, replacement)
+
+    def apply(self, s: str) -> str:
+        if self.required_literal and self.required_literal not in s:
+            self.stats.skips += 1
+            return s
+        start_time = time.perf_counter()
+        s, n = self.regex.subn(self.replacement, s)
+        self.stats.time += time.perf_counter() - start_time
+        self.stats.calls += 1
+        self.stats.hits += n
+        return s
+
+class LiteralRewriteGroup(object):
+    """Consecutive literal replacements applied in a single pass with one
+    alternation regex. Only used for rules where this gives exactly the same
+    result as applying them one after the other, see can_join.
+
+    Args:
+        rules (List[Tuple[str, str]]): (literal, replacement) tuples.
+    """
+    def __init__(self, rules: List[Tuple[str, str]]):
+        self.replacements = dict(rules)
+        self.stats = {
+            target: RuleStats(target, replacement)
+            for target, replacement in rules
+        }
+        self.regex = re.compile(
+            '|'.join([re.escape(target) for target, _ in rules]))
+
+    @staticmethod
+    def can_join(
+        rules: List[Tuple[str, str]], new_rule: Tuple[str, str]
+    ) -> bool:
+        """Return True if new_rule can be applied in the same pass as rules.
+        This is the case if no target overlaps with another target, so matches
+        are the same whichever order targets are looked for in, and no
+        replacement is empty or contains any character in any target, so
+        replacements can't create or join up matches for other targets.
+
+        Args:
+            rules (List[Tuple[str, str]]): (literal, replacement) tuples
+                already in group.
+            new_rule (Tuple[str, str]): (literal, replacement) to add.
+
+        Returns:
+            bool: True if new_rule can be added to group.
+        """
+        rules = rules + [new_rule]
+        targets = [target for target, _ in rules]
+        target_chars = set(''.join(targets))
+        for _, replacement in rules:
+            if not replacement or '\\' in replacement:
+                return False
+            if target_chars.intersection(replacement):
+                return False
+        for target in targets:
+            for other_target in targets:
+                if target != other_target and target in other_target:
+                    return False
+                for i in range(1, len(target)):
+                    if other_target.startswith(target[i:]):
+                        return False
+        return len(set(targets)) == len(targets)
+
+    def apply(self, s: str) -> str:
+        if not any(target in s for target in self.replacements):
+            for stats in self.stats.values():
+                stats.skips += 1
+            return s
+        start_time = time.perf_counter()
+        hits = []
+        s = self.regex.sub(
+            lambda match: hits.append(match.group()) or self.replacements[
+                match.group()],
+            s
+        )
+        elapsed = time.perf_counter() - start_time
+        for stats in self.stats.values():
+            stats.calls += 1
+            stats.time += elapsed / len(self.stats)
+        for target in hits:
+            self.stats[target].hits += 1
+        return s
+
+class Rewriter(object):
+    """Ordered list of regex replacements compiled once and applied as a
+    sequence of phases, giving the same result as calling re.sub with each
+    replacement in order.
+
+    Rules are compiled once, and skipped without running the regex if a
+    literal string every match must contain isn't in the text. Runs of
+    consecutive literal replacements that can't affect each other are merged
+    into single alternation passes. Every other rule is kept as its own
+    ordered phase.
+
+    Rules are compiled on first use rather than on creation, as rewriters are
+    created at import time.
+
+    Args:
+        replacements (List[Tuple[str, str]]): (pattern, replacement) tuples in
+            the order they should be applied.
+    """
+    def __init__(self, replacements: List[Tuple[str, str]]):
+        self.replacements = list(replacements)
+        self._phases: Optional[
+            List[Union[RewriteRule, LiteralRewriteGroup]]] = None
+
+    @property
+    def phases(self) -> List[Union[RewriteRule, LiteralRewriteGroup]]:
+        if self._phases is None:
+            self.compile()
+        return self._phases
+
+    def compile(self) -> None:
+        """Compile replacements into phases."""
+        self._phases = []
+        literal_rules = []
+        for pattern, replacement in self.replacements:
+            literal = get_literal(pattern)
+            if literal is not None and LiteralRewriteGroup.can_join(
+                    literal_rules, (literal, replacement)):
+                literal_rules.append((literal, replacement))
+                continue
+            self._add_literal_phase(literal_rules)
+            literal_rules = []
+            if literal is not None and LiteralRewriteGroup.can_join(
+                    [], (literal, replacement)):
+                literal_rules.append((literal, replacement))
+            else:
+                self._phases.append(RewriteRule(pattern, replacement))
+        self._add_literal_phase(literal_rules)
+
+    def _add_literal_phase(self, literal_rules: List[Tuple[str, str]]) -> None:
+        if len(literal_rules) > 1:
+            self._phases.append(LiteralRewriteGroup(literal_rules))
+        elif literal_rules:
+            self._phases.append(RewriteRule(*literal_rules[0]))
+
+    def rewrite(self, s: str) -> str:
+        """Apply all replacements to s.
+
+        Args:
+            s (str): Text to apply replacements to.
+
+        Returns:
+            str: Text with all replacements applied.
+        """
+        for phase in self.phases:
+            s = phase.apply(s)
+        return s
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return hit counts and time taken for every rule, in the order rules
+        are applied.
+
+        Returns:
+            List[Dict[str, Any]]: List of dicts with keys 'pattern',
+                'replacement', 'calls', 'skips', 'hits' and 'time'.
+        """
+        stats = []
+        for phase in self.phases:
+            if type(phase) == LiteralRewriteGroup:
+                stats.extend(
+                    [rule_stats.as_dict() for rule_stats in phase.stats.values()])
+            else:
+                stats.append(phase.stats.as_dict())
+        return stats
+
+    def reset_stats(self) -> None:
+        """Reset hit counts and times of all rules."""
+        for phase in self.phases:
+            if type(phase) == LiteralRewriteGroup:
+                for rule_stats in phase.stats.values():
+                    rule_stats.reset()
+            else:
+                phase.stats.reset()
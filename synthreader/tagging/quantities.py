@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Dict, Union, Tuple
 import re
 import copy
 
@@ -50,7 +50,7 @@ from ..words import (
     BPWord,
     MPWord
 )
-from ..utils import apply_pattern, Optional
+from ..utils import apply_pattern, compile_patterns, Optional
 from ..constants import (
     TIME_UNITS,
     VOLUME_UNITS,
@@ -70,7 +70,52 @@ from ..constants import (
     conc_regex_pattern,
     LITERAL_MULTIPLIER_DICT,
 )
-
+from ..profiling import profile_stage
+
+MULTIPLIER_PATTERNS = [item.split() for item in LITERAL_MULTIPLIER_DICT] + [
+    [NumberWord, 'x'],
+    [NumberWord, '×'],
+    [NumberWord, 'Xx'],
+    ['x', NumberWord],
+    ['×', NumberWord],
+    ['X', NumberWord],
+    [NumberWord, 'times'],
+]
+
+MULTIPLIER_PATTERN_SET = compile_patterns(MULTIPLIER_PATTERNS, MultiplierWord)
+
+# Unit -> UnitWord class it is tagged as. If a unit is in more than one unit
+# list the last one wins.
+UNIT_WORD_CLASSES: Dict[str, type] = {}
+for unit_list, unit_class in [
+    (TIME_UNITS, TimeUnitWord),
+    (MOL_UNITS, MolUnitWord),
+    (TEMP_UNITS, TempUnitWord),
+    (VOLUME_UNITS, VolumeUnitWord),
+    (CONC_UNITS, ConcUnitWord),
+    (MASS_UNITS, MassUnitWord),
+    (PERCENT_UNITS, PercentUnitWord),
+    (EQUIVALENTS_UNITS, EquivalentsUnitWord),
+    (PRESSURE_UNITS, PressureUnitWord),
+    (STIR_SPEED_UNITS, StirSpeedUnitWord),
+    (LENGTH_UNITS, LengthUnitWord),
+    (MOL_PERCENT_UNITS, MolPercentUnitWord),
+]:
+    for unit in unit_list:
+        UNIT_WORD_CLASSES[unit] = unit_class
+
+# Start of any token float() accepts once leading '~' are stripped, including
+# signs, unicode digits, surrounding whitespace, 'inf' and 'nan'. Tokens not
+# matching this can't be numbers, ratios, ranges, multipliers or
+# concentrations, so are only looked up as units.
+NUMBER_START_REGEX = re.compile(r'~*\s*(?:[-+.\d]|(?i:inf|nan))')
+
+CONC_REGEX = re.compile(conc_regex_pattern)
+RATIO_REGEX = re.compile(ratio_regex_pattern)
+RANGE_REGEX = re.compile(range_float_regex_pattern)
+MULTIPLIER_REGEX = re.compile(multiplier_regex_pattern)
+
+@profile_stage
 def quantity_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Find quantities in sentences and return sentences with QuantityWords.
 
@@ -82,57 +127,11 @@ def quantity_tag(sentences: List[List[Word]]) -> List[List[Word]]:
         List[List[Word]]: Sentences with quantity phrases combined into
             QuantityWords.
     """
-    unit_quantity_types = [
-        (VolumeUnitWord, VolumeWord),
-        (MassUnitWord, MassWord),
-        (TempUnitWord, TempWord),
-        (TimeUnitWord, TimeWord),
-        (ConcUnitWord, ConcWord),
-        (MolUnitWord, MolWord),
-        (EquivalentsUnitWord, EquivalentsWord),
-        (PercentUnitWord, PercentWord),
-        (PressureUnitWord, PressureWord),
-        (StirSpeedUnitWord, StirSpeedWord),
-        (LengthUnitWord, LengthWord),
-        (MolPercentUnitWord, MolPercentWord),
-    ]
-    conc_tag(sentences)
-    number_tag(sentences)
-    unit_tag(sentences)
-    ratio_tag(sentences)
-    range_tag(sentences)
-    multiplier_tag(sentences)
-
-    quantity_patterns = []
-    for unit_type, quantity_type in unit_quantity_types:
-        quantity_patterns.append(([NumberWord, unit_type], quantity_type))
-        # '1 additional hour', seen in OrgSyn
-        quantity_patterns.append(
-            ([NumberWord, 'additional', unit_type], quantity_type))
-        quantity_patterns.append(([RangeWord, unit_type], quantity_type))
-
-    # Add extra patterns for approximate quantities
-    extra_patterns = []
-    for pattern in quantity_patterns:
-        for word in [
-            ['about'],
-            ['approximately'],
-            ['a', 'final'],
-            ['an', 'additional']
-        ]:
-            new_pattern = copy.deepcopy(pattern)
-            for item in reversed(word):
-                new_pattern[0].insert(0, item)
-            extra_patterns.append(new_pattern)
-
-    quantity_patterns.extend(extra_patterns)
-
-    quantity_patterns = sorted(quantity_patterns, key=lambda x: 1 / len(x[0]))
-
-    for pattern, quantity_type in quantity_patterns:
-        apply_pattern(pattern, quantity_type, sentences)
+    quantity_token_tag(sentences)
+    apply_pattern([NumberWord, 'to', NumberWord], RangeWord, sentences)
+    MULTIPLIER_PATTERN_SET.apply(sentences)
 
-    apply_pattern([PercentWord, 'aq'], ConcWord, sentences)
+    QUANTITY_PATTERN_SET.apply(sentences)
 
     volume_and_multiplier_tag(sentences)
     # quantity_group_tag(sentences)
@@ -154,70 +153,69 @@ def remove_floating_units(sentences: List[List[Word]]) -> List[List[Word]]:
                 sentence[i] = Word(str(word), word.words[0].pos)
     return sentences
 
-def conc_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    """Tag concentration with no space between number and unit e.g. '3M'.
+def quantity_token_tag(sentences: List[List[Word]]) -> List[List[Word]]:
+    """Tag concentrations, numbers, units, ratios, ranges and multipliers that
+    are written as a single token, e.g. '3M', '~5', 'mL', '1:1', '8-18', '4x',
+    in one pass over every sentence.
 
     Args:
-        sentences (List[List[Word]]): Sentences to tag concentrations in.
+        sentences (List[List[Word]]): Sentences after tokenization and POS
+            tagging.
 
     Returns:
-        List[List[Word]]: Sentences with concentrations with no space between
-            number and unit tagged.
+        List[List[Word]]: Sentences with single token quantities converted to
+            Word subclasses.
     """
+    apply_pattern(['mol', '%'], MolPercentUnitWord, sentences)
     for sentence in sentences:
         for j, word in enumerate(sentence):
-            conc_match = re.match(conc_regex_pattern, str(word))
-            if conc_match:
+            if type(word) == Word:
+                word_class = get_quantity_token_class(word.word)
+                if word_class is None:
+                    continue
+                if issubclass(word_class, (NumberWord, UnitWord)):
+                    sentence[j] = word_class(word)
+                else:
+                    sentence[j] = word_class([word])
+
+            # Concentrations are also found in str of tagged words.
+            elif CONC_REGEX.match(str(word)):
                 sentence[j] = ConcWord([word])
     return sentences
 
-def range_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    """Find ranges in sentences (i.e. '8-18 hours') and return sentences with
-    RangeWords.
+def get_quantity_token_class(token: str) -> type:
+    """Return class that token should be tagged as by quantity_token_tag, or
+    None if it isn't a single token quantity.
 
     Args:
-        sentences (List[List[Word]]): Sentences after tokenization.
+        token (str): Text of plain Word.
 
     Returns:
-        List[List[Word]]: Sentences with ranges converted to RangeWords.
+        type: Word subclass to tag token as, or None.
     """
-    for i, sentence in enumerate(sentences):
-        for j, word in enumerate(sentence):
-            if type(word) == Word:
-                if re.match(range_float_regex_pattern, word.word):
-                    sentences[i][j] = RangeWord([word])
-    apply_pattern([NumberWord, 'to', NumberWord], RangeWord, sentences)
-    return sentences
-
-def multiplier_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    """Find multipliers in sentences (i.e. 'washed 4x with...') and return
-    sentences with MultiplierWords.
-
-    Args:
-        sentences (List[List[Word]]): Sentences after tokenization.
-    Returns:
-        List[List[Word]]: Sentences with multipliers converted to
-            MultiplierWords.
-    """
-    multiplier_patterns = [
-        [NumberWord, 'x'],
-        [NumberWord, '×'],
-        [NumberWord, 'Xx'],
-        ['x', NumberWord],
-        ['×', NumberWord],
-        ['X', NumberWord],
-        [NumberWord, 'times'],
-    ]
-    for i, sentence in enumerate(sentences):
-        for j, word in enumerate(sentence):
-            if type(word) == Word:
-                if re.match(multiplier_regex_pattern, word.word):
-                    sentences[i][j] = MultiplierWord([word])
-    for item in LITERAL_MULTIPLIER_DICT:
-        apply_pattern(item.split(), MultiplierWord, sentences)
-    for item in multiplier_patterns:
-        apply_pattern(item, MultiplierWord, sentences)
-    return sentences
+    # Everything apart from units has to start like a number.
+    maybe_number = NUMBER_START_REGEX.match(token) is not None
+    if maybe_number:
+        if CONC_REGEX.match(token):
+            return ConcWord
+        try:
+            float(token.lstrip('~'))
+            return NumberWord
+        except ValueError:
+            pass
+
+    unit_class = UNIT_WORD_CLASSES.get(token)
+    if unit_class is not None:
+        return unit_class
+
+    if maybe_number:
+        if RATIO_REGEX.match(token):
+            return RatioWord
+        if RANGE_REGEX.match(token):
+            return RangeWord
+        if MULTIPLIER_REGEX.match(token):
+            return MultiplierWord
+    return None
 
 def volume_and_multiplier_tag(sentences):
     for pattern in [
@@ -227,79 +225,55 @@ def volume_and_multiplier_tag(sentences):
         apply_pattern(pattern, RepeatedVolumeWord, sentences)
     return sentences
 
-def number_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    """Find numbers in sentences and return sentences with NumberWords.
+def get_quantity_patterns() -> List[Tuple[List[Union[Word, str]], type]]:
+    """Return patterns corresponding to quantities, i.e. stuff like '5 mL', and
+    the QuantityWord class each pattern should be tagged as.
 
-    Args:
-        sentences (List[List[Word]]): Sentences after tokenization and POS
-            tagging.
     Returns:
-        List[List[Word]]: Sentences with numbers converted to NumberWords.
+        List[Tuple[List[Union[Word, str]], type]]: Patterns corresponding to
+            quantities and the QuantityWord class to tag them as.
     """
-    for i in range(len(sentences)):
-        sentence = sentences[i]
-        for j in range(len(sentence)):
-            word = sentence[j]
-            if type(word) == Word:
-                try:
-                    float(word.word.lstrip('~'))
-                    sentences[i][j] = NumberWord(word)
-                except ValueError:
-                    pass
-    return sentences
+    unit_quantity_types = [
+        (VolumeUnitWord, VolumeWord),
+        (MassUnitWord, MassWord),
+        (TempUnitWord, TempWord),
+        (TimeUnitWord, TimeWord),
+        (ConcUnitWord, ConcWord),
+        (MolUnitWord, MolWord),
+        (EquivalentsUnitWord, EquivalentsWord),
+        (PercentUnitWord, PercentWord),
+        (PressureUnitWord, PressureWord),
+        (StirSpeedUnitWord, StirSpeedWord),
+        (LengthUnitWord, LengthWord),
+        (MolPercentUnitWord, MolPercentWord),
+    ]
+    quantity_patterns = []
+    for unit_type, quantity_type in unit_quantity_types:
+        quantity_patterns.append(([NumberWord, unit_type], quantity_type))
+        # '1 additional hour', seen in OrgSyn
+        quantity_patterns.append(
+            ([NumberWord, 'additional', unit_type], quantity_type))
+        quantity_patterns.append(([RangeWord, unit_type], quantity_type))
 
-def unit_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    """Find units in sentences and return sentences with UnitWords.
+    # Add extra patterns for approximate quantities
+    extra_patterns = []
+    for pattern in quantity_patterns:
+        for word in [
+            ['about'],
+            ['approximately'],
+            ['a', 'final'],
+            ['an', 'additional']
+        ]:
+            new_pattern = copy.deepcopy(pattern)
+            for item in reversed(word):
+                new_pattern[0].insert(0, item)
+            extra_patterns.append(new_pattern)
 
-    Args:
-        sentences (List[List[Word]]): Sentences after tokenization and POS
-            tagging.
-    Returns:
-        List[List[Word]]: Sentences with units converted to UnitWords.
-    """
-    units = [
-        (TIME_UNITS, TimeUnitWord),
-        (MOL_UNITS, MolUnitWord),
-        (TEMP_UNITS, TempUnitWord),
-        (VOLUME_UNITS, VolumeUnitWord),
-        (CONC_UNITS, ConcUnitWord),
-        (MASS_UNITS, MassUnitWord),
-        (PERCENT_UNITS, PercentUnitWord),
-        (EQUIVALENTS_UNITS, EquivalentsUnitWord),
-        (PRESSURE_UNITS, PressureUnitWord),
-        (STIR_SPEED_UNITS, StirSpeedUnitWord),
-        (LENGTH_UNITS, LengthUnitWord),
-        (MOL_PERCENT_UNITS, MolPercentUnitWord),
-    ]
-    apply_pattern(['mol', '%'], MolPercentUnitWord, sentences)
-    for i in range(len(sentences)):
-        sentence = sentences[i]
-        for j in range(len(sentence)):
-            word = sentence[j]
-            for unit_list, unit_class in units:
-                if type(word) == Word and word.word in unit_list:
-                    sentences[i][j] = unit_class(word)
-    return sentences
+    quantity_patterns.extend(extra_patterns)
 
-def ratio_tag(sentences: List[List[Word]]) -> List[List[Word]]:
-    """Find ratios (i.e. '1:1 mixture') in sentences and return sentences with
-    RatioWords.
+    quantity_patterns = sorted(quantity_patterns, key=lambda x: 1 / len(x[0]))
 
-    Args:
-        sentences (List[List[Word]]): Sentences after tokenization and POS
-            tagging.
-    Returns:
-        List[List[Word]]: Sentences with ratios converted to RatioWords.
-    """
-    for i in range(len(sentences)):
-        sentence = sentences[i]
-        for j in range(len(sentence)):
-            word = sentence[j]
-            if type(word) == Word:
-                if re.match(ratio_regex_pattern, word.word):
-                    ratio_word = RatioWord([word])
-                    sentence[j] = ratio_word
-    return sentences
+    return quantity_patterns
 
 def get_quantity_group_patterns() -> List[Union[Word, str]]:
     """Return patterns corresponding to groups of quantities, i.e. stuff like
@@ -360,6 +334,13 @@ def get_quantity_group_patterns() -> List[Union[Word, str]]:
 
     return patterns
 
+QUANTITY_PATTERN_SET = compile_patterns(
+    get_quantity_patterns() + [([PercentWord, 'aq'], ConcWord)])
+
+QUANTITY_GROUP_PATTERN_SET = compile_patterns(
+    get_quantity_group_patterns(), QuantityGroupWord)
+
+@profile_stage
 def percent_in_solvent_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Tag stuff like '40% in water'.
 
@@ -380,6 +361,7 @@ def percent_in_solvent_tag(sentences: List[List[Word]]) -> List[List[Word]]:
         apply_pattern(pattern, PercentInSolventWord, sentences)
     return sentences
 
+@profile_stage
 def quantity_group_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Tag groups of quantities as QuantityGroupWords
     i.e. stuff like '(30 mg, 0.02 mol)'.
@@ -390,9 +372,7 @@ def quantity_group_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     Returns:
         List[List[Word]]: Sentences with QuantityGroupWords added.
     """
-    for pattern in get_quantity_group_patterns():
-        apply_pattern(pattern, QuantityGroupWord, sentences)
-    return sentences
+    return QUANTITY_GROUP_PATTERN_SET.apply(sentences)
 
 def yield_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Tag yields e.g. 90 % yield.
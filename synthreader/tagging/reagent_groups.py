@@ -10,8 +10,9 @@ from ..words import (
     AuxiliaryVerbWord
 )
 from ..words.action_words import ActionWord
-from ..utils import apply_pattern
+from ..utils import compile_patterns
 from ..utils.pattern_matcher import Optional, Pos
+from ..profiling import profile_stage
 
 REAGENT_GROUP_PATTERNS = [
     [AbstractReagentWord, ',', AbstractReagentWord],
@@ -51,6 +52,10 @@ for i in reversed(range(len(REAGENT_GROUP_PATTERNS))):
     if 'followed' in REAGENT_GROUP_PATTERNS[i]:
         FOLLOWED_BY_PATTERNS.insert(0, REAGENT_GROUP_PATTERNS.pop(i))
 
+REAGENT_GROUP_PATTERN_SET = compile_patterns(
+    REAGENT_GROUP_PATTERNS + FOLLOWED_BY_PATTERNS, ReagentGroupWord)
+
+@profile_stage
 def reagent_group_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Find reagent groups in sentences and return sentences with
     ReagentGroupWords.
@@ -62,10 +67,7 @@ def reagent_group_tag(sentences: List[List[Word]]) -> List[List[Word]]:
         List[List[Word]]: Sentences with reagent group phrases combined into
             ReagentGroupWord objects.
     """
-    for pattern in REAGENT_GROUP_PATTERNS:
-        sentences = apply_pattern(pattern, ReagentGroupWord, sentences)
-    for pattern in FOLLOWED_BY_PATTERNS:
-        apply_pattern(pattern, ReagentGroupWord, sentences)
+    REAGENT_GROUP_PATTERN_SET.apply(sentences)
     do_not_allow_reagent_placeholders_in_group(sentences)
     split_reagent_groups(sentences)
     return sentences
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, FrozenSet
 
 #: Most common 10000 English words without swear words taken from here,
 #: https://github.com/first20hours/google-10000-english/blob/master/google-10000-english-usa-no-swears.txt  # noqa: E501
@@ -9890,3 +9890,7 @@ COMMON_ENGLISH_WORDS: List[str] = [
     'poison',
     '',
 ]
+
+#: Lower case COMMON_ENGLISH_WORDS as a set for fast membership tests.
+COMMON_ENGLISH_WORD_SET: FrozenSet[str] = frozenset(
+    word.lower() for word in COMMON_ENGLISH_WORDS)
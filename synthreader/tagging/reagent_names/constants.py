@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, FrozenSet
 
 P_GENERAL_PHRASE_IS_REAGENT = 0.54
 
@@ -10,7 +10,7 @@ REAGENT_NAME_END_IGNORE_WORDS = [
     ',',
 ]
 
-REAGENT_NAME_IGNORE_WORD_LIST = set([
+REAGENT_NAME_IGNORE_WORD_LIST = frozenset([
     'of',
     'in',
     'to',
@@ -218,3 +218,23 @@ REAGENT_NAME_IGNORE_FIRST_WORD: List[str] = [
 REAGENT_NAME_IGNORE_CHAR_LIST: List[str] = [
     '≈',
 ]
+
+#######################
+# FROZEN WORD LOOKUPS #
+#######################
+
+#: Set versions of word lists above for fast membership tests. Lists that are
+#: compared with lower case words are lower cased.
+REAGENT_NAME_END_IGNORE_WORD_SET: FrozenSet[str] = frozenset(
+    REAGENT_NAME_END_IGNORE_WORDS)
+
+REAGENT_NAME_AFTER_WORD_SET: FrozenSet[str] = frozenset(
+    word.lower() for word in REAGENT_NAME_AFTER_WORDS)
+
+#: Single word items of REAGENT_NAME_BEFORE_WORDS. Multi word items are looked
+#: up in REAGENT_NAME_BEFORE_WORD_TRIE in utils.py.
+REAGENT_NAME_BEFORE_WORD_SET: FrozenSet[str] = frozenset(
+    item.lower() for item in REAGENT_NAME_BEFORE_WORDS if type(item) == str)
+
+REAGENT_NAME_IGNORE_FIRST_WORD_SET: FrozenSet[str] = frozenset(
+    REAGENT_NAME_IGNORE_FIRST_WORD)
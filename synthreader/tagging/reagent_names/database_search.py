@@ -1,13 +1,14 @@
-from typing import List
+from typing import List, Dict, Set, Tuple
 #from chemdata.synonyms import REAGENT_NAME_LIST
 from .utils import (
-    get_candidate_phrases,
+    is_candidate_reagent_word,
+    is_candidate_reagent_phrase,
     remove_sub_phrases,
     resolve_overlapping_phrases,
     apply_reagent_names
 )
 from .constants import MAX_REAGENT_NAME_LENGTH
-from ...words import Word
+from ...words import Word, ReagentNameFragmentWord, format_reagent_name
 
 REAGENT_NAME_LIST=['Acetic acid']
 
@@ -31,6 +32,90 @@ def get_known_reagent_names(max_length: int) -> List[str]:
     """
     return REAGENT_NAME_LIST
 
+def reagent_name_key(name: str) -> str:
+    """Return key used to look up reagent name in ReagentNameIndex. Spaces are
+    removed as format_reagent_name removes some spaces, so the key of a phrase
+    can be built up word by word. Final sigma is normalised as lower() treats it
+    differently depending on the characters around it.
+
+    Args:
+        name (str): Reagent name or part of reagent name.
+
+    Returns:
+        str: Lower case name with spaces removed.
+    """
+    return name.lower().replace(' ', '').replace('ς', 'σ')
+
+class ReagentNameIndex(object):
+    """Hashed index of known reagent names, used to find every known reagent
+    name in sentences by walking each sentence once, rather than comparing
+    every candidate phrase with every known name.
+
+    Args:
+        reagent_names (List[str]): Known reagent names.
+    """
+    def __init__(self, reagent_names: List[str]):
+        self.names: Dict[str, Set[str]] = {}
+        for reagent_name in reagent_names:
+            self.names.setdefault(
+                reagent_name_key(reagent_name), set()).add(
+                    reagent_name.lower())
+        self.max_key_length = max(
+            [len(key) for key in self.names], default=0)
+
+    def find(
+        self, sentences: List[List[Word]], max_length: int
+    ) -> List[Tuple[int, int, int]]:
+        """Find longest known reagent name starting at every word in sentences.
+
+        Args:
+            sentences (List[List[Word]]): Sentences to search for reagent names
+                in.
+            max_length (int): Maximum number of characters allowed in a reagent
+                name.
+
+        Returns:
+            List[Tuple[int, int, int]]: (sentence_i, start_word_i, end_word_i)
+                positions of reagent names, in order of position.
+        """
+        reagent_name_positions = []
+        for i, sentence in enumerate(sentences):
+            for j in range(len(sentence)):
+                key = ''
+                longest_match = None
+                for k in range(j + 1, len(sentence) + 1):
+                    word = sentence[k - 1]
+                    if not (type(word) in [Word, ReagentNameFragmentWord]
+                            and is_candidate_reagent_word(str(word))):
+                        break
+                    key += reagent_name_key(str(word))
+                    if len(key) > min(self.max_key_length, max_length):
+                        break
+                    if key in self.names:
+                        phrase = format_reagent_name(sentence[j: k])
+                        if (len(phrase) <= max_length
+                                and is_candidate_reagent_phrase(phrase)
+                                and phrase.lower() in self.names[key]):
+                            longest_match = (i, j, k)
+                if longest_match:
+                    reagent_name_positions.append(longest_match)
+        return reagent_name_positions
+
+REAGENT_NAME_INDEX = None
+
+def get_reagent_name_index() -> ReagentNameIndex:
+    """Return index of known reagent names, building it the first time this is
+    called.
+
+    Returns:
+        ReagentNameIndex: Index of names from get_known_reagent_names.
+    """
+    global REAGENT_NAME_INDEX
+    if REAGENT_NAME_INDEX is None:
+        REAGENT_NAME_INDEX = ReagentNameIndex(
+            get_known_reagent_names(max_length=MAX_REAGENT_NAME_LENGTH))
+    return REAGENT_NAME_INDEX
+
 def database_reagent_name_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Search for known reagent names in text and tag them as ReagentNameWords.
 
@@ -41,22 +126,10 @@ def database_reagent_name_tag(sentences: List[List[Word]]) -> List[List[Word]]:
         List[List[Word]]: Sentences with reagent names combined into
             ReagentNameWords.
     """
-    # Get list of known reagent names.
-    known_reagent_names = list(
-        reversed(
-            sorted(
-                get_known_reagent_names(
-                    max_length=MAX_REAGENT_NAME_LENGTH),
-                key=lambda x: len(x))))
-    reagent_name_positions = []
-    # Get candidate phrases
-    phrases = get_candidate_phrases(sentences, MAX_REAGENT_NAME_LENGTH)
-    # Search for all reagent names in all phrases.
-    for phrase in phrases:
-        for reagent_name in known_reagent_names:
-            if phrase[0].lower() == reagent_name.lower():
-                reagent_name_positions.append(phrase[1])
-                break
+    # Search for longest reagent name starting at every word. Shorter names
+    # starting at the same word would be removed as sub phrases anyway.
+    reagent_name_positions = get_reagent_name_index().find(
+        sentences, MAX_REAGENT_NAME_LENGTH)
     # Remove sub phrases from reagent name positions, resolve overlaps and turn
     # reagent names to into ReagentName words.
     reagent_name_positions = remove_sub_phrases(reagent_name_positions)
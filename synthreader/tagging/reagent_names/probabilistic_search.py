@@ -1,5 +1,6 @@
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Set
 import os
+import numpy as np
 from ...words import Word
 from .utils import (
     remove_sub_phrases,
@@ -36,23 +37,174 @@ PROBABILITY_FILE_NAMES = [
     'p_fragments_len4_reagents.tsv',
 ]
 
-# Make feature list
-FEATURES = []
-for file_name in PROBABILITY_FILE_NAMES:
-    FEATURES.extend(
-        load_probabilities(os.path.join(HERE, 'probabilities', file_name)))
+# Deduplicated, sorted feature table cached next to the TSVs.
+FEATURES_FILE = os.path.join(HERE, 'probabilities', 'features.npy')
 
-# Remove duplicates
-encountered = []
-for i in reversed(range(len(FEATURES))):
-    frag = FEATURES[i][0]
-    if frag in encountered:
-        FEATURES.pop(i)
-    else:
-        encountered.append(frag)
+def build_features() -> List[Tuple[str, float, float]]:
+    """Load features from all probability files, remove duplicate fragments and
+    sort features by most certain in either way.
 
-# Sort by most certain in either way.
-FEATURES = sorted(FEATURES, key=lambda x: 1 / (max(x[1], x[2])))
+    Returns:
+        List[Tuple[str, float, float]]: List of tuples of format:
+            [(frag, p_frag_in_reagent_name, p_frag_in_non_reagent_phrase)...]
+    """
+    features = []
+    for file_name in PROBABILITY_FILE_NAMES:
+        features.extend(
+            load_probabilities(os.path.join(HERE, 'probabilities', file_name)))
+
+    # Remove duplicates, keeping the last occurrence of each fragment.
+    encountered = set()
+    for i in reversed(range(len(features))):
+        frag = features[i][0]
+        if frag in encountered:
+            features.pop(i)
+        else:
+            encountered.add(frag)
+
+    # Sort by most certain in either way.
+    return sorted(features, key=lambda x: 1 / (max(x[1], x[2])))
+
+def features_file_is_current() -> bool:
+    """Return True if FEATURES_FILE exists and is newer than all probability
+    files, otherwise False.
+    """
+    if not os.path.exists(FEATURES_FILE):
+        return False
+    features_mtime = os.path.getmtime(FEATURES_FILE)
+    return all(
+        os.path.getmtime(os.path.join(HERE, 'probabilities', file_name))
+        <= features_mtime
+        for file_name in PROBABILITY_FILE_NAMES
+    )
+
+def load_feature_array() -> np.ndarray:
+    """Return feature table as structured array with fields 'frag',
+    'p_reagent' and 'p_non_reagent'. The table is loaded memory mapped from
+    FEATURES_FILE, which is rebuilt from the probability files if they have
+    changed since it was written. If FEATURES_FILE can't be written the table
+    is built in memory instead.
+
+    Returns:
+        np.ndarray: Structured array of features.
+    """
+    if features_file_is_current():
+        try:
+            return np.load(FEATURES_FILE, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+
+    features = build_features()
+    feature_array = np.array(features, dtype=[
+        ('frag', 'U{}'.format(max([len(item[0]) for item in features]))),
+        ('p_reagent', 'f8'),
+        ('p_non_reagent', 'f8'),
+    ])
+    # Write to temporary file and move so that processes loading the file at
+    # the same time never see it half written.
+    tmp_file = '{}.{}.tmp'.format(FEATURES_FILE, os.getpid())
+    try:
+        with open(tmp_file, 'wb') as fileobj:
+            np.save(fileobj, feature_array)
+        os.replace(tmp_file, FEATURES_FILE)
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return feature_array
+
+class FragmentMatcher(object):
+    """Aho-Corasick automaton over fragment strings, used to find every
+    fragment contained in a phrase in a single pass over the phrase.
+
+    Args:
+        fragments (List[str]): Fragments to search for.
+    """
+    def __init__(self, fragments: List[str]):
+        # Trie of fragments, node 0 is the root.
+        self.goto: List[Dict[str, int]] = [{}]
+        self.outputs: List[List[int]] = [[]]
+        for fragment_i, fragment in enumerate(fragments):
+            node = 0
+            for char in fragment:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.outputs.append([])
+                node = next_node
+            self.outputs[node].append(fragment_i)
+
+        # Failure links, built breadth first so the failure node of every node
+        # is complete before it is used.
+        self.fail = [0 for _ in self.goto]
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, next_node in self.goto[node].items():
+                fail_node = self.fail[node]
+                while fail_node and char not in self.goto[fail_node]:
+                    fail_node = self.fail[fail_node]
+                self.fail[next_node] = self.goto[fail_node].get(char, 0)
+                self.outputs[next_node] = (
+                    self.outputs[next_node]
+                    + self.outputs[self.fail[next_node]])
+                queue.append(next_node)
+
+    def find(self, text: str) -> Set[int]:
+        """Return indexes of all fragments contained in text.
+
+        Args:
+            text (str): Text to search for fragments.
+
+        Returns:
+            Set[int]: Indexes of fragments found in text.
+        """
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            found.update(self.outputs[node])
+        return found
+
+class FeatureTable(object):
+    """Features used to predict if phrases are reagent names, with the
+    FragmentMatcher used to find them in phrases.
+
+    Args:
+        feature_array (np.ndarray): Structured array of features from
+            load_feature_array.
+    """
+    def __init__(self, feature_array: np.ndarray):
+        self.fragments: List[str] = feature_array['frag'].tolist()
+        self.p_in_reagent: np.ndarray = feature_array['p_reagent']
+        self.p_in_non_reagent: np.ndarray = feature_array['p_non_reagent']
+        self.matcher = FragmentMatcher(self.fragments)
+
+FEATURE_TABLE = None
+
+def get_feature_table() -> FeatureTable:
+    """Return feature table, loading it the first time this is called.
+
+    Returns:
+        FeatureTable: Features used to predict if phrases are reagent names.
+    """
+    global FEATURE_TABLE
+    if FEATURE_TABLE is None:
+        FEATURE_TABLE = FeatureTable(load_feature_array())
+    return FEATURE_TABLE
+
+def get_features() -> List[Tuple[str, float, float]]:
+    """Return features as list of tuples of format:
+    [(frag, p_frag_in_reagent_name, p_frag_in_non_reagent_phrase)...]
+    """
+    feature_table = get_feature_table()
+    return list(zip(
+        feature_table.fragments,
+        feature_table.p_in_reagent.tolist(),
+        feature_table.p_in_non_reagent.tolist(),
+    ))
 
 def p_phrase_is_reagent(
     phrase: str, p_general_phrase_is_reagent: Optional[float] = 0.45
@@ -82,18 +234,55 @@ def p_phrase_is_reagent(
             reagent name. 0 is definitely not a reagent name, 1 is definitely a
             reagent name.
     """
+    return float(p_phrases_are_reagents(
+        [phrase], p_general_phrase_is_reagent=p_general_phrase_is_reagent)[0])
+
+def p_phrases_are_reagents(
+    phrases: List[str], p_general_phrase_is_reagent: Optional[float] = 0.45
+) -> np.ndarray:
+    """Vectorised p_phrase_is_reagent for a batch of phrases. Features in each
+    phrase are found with the feature table's FragmentMatcher and per feature
+    probabilities are calculated for all features at once. The per phrase
+    probabilities are summed one at a time in feature table order, so results
+    are exactly the same as adding them up in a Python loop.
+
+    Args:
+        phrases (List[str]): Phrases to predict whether or not they are reagent
+            names.
+        p_general_phrase_is_reagent (float): Probability (value between 0 and 1)
+            that a given phrase is a reagent regardless of what features it
+            contains. See p_phrase_is_reagent.
+
+    Returns:
+        np.ndarray: Array of probabilities that each phrase is a reagent name.
+    """
+    feature_table = get_feature_table()
     p_general_phrase_is_non_reagent = 1 - p_general_phrase_is_reagent
-    ps = [p_general_phrase_is_reagent]
-    for feature, p_feature_in_reagent, p_feature_in_non_reagent in FEATURES:
-        if feature in phrase:
-            numerator = p_feature_in_reagent * p_general_phrase_is_reagent
-            denominator = (
-                (p_feature_in_reagent * p_general_phrase_is_reagent)
-                + (p_feature_in_non_reagent * p_general_phrase_is_non_reagent)
-            )
-            ps.append(numerator / denominator)
-
-    return sum(ps) / len(ps)
+    numerators = feature_table.p_in_reagent * p_general_phrase_is_reagent
+    denominators = (
+        (feature_table.p_in_reagent * p_general_phrase_is_reagent)
+        + (feature_table.p_in_non_reagent * p_general_phrase_is_non_reagent)
+    )
+    p_features = numerators / denominators
+
+    phrase_features = [
+        sorted(feature_table.matcher.find(phrase)) for phrase in phrases]
+    counts = np.array(
+        [len(features) + 1 for features in phrase_features], dtype=int)
+
+    # One row per phrase of [p_general, p_feature...], padded with zeros.
+    ps = np.zeros((len(phrases), max(counts, default=1)))
+    ps[:, 0] = p_general_phrase_is_reagent
+    rows = np.repeat(np.arange(len(phrases)), counts - 1)
+    columns = np.concatenate(
+        [np.arange(1, count) for count in counts] + [np.array([], dtype=int)])
+    features = np.array(
+        [i for features in phrase_features for i in features], dtype=int)
+    ps[rows, columns] = p_features[features]
+
+    # Accumulate rather than sum so additions happen one at a time, in order,
+    # as numpy sum uses pairwise summation. Padding zeros don't change totals.
+    return np.add.accumulate(ps, axis=1)[:, -1] / counts
 
 def naive_bayes_reagent_name_tag(
         sentences: List[List[Word]]) -> List[List[Word]]:
@@ -112,11 +301,12 @@ def naive_bayes_reagent_name_tag(
     phrases = get_candidate_phrases(
         sentences, max_length=MAX_REAGENT_NAME_LENGTH)
     # Search for all reagent names in all phrases.
-    for phrase in phrases:
-        if p_phrase_is_reagent(
-            phrase[0],
-            p_general_phrase_is_reagent=P_GENERAL_PHRASE_IS_REAGENT
-        ) >= 0.5:
+    ps = p_phrases_are_reagents(
+        [phrase[0] for phrase in phrases],
+        p_general_phrase_is_reagent=P_GENERAL_PHRASE_IS_REAGENT
+    )
+    for phrase, p in zip(phrases, ps):
+        if p >= 0.5:
             reagent_name_positions.append(phrase[1])
     # Remove sub phrases from reagent name positions, resolve overlaps and turn
     # reagent names to into ReagentName words.
@@ -5,7 +5,9 @@ from .database_search import database_reagent_name_tag
 from .rule_search import rule_reagent_name_tag
 from ...words import Word, ReagentNameWord, NumberWord
 from ...utils import apply_pattern
+from ...profiling import profile_stage
 
+@profile_stage
 def reagent_name_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Search for reagent names in sentences and convert words to
     ReagentNameWord objects.
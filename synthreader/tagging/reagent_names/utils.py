@@ -1,16 +1,17 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Iterator, Callable, Any
 import re
-import itertools
+import bisect
 
-from .common_english_words import COMMON_ENGLISH_WORDS
+from .common_english_words import COMMON_ENGLISH_WORD_SET
 from .constants import (
     REAGENT_NAME_IGNORE_WORD_LIST,
     MIN_REAGENT_NAME_LENGTH,
-    REAGENT_NAME_END_IGNORE_WORDS,
+    REAGENT_NAME_END_IGNORE_WORD_SET,
     REAGENT_NAME_IGNORE_CHAR_LIST,
     REAGENT_NAME_BEFORE_WORDS,
-    REAGENT_NAME_IGNORE_FIRST_WORD,
-    REAGENT_NAME_AFTER_WORDS
+    REAGENT_NAME_BEFORE_WORD_SET,
+    REAGENT_NAME_IGNORE_FIRST_WORD_SET,
+    REAGENT_NAME_AFTER_WORD_SET
 )
 from ...words import (
     Word,
@@ -59,7 +60,7 @@ def is_candidate_reagent_phrase(phrase: str) -> bool:
     """
     if len(phrase) < MIN_REAGENT_NAME_LENGTH:
         return False
-    elif phrase[-1] in REAGENT_NAME_END_IGNORE_WORDS:
+    elif phrase[-1] in REAGENT_NAME_END_IGNORE_WORD_SET:
         return False
     elif phrase in REAGENT_NAME_IGNORE_WORD_LIST:
         return False
@@ -78,6 +79,52 @@ def is_candidate_reagent_phrase(phrase: str) -> bool:
         return False
     return True
 
+def iter_candidate_phrases(
+    sentences: List[List[Word]], max_length: int
+) -> Iterator[Tuple[str, Tuple[int, int, int]]]:
+    """Generate all possible phrases in sentences that haven't been ruled out
+    as a reagent name, in order of sentence, start word and end word.
+
+    Each sentence is split into maximal runs of words that could be part of a
+    reagent name, and phrases are extended one word at a time from every start
+    word in a run. format_reagent_name only ever removes whitespace, so
+    extending stops once the non whitespace characters in the phrase are more
+    than max_length, as every longer phrase would be too long as well.
+
+    Args:
+        sentences (List[List[Word]]): Sentences to take phrases from.
+        max_length (int): Maximum number of characters allowed in a phrase.
+
+    Yields:
+        Tuple[str, Tuple[int, int, int]]: Phrase and its (sentence_i,
+            start_word_i, end_word_i) position.
+    """
+    for i, sentence in enumerate(sentences):
+        run_start = 0
+        while run_start < len(sentence):
+            run_end = run_start
+            while (run_end < len(sentence)
+                   and type(sentence[run_end]) in [
+                       Word, ReagentNameFragmentWord]
+                   and is_candidate_reagent_word(str(sentence[run_end]))):
+                run_end += 1
+
+            n_chars = [
+                len(''.join(str(word).split()))
+                for word in sentence[run_start:run_end]
+            ]
+            for j in range(run_start, run_end):
+                length = 0
+                for k in range(j + 1, run_end + 1):
+                    length += n_chars[k - 1 - run_start]
+                    if length > max_length:
+                        break
+                    phrase = format_reagent_name(sentence[j: k])
+                    if (len(phrase) <= max_length
+                            and is_candidate_reagent_phrase(phrase)):
+                        yield phrase, (i, j, k)
+            run_start = run_end + 1
+
 def get_candidate_phrases(
         sentences: List[List[Word]], max_length: int) -> List[str]:
     """Get a list of all possible phrases in sentences that haven't been ruled
@@ -88,25 +135,13 @@ def get_candidate_phrases(
         max_length (int): Maximum number of characters allowed in a phrase.
 
     Returns:
-        List[str]: List of phrases that haven't been ruled out as reagent names.
+        List[str]: List of [phrase, (sentence_i, start_word_i, end_word_i)]
+            lists of phrases that haven't been ruled out as reagent names.
     """
-    phrases = []
-    for i in range(len(sentences)):
-        sentence = sentences[i]
-        for j, k in itertools.combinations(range(len(sentence) + 1), 2):
-            if all([
-                (
-                    type(word) in [Word, ReagentNameFragmentWord]
-                    and is_candidate_reagent_word(str(word))
-                )
-                for word in sentence[j: k]
-            ]):
-                phrase = format_reagent_name(sentence[j: k])
-                if (len(phrase) <= max_length
-                        and is_candidate_reagent_phrase(phrase)):
-                    phrases.append([phrase, (i, j, k)])
-
-    return sorted(phrases, key=lambda x: 1 / len(x))
+    return [
+        [phrase, position]
+        for phrase, position in iter_candidate_phrases(sentences, max_length)
+    ]
 
 
 #################################################
@@ -155,29 +190,34 @@ def remove_sub_phrases(reagent_name_positions: List[Tuple[int, int, int]]
             reagent names with shorter reagent names that were part of longer
             reagent names removed.
     """
-
     # Sort reagent names longest (by word count) -> shortest (by word count)
     sorted_reagent_positions = list(
         sorted(
             reagent_name_positions,
             key=lambda x: -(x[2] - x[1])))  # 1 / (end_word_i - start_word_i)
-    # From longest to shortest name, search for shorter names in longer names
-    # and remove them.
-    i = 0
-    while i < len(sorted_reagent_positions):
-        # Unpack longer name position.
-        phrase_position = sorted_reagent_positions[i]
-        # Search from end of list back for shorter name within longer name.
-        j = len(sorted_reagent_positions) - 1
-        while j > i:
-            # Unpack shorter name position.
-            potential_sub_phrase_position = sorted_reagent_positions[j]
-            # If longer name contains shorter name.
-            if is_sub_phrase(phrase_position, potential_sub_phrase_position):
-                sorted_reagent_positions.pop(j)
-            j -= 1
-        i += 1
-    return sorted_reagent_positions
+
+    # Sweep through each sentence's distinct positions by start, longest first
+    # for equal starts. A position is inside a longer one if any position
+    # before it in the sweep ends at or after it.
+    sub_phrase_positions = set()
+    for positions in group_positions_by_sentence(
+            set(reagent_name_positions)).values():
+        max_end_word_i = None
+        for position in sorted(positions, key=lambda x: (x[1], -x[2])):
+            if max_end_word_i is not None and max_end_word_i >= position[2]:
+                sub_phrase_positions.add(position)
+            if max_end_word_i is None or position[2] > max_end_word_i:
+                max_end_word_i = position[2]
+
+    # Keep first occurrence of positions that aren't inside longer positions.
+    encountered = set()
+    filtered_reagent_positions = []
+    for position in sorted_reagent_positions:
+        if (position not in sub_phrase_positions
+                and position not in encountered):
+            filtered_reagent_positions.append(position)
+        encountered.add(position)
+    return filtered_reagent_positions
 
 def resolve_overlapping_phrases(
     reagent_name_positions: List[Tuple[int, int, int]],
@@ -204,51 +244,127 @@ def resolve_overlapping_phrases(
             reagent names with one reagent name of all overlapping reagent name
             pairs removed.
     """
-    i = 0
-    # var used later to decide how to update i counter.
-    # Go through reagent name positions
-    while i < len(reagent_name_positions):
-        # Unpack first reagent name position.
-        position1 = reagent_name_positions[i]
-
-        # Go through from end of list to start looking for overlapping names.
-        j = len(reagent_name_positions) - 1
-        popped_i = False
-        while j > i:
-            # Unpack second reagent name position.
-            position2 = reagent_name_positions[j]
-
-            # If check if first and second reagent name are overlapping.
-            if is_overlapping(position1, position2):
-                # If raw predictions are supplied decide which name to
-                # discard base on is_reagent_name: not_reagent_name
-                # neural network prediction ratio
+    # Overlapping positions must be in the same sentence, so each sentence is
+    # resolved separately. Within a sentence positions are looked at in list
+    # order, and for each position the later positions overlapping it are
+    # looked at from the end of the list back.
+    keep = [True for _ in reagent_name_positions]
+    for sentence_indexes in group_positions_by_sentence(
+            range(len(reagent_name_positions)),
+            key=lambda i: reagent_name_positions[i][0]).values():
+        span_index = SpanIndex(
+            [reagent_name_positions[i] for i in sentence_indexes],
+            sentence_indexes)
+
+        for i in sentence_indexes:
+            if not keep[i]:
+                continue
+            # Unpack first reagent name position.
+            position1 = reagent_name_positions[i]
+
+            # Go through from end of list to start looking for overlapping
+            # names.
+            for j in reversed(span_index.overlapping(position1, after=i)):
+                if not keep[j]:
+                    continue
+                # Unpack second reagent name position.
+                position2 = reagent_name_positions[j]
+
+                # If raw predictions are supplied decide which name to discard
+                # base on is_reagent_name: not_reagent_name neural network
+                # prediction ratio
                 if position_raw_prediction_dict:
                     position_to_use = resolve_overlap(
                         position1, position2, position_raw_prediction_dict)
 
                     if position2 == position_to_use:
-                        # Remove position2 and keep looking for more position2s
-                        # overlapping with position1.
-                        popped_i = False
-                        reagent_name_positions.pop(j)
+                        # Remove position2 and keep looking for more
+                        # position2s overlapping with position1.
+                        keep[j] = False
 
                     else:
-                        # Remove position1, break and move onto next position1.
-                        popped_i = True
-                        reagent_name_positions.pop(i)
+                        # Remove position1, break and move onto next
+                        # position1.
+                        keep[i] = False
                         break
 
                 # If no model predictions supplied arbitrarily remove
                 # second reagent name.
                 else:
-                    reagent_name_positions.pop(j)
-            j -= 1
-        # If i has been popped next phrase will be in current i position.
-        if not popped_i:
-            i += 1
+                    keep[j] = False
+
+    reagent_name_positions[:] = [
+        position
+        for position, keep_position in zip(reagent_name_positions, keep)
+        if keep_position
+    ]
     return reagent_name_positions
 
+def group_positions_by_sentence(
+    items: Iterable[Any], key: Callable[[Any], int] = lambda x: x[0]
+) -> Dict[int, List[Any]]:
+    """Group items by sentence index, keeping their order.
+
+    Args:
+        items (Iterable[Any]): Positions, or anything key can get a sentence
+            index from.
+        key (Callable[[Any], int]): Function returning sentence index of item.
+            By default first item of position.
+
+    Returns:
+        Dict[int, List[Any]]: Dict of {sentence_i: [item...]}
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
+
+class SpanIndex(object):
+    """Positions in a single sentence sorted by start word, for finding the
+    positions that overlap a given position without checking every pair.
+
+    Positions overlapping another position must contain its start or end word
+    boundary, so their start is within the longest position length of that
+    boundary.
+
+    Args:
+        positions (List[Tuple[int, int, int]]): (sentence_i, start_word_i,
+            end_word_i) positions, all in the same sentence.
+        indexes (List[int]): Index of each position in the list of positions
+            being resolved.
+    """
+    def __init__(
+            self, positions: List[Tuple[int, int, int]], indexes: List[int]):
+        self.spans = sorted(zip(
+            [position[1] for position in positions], indexes, positions))
+        self.starts = [span[0] for span in self.spans]
+        self.max_length = max(
+            [position[2] - position[1] for position in positions], default=0)
+
+    def overlapping(
+        self, position: Tuple[int, int, int], after: int
+    ) -> List[int]:
+        """Return indexes greater than after of positions that position
+        overlaps with, according to is_overlapping, in ascending order.
+
+        Args:
+            position (Tuple[int, int, int]): sentence_i, start_word_i,
+                end_word_i position.
+            after (int): Only return indexes greater than this.
+
+        Returns:
+            List[int]: Sorted indexes of positions overlapping with position.
+        """
+        _, start_word_i, end_word_i = position
+        lo = bisect.bisect_right(
+            self.starts, min(start_word_i, end_word_i) - self.max_length)
+        hi = bisect.bisect_left(self.starts, max(start_word_i, end_word_i))
+        return sorted([
+            index
+            for _, index, other_position in self.spans[lo: hi]
+            if index > after and is_overlapping(position, other_position)
+        ])
+
 def is_overlapping(
     position1: Tuple[int, int, int],
     position2: Tuple[int, int, int]
@@ -307,6 +423,71 @@ def resolve_overlap(
 # CONVERT Word OBJECTS INTO ReagentNameWord OBJECTS #
 #####################################################
 
+#: Key in word trie nodes marking the end of a phrase.
+TRIE_END = None
+
+def build_word_trie(phrases: List[List[str]]) -> Dict[str, Dict]:
+    """Build trie of phrases, where each node is a dict of
+    {next_word: child_node}, with TRIE_END in nodes where a phrase ends.
+
+    Args:
+        phrases (List[List[str]]): Phrases as lists of words.
+
+    Returns:
+        Dict[str, Dict]: Root node of trie.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for word in phrase:
+            node = node.setdefault(word, {})
+        node[TRIE_END] = True
+    return trie
+
+#: Multiword prefixes from REAGENT_NAME_BEFORE_WORDS i.e. ['half', 'saturated']
+REAGENT_NAME_BEFORE_WORD_TRIE = build_word_trie(
+    [item for item in REAGENT_NAME_BEFORE_WORDS if type(item) == list])
+
+def is_multiword_reagent_prefix(
+        word: Word, reagent_name_words: List[Word]) -> bool:
+    """Return True if word followed by words at the start of reagent name form
+    a multiword reagent prefix, i.e. ['half', 'saturated'], otherwise False.
+    Prefix words are only checked as far as the length of the reagent name.
+
+    Args:
+        word (Word): Word object to check if it is a reagent prefix.
+        reagent_name_words (List[Word]): List of Words in reagent name so far.
+
+    Returns:
+        bool: True if word starts a multiword reagent prefix.
+    """
+    node = REAGENT_NAME_BEFORE_WORD_TRIE.get(str(word))
+    if node is None:
+        return False
+    # Number of characters in reagent name joined with spaces.
+    reagent_name_length = max(
+        sum([len(str(word)) + 1 for word in reagent_name_words]) - 1, 0)
+    i = 0
+    while TRIE_END not in node and i < reagent_name_length:
+        node = node.get(str(reagent_name_words[i]))
+        if node is None:
+            return False
+        i += 1
+    return True
+
+def count_in_words(words: List[Word], substring: str) -> int:
+    """Return number of times substring occurs in words, without joining the
+    words together. Only valid for substrings that can't contain spaces.
+
+    Args:
+        words (List[Word]): Words to count substring in.
+        substring (str): Substring to count.
+
+    Returns:
+        int: Number of occurrences of substring in words.
+    """
+    return sum([str(word).count(substring) for word in words])
+
 def is_reagent_prefix(word: Word, reagent_name_words: List[Word]):
     """Return True if word is a recognised word that precedes reagent names,
     i.e. 'saturated', otherwise False.
@@ -318,30 +499,15 @@ def is_reagent_prefix(word: Word, reagent_name_words: List[Word]):
     Returns:
         bool: True if word is a recognised reagent prefix otherwise False.
     """
-    reagent_name = ' '.join([str(word) for word in reagent_name_words])
-    is_prefix = False
-
     if type(word) == NumberWord:
         return True
 
-    for item in REAGENT_NAME_BEFORE_WORDS:
+    is_prefix = (
         # Single word prefix i.e. 'saturated'
-        if type(item) == str and str(word).lower() == item:
-            is_prefix = True
-
+        str(word).lower() in REAGENT_NAME_BEFORE_WORD_SET
         # Multiword prefixes i.e. ['half', 'saturated']
-        elif type(item) == list:
-            if item[0] == str(word):
-                i = 1
-                is_prefix = True
-                # Check all words in prefix accounted for.
-                while i < len(item) and i - 1 < len(reagent_name):
-                    if item[i] != str(reagent_name_words[i - 1]):
-                        is_prefix = False
-                        break
-                    i += 1
-        if is_prefix:
-            break
+        or is_multiword_reagent_prefix(word, reagent_name_words)
+    )
 
     is_concentration = type(word) in [ConcWord, TimeWord]
     is_percent = type(word) == PercentWord
@@ -350,7 +516,8 @@ def is_reagent_prefix(word: Word, reagent_name_words: List[Word]):
     opening_bracket = (
         type(word) == Word
         and word.word == '('
-        and reagent_name.count(')') > reagent_name.count('(')
+        and count_in_words(reagent_name_words, ')')
+        > count_in_words(reagent_name_words, '(')
     )
     return (
         (is_prefix
@@ -372,15 +539,15 @@ def is_reagent_suffix(word: Word, reagent_name: List[Word]):
     Returns:
         bool: True if word is a recognised reagent suffix otherwise False.
     """
-    reagent_name = ' '.join([str(word) for word in reagent_name])
     closing_bracket = (
         type(word) == Word
         and word.word == ')'
-        and reagent_name.count('(') > reagent_name.count(')')
+        and count_in_words(reagent_name, '(')
+        > count_in_words(reagent_name, ')')
     )
     is_auxiliary_verb = type(word) == AuxiliaryVerbWord
     explicit_suffix = (
-        type(word) == Word and word.word.lower() in REAGENT_NAME_AFTER_WORDS)
+        type(word) == Word and word.word.lower() in REAGENT_NAME_AFTER_WORD_SET)
     return ((explicit_suffix
              or type(word) == NumberWord
              or closing_bracket)
@@ -450,12 +617,12 @@ def apply_reagent_names(
                 and type(sentence[end_word_i]) == NumberWord):
             end_word_i += 1
 
-        if str(sentence[start_word_i]) in REAGENT_NAME_IGNORE_FIRST_WORD:
+        if str(sentence[start_word_i]) in REAGENT_NAME_IGNORE_FIRST_WORD_SET:
             start_word_i += 1
 
         # Combine words into ReagentNameWord and add it to the sentence.
         if (' '.join([str(word) for word in sentence[start_word_i: end_word_i]])
-                not in COMMON_ENGLISH_WORDS):
+                not in COMMON_ENGLISH_WORD_SET):
             reagent_name_word = ReagentNameWord(
                 sentences[sentence_i][start_word_i: end_word_i])
             del sentences[sentence_i][start_word_i: end_word_i]
@@ -1,7 +1,8 @@
 from typing import List, Union
 import copy
 
-from ...utils import apply_pattern, Pos, Optional, trim_patterns, sort_patterns
+from ...utils import (
+    apply_pattern, compile_patterns, Pos, Optional, sort_patterns)
 from ...words import (
     Word,
     ReagentPlaceholderWord,
@@ -12,6 +13,7 @@ from ...words import (
     ActionWord,
     QuantityWord
 )
+from ...profiling import profile_stage
 
 OPTIONAL_ADJECTIVE = Optional(Pos('JJ'))
 
@@ -99,6 +101,10 @@ for i in range(len(REAGENT_PLACEHOLDER_PATTERNS)):
 
 REAGENT_PLACEHOLDER_PATTERNS = sort_patterns(REAGENT_PLACEHOLDER_PATTERNS)
 
+REAGENT_PLACEHOLDER_PATTERN_SET = compile_patterns(
+    REAGENT_PLACEHOLDER_PATTERNS, ReagentPlaceholderWord)
+
+@profile_stage
 def reagent_placeholder_tag(
         sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Find reagent placeholder phrases in sentences and return sentences with
@@ -117,8 +123,7 @@ def reagent_placeholder_tag(
             if str(word) == 'cooled':
                 sentence[i] = Word('cooled', 'JJ')
 
-    for pattern in trim_patterns(REAGENT_PLACEHOLDER_PATTERNS, word_bank):
-        apply_pattern(pattern, ReagentPlaceholderWord, sentences)
+    REAGENT_PLACEHOLDER_PATTERN_SET.apply(sentences, word_bank)
 
     # Reapply 'cooled' as CoolWord
     for sentence in sentences:
@@ -2,7 +2,8 @@ from typing import List
 import copy
 
 from ..reagent_names import reagent_name_tag
-from ...utils import apply_pattern, copy_and_modify_pattern, Optional
+from ...utils import (
+    apply_pattern, compile_patterns, copy_and_modify_pattern, Optional)
 from ...words import (
     Word,
     QuantityWord,
@@ -17,6 +18,7 @@ from ...words import (
     MultiplierWord,
     RatioWord,
 )
+from ...profiling import profile_stage
 
 amount_word_types = [MassWord, VolumeWord, EquivalentsWord]
 
@@ -80,6 +82,9 @@ for pattern in REAGENT_PATTERNS:
 
 REAGENT_PATTERNS = sorted(REAGENT_PATTERNS, key=lambda x: 1 / len(x))
 
+REAGENT_PATTERN_SET = compile_patterns(REAGENT_PATTERNS, ReagentWord)
+
+@profile_stage
 def reagent_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Find reagents in sentences and return sentences with ReagentWords.
 
@@ -91,8 +96,7 @@ def reagent_tag(sentences: List[List[Word]]) -> List[List[Word]]:
             ReagentWords.
     """
     sentences = reagent_name_tag(sentences)
-    for pattern in REAGENT_PATTERNS:
-        sentences = apply_pattern(pattern, ReagentWord, sentences)
+    sentences = REAGENT_PATTERN_SET.apply(sentences)
     # After ReagentName words have been used in patterns, convert them all to
     # quantity-less ReagentWords for the next stages of the process.
     for i, sentence in enumerate(sentences):
@@ -0,0 +1,129 @@
+from typing import List, Dict, Set, Tuple, Callable, Optional
+
+from ..words import Word
+from ..utils.pattern_matcher import PatternSet
+
+class TaggingStage(object):
+    """Tagger that runs more than once in tag_sentences, declaring what it
+    needs to see in a sentence to change it on a repeat pass.
+
+    The tagger must tag every sentence independently of the others, modifying
+    sentences in place.
+
+    Args:
+        tagger (Callable): Tagger taking list of sentences, and word_bank if
+            uses_word_bank is True.
+        uses_word_bank (bool): If True tagger is called with word_bank.
+        pattern_set (PatternSet): If the tagger does nothing but apply a
+            PatternSet, the PatternSet it applies. Matching a pattern only
+            depends on the words matched, so a sentence where the tagger
+            found nothing last time can only change if a word that can be part
+            of a match has been added, or words have been removed bringing
+            others together. If not given, the tagger may look anywhere in a
+            sentence, so any change to it means it has to be tagged again.
+    """
+    def __init__(
+        self,
+        tagger: Callable,
+        uses_word_bank: bool = False,
+        pattern_set: Optional[PatternSet] = None,
+    ):
+        self.tagger = tagger
+        self.uses_word_bank = uses_word_bank
+        self.pattern_set = pattern_set
+
+    def __call__(
+        self, sentences: List[List[Word]], word_bank: Set[str]
+    ) -> List[List[Word]]:
+        if self.uses_word_bank:
+            return self.tagger(sentences, word_bank)
+        return self.tagger(sentences)
+
+    def can_change(self, sentence: List[Word], last: Tuple[Word, ...]) -> bool:
+        """Return True if tagger could change sentence, given that it left the
+        sentence as last and changed nothing in it the last time it ran.
+
+        Args:
+            sentence (List[Word]): Sentence as it is now.
+            last (Tuple[Word, ...]): Words of sentence after tagger last ran.
+
+        Returns:
+            bool: False if running tagger on sentence is certain to do nothing,
+                otherwise True.
+        """
+        if tuple(sentence) == last:
+            return False
+        if self.pattern_set is None:
+            return True
+
+        # Words are identified by object, not value. Taggers never modify
+        # words in place, they replace them with new words.
+        last_positions = {id(word): i for i, word in enumerate(last)}
+        prev_position = None
+        last_position = -1
+        for word in sentence:
+            position = last_positions.get(id(word))
+            if position is None:
+                if self.pattern_set.can_match(word):
+                    return True
+            # Words reordered, duplicated or brought together by removing the
+            # words between them.
+            elif (position <= last_position
+                  or (prev_position is not None
+                      and position != prev_position + 1)):
+                return True
+            else:
+                last_position = position
+            prev_position = position
+        return False
+
+class TaggingScheduler(object):
+    """Runs TaggingStages on sentences, keeping track of what every stage left
+    in each sentence so that repeat passes of a stage are only run on
+    sentences it could change. The result is identical to running every
+    stage on all sentences.
+
+    Args:
+        sentences (List[List[Word]]): Sentences being tagged.
+        word_bank (Set[str]): Lower case words in procedure.
+    """
+    def __init__(self, sentences: List[List[Word]], word_bank: Set[str]):
+        self.sentences = sentences
+        self.word_bank = word_bank
+        #: Stage -> (words after last run, whether last run changed sentence)
+        #: for every sentence.
+        self.last_runs: Dict[
+            TaggingStage, List[Tuple[Tuple[Word, ...], bool]]] = {}
+        #: Number of sentences repeat passes were skipped for.
+        self.skipped = 0
+
+    def run(self, stage: TaggingStage) -> List[List[Word]]:
+        """Run stage on every sentence it could change.
+
+        Args:
+            stage (TaggingStage): Stage to run.
+
+        Returns:
+            List[List[Word]]: All sentences.
+        """
+        last_run = self.last_runs.get(stage)
+        if last_run is None:
+            indexes = list(range(len(self.sentences)))
+        else:
+            indexes = [
+                i for i, (last, changed) in enumerate(last_run)
+                if changed or stage.can_change(self.sentences[i], last)
+            ]
+            self.skipped += len(self.sentences) - len(indexes)
+
+        before = [tuple(self.sentences[i]) for i in indexes]
+        if indexes:
+            stage([self.sentences[i] for i in indexes], self.word_bank)
+
+        # Skipped sentences are recorded as they are now, as stage would have
+        # left them unchanged.
+        run = [(tuple(sentence), False) for sentence in self.sentences]
+        for i, words in zip(indexes, before):
+            run[i] = (run[i][0], run[i][0] != words)
+        self.last_runs[stage] = run
+        return self.sentences
@@ -0,0 +1,160 @@
+from typing import List, Dict, Set, FrozenSet, Tuple, Hashable, Optional, Any
+from collections import OrderedDict
+import pickle
+
+from ..words import Word
+
+# Default maximum number of sentences kept in a SentenceCache.
+SENTENCE_CACHE_SIZE: int = 10000
+
+# Words that taggers can insert into a sentence as plain Words without them
+# being tokens of that sentence ('and' in reagent_group_tag, 'combined' in
+# past_tense_action_tag, 'cooled' in reagent_placeholder_tag). Literal words in
+# patterns can only match plain Words, so apart from the sentence's own tokens
+# these are the only procedure wide words that can change how trim_patterns
+# affects a sentence.
+INSERTED_WORDS: FrozenSet[str] = frozenset(['and', 'combined', 'cooled'])
+
+class SentenceCacheEntry(object):
+    """Cached tokens and tagged output for one sentence.
+
+    Args:
+        words (List[Word]): Tokenized, POS tagged sentence.
+    """
+    def __init__(self, words: List[Word]):
+        #: Pickled untagged sentence.
+        self.words = pickle.dumps(words, pickle.HIGHEST_PROTOCOL)
+        #: Lower case words in sentence, contributed to the procedure word_bank.
+        self.word_bank: Set[str] = set([word.word.lower() for word in words])
+        #: Pickled tagged sentences by context key.
+        self.tagged: Dict[Hashable, bytes] = {}
+
+    def get_words(self) -> List[Word]:
+        """Return new copy of untagged sentence."""
+        return pickle.loads(self.words)
+
+class SentenceCache(object):
+    """LRU cache of tagged sentences keyed on the preprocessed sentence text.
+
+    Tagging a sentence only depends on the rest of the procedure through
+    whether it is the first sentence (convert_unused_technique_words skips the
+    first sentence) and which of INSERTED_WORDS are in the procedure word_bank,
+    so tagged output is stored per combination of these. Sentences are stored
+    pickled, which is much faster to copy than deepcopy, and unpickled on the
+    way out, so callers are free to modify them.
+
+    Args:
+        max_size (int): Maximum number of sentences to keep.
+    """
+    def __init__(self, max_size: int = SENTENCE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: 'OrderedDict[Tuple[Any, str], SentenceCacheEntry]' = (
+            OrderedDict())
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry(
+        self, sentence: str, backend: Any = None
+    ) -> Optional[SentenceCacheEntry]:
+        """Return entry for sentence and mark it as recently used.
+
+        Args:
+            sentence (str): Sentence text returned by split_sentences.
+            backend (Any): POS tagging backend the sentence was tagged with.
+
+        Returns:
+            Optional[SentenceCacheEntry]: Entry for sentence or None if
+                sentence isn't cached.
+        """
+        key = (backend, sentence)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def add_entry(
+        self, sentence: str, words: List[Word], backend: Any = None
+    ) -> SentenceCacheEntry:
+        """Add tokenized sentence to cache, evicting least recently used
+        sentences if cache is full.
+
+        Args:
+            sentence (str): Sentence text returned by split_sentences.
+            words (List[Word]): Tokenized, POS tagged sentence.
+            backend (Any): POS tagging backend the sentence was tagged with.
+
+        Returns:
+            SentenceCacheEntry: New entry for sentence.
+        """
+        entry = SentenceCacheEntry(words)
+        self.entries[(backend, sentence)] = entry
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def context_key(is_first_sentence: bool, word_bank: Set[str]) -> Hashable:
+        """Return key for everything outside a sentence that can affect how it
+        is tagged.
+
+        Args:
+            is_first_sentence (bool): True if sentence is first in procedure.
+            word_bank (Set[str]): Lower case words in procedure.
+
+        Returns:
+            Hashable: Context key.
+        """
+        return (is_first_sentence, INSERTED_WORDS.intersection(word_bank))
+
+    def get_tagged(
+        self, entry: SentenceCacheEntry, context: Hashable
+    ) -> Optional[List[Word]]:
+        """Return copy of tagged sentence for context, or None if sentence
+        hasn't been tagged in this context. Counts hit or miss.
+
+        Args:
+            entry (SentenceCacheEntry): Entry for sentence.
+            context (Hashable): Key returned by context_key.
+
+        Returns:
+            Optional[List[Word]]: Tagged sentence or None.
+        """
+        tagged = entry.tagged.get(context)
+        if tagged is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(tagged)
+
+    def add_tagged(
+        self,
+        entry: SentenceCacheEntry,
+        context: Hashable,
+        tagged: List[Word]
+    ) -> None:
+        """Store copy of tagged sentence for context.
+
+        Args:
+            entry (SentenceCacheEntry): Entry for sentence.
+            context (Hashable): Key returned by context_key.
+            tagged (List[Word]): Tagged sentence.
+        """
+        entry.tagged[context] = pickle.dumps(tagged, pickle.HIGHEST_PROTOCOL)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hits, misses and number of cached sentences.
+
+        Returns:
+            Dict[str, int]: Dict with keys 'hits', 'misses' and 'size'.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.entries),
+        }
+
+    def clear(self) -> None:
+        """Remove all cached sentences and reset stats."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
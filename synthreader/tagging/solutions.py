@@ -11,7 +11,8 @@ from ..words import (
     PercentWord,
     ConcWord,
 )
-from ..utils import apply_pattern, Optional, Pos
+from ..utils import compile_patterns, Optional, Pos
+from ..profiling import profile_stage
 
 #: Patterns to match solution phrasees.
 SOLUTION_PATTERNS: List[List[Union[str, Type[Word]]]] = [
@@ -69,6 +70,9 @@ SOLUTION_PATTERNS.extend(extra_patterns)
 
 SOLUTION_PATTERNS = sorted(SOLUTION_PATTERNS, key=lambda x: 1 / len(x))
 
+SOLUTION_PATTERN_SET = compile_patterns(SOLUTION_PATTERNS, SolutionWord)
+
+@profile_stage
 def solution_tag(sentences: List[List[Word]]) -> List[List[Word]]:
     """Find solutions in sentences and return sentences with SolutionWords.
 
@@ -79,6 +83,4 @@ def solution_tag(sentences: List[List[Word]]) -> List[List[Word]]:
         List[List[Word]]: Sentences with solution phrases combined into
             SolutionWords.
     """
-    for pattern in SOLUTION_PATTERNS:
-        sentences = apply_pattern(pattern, SolutionWord, sentences)
-    return sentences
+    return SOLUTION_PATTERN_SET.apply(sentences)
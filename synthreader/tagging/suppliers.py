@@ -1,5 +1,6 @@
 from ..utils import apply_pattern
 from ..words import SupplierWord
+from ..profiling import profile_stage
 
 SUPPLIER_PATTERNS = [
     ['aldrich'],
@@ -9,6 +10,7 @@ SUPPLIER_PATTERNS = [
     ['alfa-aesar'],
 ]
 
+@profile_stage
 def supplier_tag(sentences):
     for pattern in SUPPLIER_PATTERNS:
         apply_pattern(pattern, SupplierWord, sentences)
@@ -1,12 +1,25 @@
-from typing import List
+from typing import List, Optional, Set
+from concurrent.futures import Executor
 from ..words import (
     Word, TechniqueWord, TimeWord, TempWord, PressureWord)
 from ..words.modifiers import (
     TimeModifier, TemperatureModifier, PressureModifier)
 from .preprocessing import preprocess
-from .pos import tokenize_and_pos_tag
+from .pos import (
+    tokenize_and_pos_tag,
+    tokenize_and_pos_tag_sentences,
+    split_sentences,
+    get_default_pos_backend,
+    PosTaggingBackend,
+)
+from .sentence_cache import SentenceCache
 from .auxiliary_verbs import auxiliary_verb_tag
-from .quantities import quantity_tag, quantity_group_tag, percent_in_solvent_tag
+from .quantities import (
+    quantity_tag,
+    quantity_group_tag,
+    percent_in_solvent_tag,
+    QUANTITY_GROUP_PATTERN_SET,
+)
 from .reagents import reagent_tag, reagent_placeholder_tag
 from .reagent_names import reagent_name_tag
 from .solutions import solution_tag
@@ -14,68 +27,266 @@ from .mixtures import mixture_tag
 from .actions import (
     past_tense_action_tag, present_tense_action_tag, discontinue_action_tag)
 from .techniques import technique_tag
-from .vessels import vessel_tag, expand_vessels, vessel_component_group_tag
+from .vessels import (
+    vessel_tag,
+    expand_vessels,
+    vessel_component_group_tag,
+    VESSEL_PATTERN_SET,
+)
 from .reagent_groups import reagent_group_tag
 from .modifiers import (
     pattern_modifier_tag,
     non_pattern_modifier_tag,
+    MODIFIER_PATTERN_SET,
 )
 from .colors import color_tag
 from .suppliers import supplier_tag
 from .details import details_tag
 from .yields import yield_phrase_tag
 from .wildcard import wildcard_tag
+from .scheduler import TaggingStage, TaggingScheduler
 from ..utils import apply_pattern
+from ..profiling import profile_stage
+
+# Number of sentences tagged together by one worker in tag_sentences_sharded.
+SHARD_SIZE: int = 16
+
+# Taggers run more than once in tag_sentences. Repeat passes are only run on
+# sentences they could change, see TaggingScheduler.
+VESSEL_STAGE = TaggingStage(
+    vessel_tag, uses_word_bank=True, pattern_set=VESSEL_PATTERN_SET)
+QUANTITY_GROUP_STAGE = TaggingStage(
+    quantity_group_tag, pattern_set=QUANTITY_GROUP_PATTERN_SET)
+REAGENT_GROUP_STAGE = TaggingStage(reagent_group_tag)
+PATTERN_MODIFIER_STAGE = TaggingStage(
+    pattern_modifier_tag, uses_word_bank=True,
+    pattern_set=MODIFIER_PATTERN_SET)
+NON_PATTERN_MODIFIER_STAGE = TaggingStage(non_pattern_modifier_tag)
+
+@profile_stage
+def tag_synthesis(
+    synthesis_text: str,
+    pos_backend: Optional[PosTaggingBackend] = None,
+    sentence_cache: Optional[SentenceCache] = None,
+    executor: Optional[Executor] = None,
+) -> List[List[Word]]:
+    """Tag entities in synthesis text.
 
-def tag_synthesis(synthesis_text: str) -> List[List[Word]]:
+    Args:
+        synthesis_text (str): Description of synthetic procedure.
+        pos_backend (PosTaggingBackend): Backend to tokenize and POS tag text
+            with. If not given default NLTK backend is used.
+        sentence_cache (SentenceCache): Cache to look up and store tagged
+            sentences in. Optional.
+        executor (Executor): If given, shards of sentences are tagged in
+            parallel with this executor, see tag_sentences_sharded. Optional.
+
+    Returns:
+        List[List[Word]]: Tagged sentences.
+    """
     s = preprocess(synthesis_text)
-    sentences = tokenize_and_pos_tag(s)
+    if sentence_cache is not None:
+        return tag_sentences_with_cache(
+            s, sentence_cache, pos_backend, executor)
+
+    sentences = tokenize_and_pos_tag(s, pos_backend)
     word_bank = set([word.word.lower() for sent in sentences for word in sent])
+    if executor is not None:
+        return tag_sentences_sharded(sentences, word_bank, executor)
+    return tag_sentences(sentences, word_bank)
+
+def tag_sentences_with_cache(
+    synthesis_text: str,
+    sentence_cache: SentenceCache,
+    pos_backend: Optional[PosTaggingBackend] = None,
+    executor: Optional[Executor] = None,
+) -> List[List[Word]]:
+    """Tag preprocessed synthesis text, only tagging sentences that aren't
+    already in sentence_cache in the same context.
+
+    Args:
+        synthesis_text (str): Preprocessed description of synthetic procedure.
+        sentence_cache (SentenceCache): Cache to look up and store tagged
+            sentences in.
+        pos_backend (PosTaggingBackend): Backend to tokenize and POS tag text
+            with. If not given default NLTK backend is used.
+        executor (Executor): If given, sentences that aren't cached are tagged
+            in parallel with this executor. Optional.
+
+    Returns:
+        List[List[Word]]: Tagged sentences.
+    """
+    if pos_backend is None:
+        pos_backend = get_default_pos_backend()
+    sentence_texts = split_sentences(synthesis_text, pos_backend)
+
+    # Tokenize and POS tag sentences not in cache.
+    entries = [
+        sentence_cache.get_entry(sentence_text, pos_backend)
+        for sentence_text in sentence_texts
+    ]
+    uncached = [i for i, entry in enumerate(entries) if entry is None]
+    new_sentences = tokenize_and_pos_tag_sentences(
+        [sentence_texts[i] for i in uncached], pos_backend)
+    for i, words in zip(uncached, new_sentences):
+        entries[i] = sentence_cache.add_entry(
+            sentence_texts[i], words, pos_backend)
+
+    word_bank = set()
+    for entry in entries:
+        word_bank.update(entry.word_bank)
+
+    # Look up tagged sentences, tag the rest together.
+    sentences = []
+    untagged = []
+    for i, entry in enumerate(entries):
+        context = sentence_cache.context_key(i == 0, word_bank)
+        tagged = sentence_cache.get_tagged(entry, context)
+        if tagged is None:
+            untagged.append((i, context))
+            tagged = entry.get_words()
+        sentences.append(tagged)
+
+    if untagged:
+        to_tag = [sentences[i] for i, _ in untagged]
+        # Empty first sentence stands in for the real first sentence, so that
+        # convert_unused_technique_words doesn't skip a later sentence.
+        if untagged[0][0] != 0:
+            to_tag.insert(0, [])
+        if executor is not None:
+            tagged_sentences = tag_sentences_sharded(
+                to_tag, word_bank, executor)
+        else:
+            tagged_sentences = tag_sentences(to_tag, word_bank)
+        if untagged[0][0] != 0:
+            tagged_sentences.pop(0)
+        for (i, context), tagged in zip(untagged, tagged_sentences):
+            sentences[i] = tagged
+            sentence_cache.add_tagged(entries[i], context, tagged)
 
+    return sentences
+
+def tag_sentences(
+        sentences: List[List[Word]], word_bank: Set[str]) -> List[List[Word]]:
+    """Apply all taggers to tokenized, POS tagged sentences.
+
+    Args:
+        sentences (List[List[Word]]): Sentences to tag.
+        word_bank (Set[str]): Lower case words in procedure, used to skip
+            patterns that can't match.
+
+    Returns:
+        List[List[Word]]: Tagged sentences.
+    """
+    scheduler = TaggingScheduler(sentences, word_bank)
     auxiliary_verb_tag(sentences)
     technique_tag(sentences, word_bank)
-    vessel_tag(sentences, word_bank)
+    scheduler.run(VESSEL_STAGE)
     supplier_tag(sentences)
     color_tag(sentences, word_bank)
     past_tense_action_tag(sentences, word_bank)
     quantity_tag(sentences)
-    vessel_tag(sentences, word_bank)
+    scheduler.run(VESSEL_STAGE)
     vessel_component_group_tag(sentences)
     expand_vessels(sentences)
 
     # This has to be done to match '40 % in water' as ReagentName needed to tag
     # PercentInSolventWord and then this has to become part of QuantityGroups.
-    pattern_modifier_tag(sentences, word_bank)
-    quantity_group_tag(sentences)
+    scheduler.run(PATTERN_MODIFIER_STAGE)
+    scheduler.run(QUANTITY_GROUP_STAGE)
     apply_pattern([TimeWord], TimeModifier, sentences)
 
     reagent_placeholder_tag(sentences, word_bank)
     reagent_name_tag(sentences)
     percent_in_solvent_tag(sentences)
-    quantity_group_tag(sentences)
+    scheduler.run(QUANTITY_GROUP_STAGE)
 
     reagent_tag(sentences)
-    reagent_group_tag(sentences)
+    scheduler.run(REAGENT_GROUP_STAGE)
     solution_tag(sentences)
     mixture_tag(sentences)
-    reagent_group_tag(sentences)
-    pattern_modifier_tag(sentences, word_bank)
+    scheduler.run(REAGENT_GROUP_STAGE)
+    scheduler.run(PATTERN_MODIFIER_STAGE)
     yield_phrase_tag(sentences, word_bank)
-    non_pattern_modifier_tag(sentences)
+    scheduler.run(NON_PATTERN_MODIFIER_STAGE)
     # Present tense actions tagged after modifiers so 'with stirring' tagged as
     # modifier not as action.
     convert_unused_technique_words(sentences)
     present_tense_action_tag(sentences, word_bank)
     details_tag(sentences)
     # Second modifier tag for present tense actions
-    pattern_modifier_tag(sentences, word_bank)
-    non_pattern_modifier_tag(sentences)
+    scheduler.run(PATTERN_MODIFIER_STAGE)
+    scheduler.run(NON_PATTERN_MODIFIER_STAGE)
     discontinue_action_tag(sentences)
     wildcard_tag(sentences)
     apply_pattern([TempWord], TemperatureModifier, sentences)
     apply_pattern([PressureWord], PressureModifier, sentences)
     return sentences
 
+def tag_shard(
+    sentences: List[List[Word]], word_bank: Set[str], is_first_shard: bool
+) -> List[List[Word]]:
+    """Apply all taggers to a shard of sentences from a procedure, with the
+    same result as tagging them together with the rest of the procedure.
+
+    Args:
+        sentences (List[List[Word]]): Sentences to tag.
+        word_bank (Set[str]): Lower case words in whole procedure.
+        is_first_shard (bool): True if shard starts with the first sentence of
+            the procedure.
+
+    Returns:
+        List[List[Word]]: Tagged sentences.
+    """
+    if is_first_shard:
+        return tag_sentences(sentences, word_bank)
+    # Empty first sentence stands in for the real first sentence, so that
+    # convert_unused_technique_words doesn't skip the first sentence of shard.
+    return tag_sentences([[]] + sentences, word_bank)[1:]
+
+def tag_sentences_sharded(
+    sentences: List[List[Word]],
+    word_bank: Set[str],
+    executor: Executor,
+    shard_size: int = SHARD_SIZE,
+) -> List[List[Word]]:
+    """Apply all taggers to sentences, tagging shards of consecutive sentences
+    in parallel, with the same result as tag_sentences.
+
+    All taggers work on each sentence independently. The only things they
+    use from the rest of the procedure are word_bank, which is computed once
+    for the whole procedure and passed to every shard, and whether a sentence
+    is the first in the procedure, so shards can be tagged separately and
+    concatenated.
+
+    executor can be a thread pool or a process pool. Threads share the module
+    level pattern sets, which compile and grow their automatons under a lock.
+    For worker processes to be fast, executor should be reused between calls,
+    as compiled patterns are cached in every worker. batch.init_worker can be
+    used as the initializer of a ProcessPoolExecutor to load them up front.
+
+    Args:
+        sentences (List[List[Word]]): Sentences to tag.
+        word_bank (Set[str]): Lower case words in procedure.
+        executor (Executor): Executor to tag shards with.
+        shard_size (int): Number of sentences in each shard.
+
+    Returns:
+        List[List[Word]]: Tagged sentences.
+    """
+    if len(sentences) <= shard_size:
+        return tag_sentences(sentences, word_bank)
+    futures = [
+        executor.submit(
+            tag_shard, sentences[i:i + shard_size], word_bank, i == 0)
+        for i in range(0, len(sentences), shard_size)
+    ]
+    tagged_sentences = []
+    for future in futures:
+        tagged_sentences.extend(future.result())
+    return tagged_sentences
+
+@profile_stage
 def convert_unused_technique_words(
         sentences: List[List[Word]]) -> List[List[Word]]:
     """If TechniqueWords are left after modifier tagging, they should be
@@ -1,6 +1,7 @@
 from typing import List
 from ..words import Word, TechniqueWord
-from ..utils import apply_pattern, trim_patterns
+from ..utils import apply_pattern, PatternVocabulary
+from ..profiling import profile_stage
 
 TECHNIQUE_PATTERNS = [
     ['filtration'],
@@ -23,6 +24,9 @@ TECHNIQUE_PATTERNS = [
 
 TECHNIQUE_PATTERNS = sorted(TECHNIQUE_PATTERNS, key=lambda x: 1 / len(x))
 
+TECHNIQUE_VOCABULARY = PatternVocabulary(TECHNIQUE_PATTERNS)
+
+@profile_stage
 def technique_tag(sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Find techniques in sentences and return sentences with TechniqueWords.
 
@@ -33,6 +37,6 @@ def technique_tag(sentences: List[List[Word]], word_bank) -> List[List[Word]]:
         List[List[Word]]: Sentences with action phrases combined into
             ActionWords.
     """
-    for pattern in trim_patterns(TECHNIQUE_PATTERNS, word_bank):
+    for pattern in TECHNIQUE_VOCABULARY.trim(word_bank):
         apply_pattern(pattern, TechniqueWord, sentences)
     return sentences
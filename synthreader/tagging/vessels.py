@@ -1,9 +1,7 @@
 from typing import List
-import copy
 from ..utils import (
-    apply_pattern,
+    compile_patterns,
     copy_and_modify_pattern,
-    trim_patterns,
     Pos,
     Optional
 )
@@ -17,6 +15,7 @@ from ..words import (
     NumberWord,
     TechniqueWord
 )
+from ..profiling import profile_stage
 
 VESSEL_PATTERNS = [
     ['round-bottom', 'flask'],
@@ -154,7 +153,7 @@ COMPONENT_PATTERNS.extend(extra_patterns)
 extra_patterns = []
 for item in COMPONENT_PATTERNS:
     for i in range(5):
-        extra_pattern = copy.deepcopy(item)
+        extra_pattern = list(item)
         for _ in range(i):
             extra_pattern.insert(0, Optional(Pos('JJ')))
         extra_patterns.append(extra_pattern)
@@ -186,6 +185,21 @@ COMPONENT_GROUP_PATTERNS = [
 COMPONENT_GROUP_PATTERNS = sorted(
     COMPONENT_GROUP_PATTERNS, key=lambda x: 1 / len(x))
 
+VESSEL_PATTERN_SET = compile_patterns(
+    [(pattern, VesselWord) for pattern in VESSEL_PATTERNS]
+    + [(pattern, VesselComponentWord) for pattern in COMPONENT_PATTERNS]
+    + [(pattern, BathWord) for pattern in BATH_PATTERNS]
+    + [
+        # A 5l flask
+        ([Pos('DT'), QuantityWord, VesselWord], VesselWord),
+        ([Pos('DT'), QuantityWord, VesselComponentWord], VesselComponentWord),
+    ]
+)
+
+COMPONENT_GROUP_PATTERN_SET = compile_patterns(
+    COMPONENT_GROUP_PATTERNS, VesselComponentGroupWord)
+
+@profile_stage
 def vessel_tag(sentences: List[List[Word]], word_bank) -> List[List[Word]]:
     """Find vessels in sentences and return sentences with VesselWords.
 
@@ -196,25 +210,13 @@ def vessel_tag(sentences: List[List[Word]], word_bank) -> List[List[Word]]:
         List[List[Word]]: Sentences with vessel phrases combined into
             VesselWords.
     """
-    for pattern in trim_patterns(VESSEL_PATTERNS, word_bank):
-        apply_pattern(pattern, VesselWord, sentences)
-    for pattern in trim_patterns(COMPONENT_PATTERNS, word_bank):
-        apply_pattern(pattern, VesselComponentWord, sentences)
-    for pattern in trim_patterns(BATH_PATTERNS, word_bank):
-        apply_pattern(pattern, BathWord, sentences)
-
-    # A 5l flask
-    apply_pattern([Pos('DT'), QuantityWord, VesselWord], VesselWord, sentences)
-    apply_pattern([Pos('DT'), QuantityWord, VesselComponentWord],
-                  VesselComponentWord, sentences)
-
-    return sentences
+    return VESSEL_PATTERN_SET.apply(sentences, word_bank)
 
+@profile_stage
 def vessel_component_group_tag(sentences):
-    for pattern in COMPONENT_GROUP_PATTERNS:
-        apply_pattern(pattern, VesselComponentGroupWord, sentences)
-    return sentences
+    return COMPONENT_GROUP_PATTERN_SET.apply(sentences)
 
+@profile_stage
 def expand_vessels(sentences):
     """If vessel preceded by adjectives, combine these into longer word."""
     for sentence in sentences:
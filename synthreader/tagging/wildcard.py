@@ -1,6 +1,7 @@
 from ..utils import apply_pattern, Optional, Pos
 from ..words import ReagentPlaceholderWord
 from ..words.modifiers import Modifier
+from ..profiling import profile_stage
 
 WILDCARD_PATTERNS = [
     ([Pos('IN'), Optional(Pos('DT')), Optional(Pos('JJ')),
@@ -11,6 +12,7 @@ WILDCARD_PATTERNS = [
     ([Pos('DT'), Optional(Pos('JJ')), Pos('NN')], ReagentPlaceholderWord)
 ]
 
+@profile_stage
 def wildcard_tag(sentences):
     """At end of tagging, tag unmatched phrases with certain POS patterns as
     generic types so that interpreting pattern matching is not messed up.
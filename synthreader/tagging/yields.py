@@ -1,6 +1,7 @@
 import copy
-from ..utils import apply_pattern, trim_patterns
+from ..utils import apply_pattern, PatternVocabulary
 from ..words import YieldPhraseWord, QuantityGroupWord, QuantityWord
+from ..profiling import profile_stage
 
 YIELD_PATTERNS = [
     ['yielding', QuantityWord],
@@ -18,6 +19,9 @@ for pattern in YIELD_PATTERNS:
     extra_patterns.append(extra_pattern)
 YIELD_PATTERNS.extend(extra_patterns)
 
+YIELD_VOCABULARY = PatternVocabulary(YIELD_PATTERNS)
+
+@profile_stage
 def yield_phrase_tag(sentences, word_bank):
-    for pattern in trim_patterns(YIELD_PATTERNS, word_bank):
+    for pattern in YIELD_VOCABULARY.trim(word_bank):
         apply_pattern(pattern, YieldPhraseWord, sentences)
@@ -1,3 +1,12 @@
-from .pattern_matcher import apply_pattern, Optional, Pos, AnyOf
+from .pattern_matcher import (
+    apply_pattern,
+    compile_patterns,
+    PatternSet,
+    FirstTokenIndex,
+    PatternVocabulary,
+    Optional,
+    Pos,
+    AnyOf,
+)
 from .pattern_handling import (
     copy_and_modify_pattern, trim_patterns, sort_patterns)
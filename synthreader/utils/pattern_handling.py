@@ -1,6 +1,5 @@
 from typing import List, Union, Any
-import copy
-from . import Optional
+from . import Optional, PatternVocabulary
 
 def sort_patterns(patterns: List[List[Any]], types_included: bool = False):
     """Sort patterns from longest to shortest not including Optional items when
@@ -32,7 +31,8 @@ def copy_and_modify_pattern(
     mod_obj: Union[type, str],
     mode: str,
 ) -> List[Union[type, str]]:
-    """Copy pattern, modify it and return the modified pattern.
+    """Copy pattern, modify it and return the modified pattern. Pattern items
+    are never modified, so they are shared with the original pattern.
 
     Args:
         pattern (List[Union[type, str]]): Pattern to copy.
@@ -45,7 +45,7 @@ def copy_and_modify_pattern(
         List[Union[type, str]]: Copy of pattern with object at mod_index
             replaced by mod_obj.
     """
-    new_pattern = copy.deepcopy(pattern)
+    new_pattern = list(pattern)
     if mode == 'replace':
         new_pattern[mod_index] = mod_obj
     elif mode == 'insert':
@@ -53,13 +53,15 @@ def copy_and_modify_pattern(
     return new_pattern
 
 def trim_patterns(patterns, word_bank):
-    patterns = copy.deepcopy(patterns)
-    for i in reversed(range(len(patterns))):
-        pattern = patterns[i]
-        if type(pattern[0]) == list:
-            pattern = pattern[0]
-        for item in pattern:
-            if type(item) == str and item.lower() not in word_bank:
-                patterns.pop(i)
-                break
-    return patterns
+    """Return patterns whose literal words are all in word_bank. Patterns are
+    not copied. To trim the same patterns for many procedures, create a
+    PatternVocabulary once and use PatternVocabulary.trim instead.
+
+    Args:
+        patterns (List[Any]): Patterns, or (pattern, ...) tuples or lists.
+        word_bank (Set[str]): Lower case words in procedure.
+
+    Returns:
+        List[Any]: Patterns that can be used given word_bank.
+    """
+    return PatternVocabulary(patterns).trim(word_bank)
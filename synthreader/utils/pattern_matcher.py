@@ -1,6 +1,8 @@
-from typing import Type, List, Union, Tuple
+from typing import Type, List, Set, Union, Tuple, Dict, Callable, Any
 import re
+import threading
 from ..words import Word
+from .. import profiling
 
 class Optional(Word):
     def __init__(self, word):
@@ -40,81 +42,150 @@ def apply_pattern(
     """
     i = 0
     while i < len(sentences):
-        words = sentences[i]
-        j = 0
-        while j < len(words):
-            pattern_match = True
-            pattern_idx = 0  # Index into pattern
-            sentence_idx = 0  # Index into sentence
-
-            # These need to be handled separately for OPTIONAL words.
-            while pattern_idx < len(pattern):
-                # If sentence index within sentence.
-                if j + sentence_idx < len(words):
-                    # Get target from pattern and word from words.
-                    target = pattern[pattern_idx]
-                    word = words[j + sentence_idx]
-                    if type(target) == Optional:
-
-                        # Try optional word
-                        if is_match(target.word, word):
-                            pattern_idx += 1
-                            sentence_idx += 1
-                            continue
-
-                        else:
-                            # Optional word not found, try next item in pattern
-                            if pattern_idx + 1 < len(pattern):
-                                pattern_idx += 1
-                                continue
-                            # Optional word not found and end of pattern reached
-                            else:
-                                break
-
-                    # If target and word don't match, break otherwise continue
-                    elif not is_match(target, word):
-                        pattern_match = False
-                        break
+        apply_pattern_to_sentence(
+            pattern, word_class, sentences[i], replace_pos=replace_pos)
+        i += 1
+    return sentences
+
+def apply_pattern_to_sentence(
+    pattern: List[Union[Type[Word], str, int]],
+    word_class: Type[Word],
+    words: List[Word],
+    replace_pos: Union[int, Tuple[int, int]] = None,
+    start: int = 0,
+) -> bool:
+    """Apply pattern to a single sentence in place, exactly as apply_pattern
+    does for every sentence it is given.
+
+    Args:
+        pattern (List[Union[Type[Word], str]]): Pattern to look for.
+        word_class (Type[Word]): Class to instantiate with pattern match.
+        words (List[Word]): Sentence to find and replace pattern in.
+        replace_pos (Union[int, Tuple[int, int]]): Position in pattern to
+            use for instantiating word_class. If not given entire pattern is
+            used.
+        start (int): Index in sentence to start looking for matches at. Only
+            useful if it is known there are no matches before this index.
+
+    Returns:
+        bool: True if any matches were replaced, otherwise False.
+    """
+    # Rather than deleting and inserting in words for every match, which is
+    # quadratic in sentence length, words that can no longer change are
+    # appended to an output buffer which replaces the contents of words at the
+    # end. Scanning resumes right after the first new word, so any extra new
+    # words are put back in front of the words still to be scanned.
+    replaced = False
+    output = words[:start]
+    remaining = words
+    j = start
+    while j < len(remaining):
+        end_i = match_pattern_at(pattern, remaining, j)
+        if end_i is None:
+            output.append(remaining[j])
+            j += 1
+            continue
+
+        start_i = j
+        if replace_pos:
+            if type(replace_pos) == int:
+                start_i = j + replace_pos
+                end_i = start_i + 1
+            else:
+                start_i = j + replace_pos[0]
+                end_i = j + replace_pos[1]
+        end_i = max(start_i, end_i)
+        # Normal tagging where type is specified.
+        if type(word_class) == type:
+            new_words = [word_class(remaining[start_i: end_i])]
+        # In interpreting lambda functions are used to return list of
+        # Action objects.
+        elif callable(word_class):
+            new_words = word_class(remaining[start_i: end_i])
+        replaced = True
+        if profiling.PROFILER is not None:
+            profiling.PROFILER.count_pattern_match(pattern, word_class)
+
+        # Words skipped over by replace_pos are not scanned again.
+        output.extend(remaining[j: start_i])
+        if not new_words:
+            # Word after match is skipped, as it takes the place of the match.
+            output.extend(remaining[end_i: end_i + 1])
+            j = end_i + 1
+        else:
+            output.append(new_words[0])
+            if len(new_words) > 1:
+                remaining = new_words[1:] + remaining[end_i:]
+                j = 0
+            else:
+                j = end_i
+
+    if replaced:
+        words[:] = output
+    return replaced
+
+def match_pattern_at(
+    pattern: List[Union[Type[Word], str, int]],
+    words: List[Word],
+    j: int
+) -> Union[int, None]:
+    """Try to match pattern against words starting at index j. Optional items
+    are greedy, if they match the word they are always used.
+
+    Args:
+        pattern (List[Union[Type[Word], str]]): Pattern to look for.
+        words (List[Word]): Sentence to look for pattern in.
+        j (int): Index in words to start match at.
+
+    Returns:
+        Union[int, None]: Index in words where the match ends (exclusive) or
+            None if pattern does not match at j.
+    """
+    pattern_idx = 0  # Index into pattern
+    sentence_idx = 0  # Index into sentence
+
+    # These need to be handled separately for OPTIONAL words.
+    while pattern_idx < len(pattern):
+        # If sentence index within sentence.
+        if j + sentence_idx < len(words):
+            # Get target from pattern and word from words.
+            target = pattern[pattern_idx]
+            word = words[j + sentence_idx]
+            if type(target) == Optional:
+
+                # Try optional word
+                if is_match(target.word, word):
+                    pattern_idx += 1
+                    sentence_idx += 1
+                    continue
 
-                # If sentence index not within sentence break.
                 else:
-                    if all([
-                        type(item) == Optional
-                        for item in pattern[pattern_idx:]]
-                    ):
-                        break
+                    # Optional word not found, try next item in pattern
+                    if pattern_idx + 1 < len(pattern):
+                        pattern_idx += 1
+                        continue
+                    # Optional word not found and end of pattern reached
                     else:
-                        pattern_match = False
                         break
 
-                pattern_idx += 1
-                sentence_idx += 1
+            # If target and word don't match, break otherwise continue
+            elif not is_match(target, word):
+                return None
 
-            start_i = j
-            if pattern_match:
-                if replace_pos:
-                    if type(replace_pos) == int:
-                        start_i = j + replace_pos
-                        end_i = start_i + 1
-                    else:
-                        start_i = j + replace_pos[0]
-                        end_i = j + replace_pos[1]
-                else:
-                    start_i = j
-                    end_i = j + sentence_idx
-                # Normal tagging where type is specified.
-                if type(word_class) == type:
-                    new_words = [word_class(words[start_i: end_i])]
-                # In interpreting lambda functions are used to return list of
-                # Action objects.
-                elif callable(word_class):
-                    new_words = word_class(words[start_i: end_i])
-                del sentences[i][start_i: end_i]
-                for item in reversed(new_words):
-                    sentences[i].insert(start_i, item)
-            j = start_i + 1
-        i += 1
-    return sentences
+        # If sentence index not within sentence break.
+        else:
+            if all([
+                type(item) == Optional
+                for item in pattern[pattern_idx:]]
+            ):
+                break
+            else:
+                return None
+
+        pattern_idx += 1
+        sentence_idx += 1
+
+    return j + sentence_idx
 
 def is_match(target: Union[type, str], word: Word) -> bool:
     """Return True is word is a match for target, otherwise False.
@@ -160,3 +231,602 @@ def is_match(target: Union[type, str], word: Word) -> bool:
     elif type(target) == Optional:
         return False
     return True
+
+#####################
+# COMPILED PATTERNS #
+#####################
+
+# Kinds of compiled target, see PatternSet._compile_target.
+TARGET_TYPE = 0
+TARGET_LITERAL = 1
+TARGET_REGEXP = 2
+TARGET_POS = 3
+TARGET_ANY_OF = 4
+TARGET_NEVER = 5
+TARGET_ALWAYS = 6
+
+class FirstTokenIndex(object):
+    """Index from the first word of a pattern match to the patterns that can
+    start with that word, so that at each position in a sentence only patterns
+    whose first item can match are tried.
+
+    Literal words are indexed lower case, Word classes are looked up through
+    the MRO of the word's type. Leading Optional items are skipped over, so a
+    pattern starting with Optional is indexed under the Optional target and
+    every target after it up to the first required item. Patterns that could
+    match anything first, or only contain Optional items, are always tried.
+
+    Args:
+        patterns (List[List[Any]]): Patterns to index.
+    """
+    def __init__(self, patterns: List[List[Any]]):
+        self.by_literal: Dict[str, List[int]] = {}
+        self.by_class: Dict[type, List[int]] = {}
+        self.by_pos: List[Tuple[str, int]] = []
+        self.always: List[int] = []
+        for pattern_i, pattern in enumerate(patterns):
+            all_optional = True
+            for item in pattern:
+                if type(item) == Optional:
+                    self._add(item.word, pattern_i)
+                else:
+                    self._add(item, pattern_i)
+                    all_optional = False
+                    break
+            if all_optional:
+                self.always.append(pattern_i)
+        self._candidates: Dict[Any, Tuple[int, ...]] = {}
+
+    def _add(self, target: Any, pattern_i: int) -> None:
+        """Index pattern under target, mirroring the branches of is_match."""
+        if type(target) == type:
+            self.by_class.setdefault(target, []).append(pattern_i)
+        elif type(target) == str:
+            self.by_literal.setdefault(target.lower(), []).append(pattern_i)
+        elif type(target) == Pos:
+            self.by_pos.append((target.pos, pattern_i))
+        elif type(target) == AnyOf:
+            for subtarget in target.words:
+                self._add(subtarget, pattern_i)
+        # Optional can never match a word so doesn't need to be indexed.
+        elif type(target) != Optional:
+            self.always.append(pattern_i)
+
+    def candidates(self, word: Word) -> Tuple[int, ...]:
+        """Return indexes of patterns that could start a match at word.
+
+        Args:
+            word (Word): First word of potential pattern match.
+
+        Returns:
+            Tuple[int, ...]: Sorted indexes of patterns that could match
+                starting at word.
+        """
+        word_type = type(word)
+        key = (word.word, word.pos) if word_type == Word else word_type
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = set(self.always)
+            for cls in word_type.__mro__:
+                candidates.update(self.by_class.get(cls, []))
+            if word_type == Word:
+                candidates.update(self.by_literal.get(word.word.lower(), []))
+                for pos, pattern_i in self.by_pos:
+                    if word.pos.startswith(pos):
+                        candidates.add(pattern_i)
+            candidates = tuple(sorted(candidates))
+            self._candidates[key] = candidates
+        return candidates
+
+# Maximum number of word_bank vocabularies to cache active patterns for in a
+# PatternVocabulary. Cache is cleared when this is reached.
+ACTIVE_PATTERN_CACHE_SIZE: int = 1000
+
+class PatternVocabulary(object):
+    """Literal words every pattern needs to be usable in a procedure, with an
+    inverted index from word to patterns, computed once so that the patterns
+    trim_patterns would keep for a word_bank can be found without copying or
+    scanning every pattern.
+
+    Only the part of word_bank that is in the vocabulary of the patterns
+    affects which patterns are active, so active patterns are cached on that.
+
+    Args:
+        patterns (List[Any]): Patterns, or (pattern, ...) tuples or lists as
+            passed to trim_patterns.
+    """
+    def __init__(self, patterns: List[Any]):
+        self.patterns = list(patterns)
+        #: Number of distinct required words of every pattern.
+        self.n_required: List[int] = []
+        #: Lower case word -> indexes of patterns requiring it.
+        self.index: Dict[str, List[int]] = {}
+        for pattern_i, pattern in enumerate(self.patterns):
+            if type(pattern[0]) == list:
+                pattern = pattern[0]
+            required_words = set(
+                [item.lower() for item in pattern if type(item) == str])
+            self.n_required.append(len(required_words))
+            for word in required_words:
+                self.index.setdefault(word, []).append(pattern_i)
+        self.words = frozenset(self.index)
+        self._all_active = [True for _ in self.patterns]
+        self._active: Dict[frozenset, List[bool]] = {}
+
+    def active(self, word_bank: Set[str] = None) -> List[bool]:
+        """Return list of bools saying which patterns can be used given
+        word_bank, i.e. all their literal words are in word_bank. The list is
+        shared between calls so mustn't be modified.
+
+        Args:
+            word_bank (Set[str]): Lower case words in procedure. If None all
+                patterns are active.
+
+        Returns:
+            List[bool]: True for every pattern that can be used.
+        """
+        if word_bank is None:
+            return self._all_active
+        vocabulary = self.words.intersection(word_bank)
+        active = self._active.get(vocabulary)
+        if active is None:
+            missing = list(self.n_required)
+            for word in vocabulary:
+                for pattern_i in self.index[word]:
+                    missing[pattern_i] -= 1
+            active = [n_missing == 0 for n_missing in missing]
+            if len(self._active) >= ACTIVE_PATTERN_CACHE_SIZE:
+                self._active.clear()
+            self._active[vocabulary] = active
+        return active
+
+    def trim(self, word_bank: Set[str]) -> List[Any]:
+        """Return patterns that can be used given word_bank, with the same
+        result as trim_patterns but without copying patterns.
+
+        Args:
+            word_bank (Set[str]): Lower case words in procedure.
+
+        Returns:
+            List[Any]: Patterns whose literal words are all in word_bank.
+        """
+        return [
+            pattern
+            for pattern, is_active in zip(self.patterns, self.active(word_bank))
+            if is_active
+        ]
+
+class PatternSet(object):
+    """A list of patterns compiled into a single automaton so that every
+    pattern can be searched for in one pass over a sentence, instead of one
+    pass per pattern.
+
+    Every word in a sentence is reduced to a signature, the set of compiled
+    targets it matches. The automaton states are sets of (pattern_i, item_i)
+    pairs that are still being matched, and transitions between them are built
+    lazily and cached on (state, signature), so after warming up matching a
+    word against hundreds of patterns is a dict lookup. Matches are only
+    started at a word with the patterns the FirstTokenIndex says can start
+    there.
+
+    Applying a PatternSet gives exactly the same result as calling
+    apply_pattern with every pattern in order. Only patterns that match
+    somewhere in a sentence are actually applied to it, and the sentence is
+    searched again after anything is replaced, as replacements can create or
+    destroy matches for later patterns.
+
+    Pattern sets are shared module level objects, so compiling and adding
+    automaton states is done under a lock, and a set can be used from several
+    threads at once.
+
+    Args:
+        patterns (List[Tuple]): List of (pattern, word_class) or
+            (pattern, word_class, replace_pos) tuples, in the order they should
+            be applied. Items of any other length are ignored.
+    """
+    def __init__(self, patterns: List[Tuple]):
+        self.patterns = []
+        for item in patterns:
+            if len(item) == 2:
+                self.patterns.append((item[0], item[1], None))
+            elif len(item) == 3:
+                self.patterns.append(tuple(item))
+        self.compiled = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    ###############
+    # COMPILATION #
+    ###############
+
+    def compile(self) -> None:
+        """Compile patterns. Done on first use rather than on creation, as
+        pattern sets are created at import time and compiling all of them
+        takes a significant part of the import time of the package.
+        """
+        with self._lock:
+            if not self.compiled:
+                self._compile()
+
+    def _compile(self) -> None:
+        self._target_ids: Dict[Any, int] = {}
+        self._targets: List[Tuple[int, Any]] = []
+        self._type_targets: List[Tuple[int, type]] = []
+        self._literal_targets: Dict[str, List[int]] = {}
+        self._pos_targets: List[Tuple[int, str]] = []
+        self._regexp_targets: List[Tuple[int, Any]] = []
+        self._any_of_targets: List[Tuple[int, Tuple[int, ...]]] = []
+        self._always_targets: List[int] = []
+
+        # Pattern items as (is_optional, target_id) tuples.
+        self._compiled: List[Tuple[Tuple[bool, int], ...]] = []
+        for pattern, _, _ in self.patterns:
+            self._compiled.append(tuple(
+                (True, self._compile_target(item.word))
+                if type(item) == Optional
+                else (False, self._compile_target(item))
+                for item in pattern
+            ))
+        # Literal words needed for pattern to survive trim_patterns.
+        self.vocabulary = PatternVocabulary(
+            [pattern for pattern, _, _ in self.patterns])
+
+        self._states: Dict[Tuple, int] = {}
+        self._state_items: List[Tuple[Tuple[int, int], ...]] = []
+        self._transitions: Dict[Tuple[int, frozenset], Tuple] = {}
+        self._end_accepts: Dict[int, Tuple[int, ...]] = {}
+        self._type_signatures: Dict[type, List[int]] = {}
+        self._pos_signatures: Dict[str, List[int]] = {}
+        self._signatures: Dict[Any, frozenset] = {}
+        self.first_token_index = FirstTokenIndex(
+            [pattern for pattern, _, _ in self.patterns])
+        self._initial_states: Dict[Tuple[int, ...], int] = {}
+        self.compiled = True
+
+    def _compile_target(self, target: Any) -> int:
+        """Return id of compiled target, compiling it if it hasn't been seen
+        before. Targets mirror the branches of is_match.
+        """
+        if type(target) == type:
+            key = (TARGET_TYPE, target)
+        elif type(target) == str:
+            key = (TARGET_LITERAL, target.lower())
+        elif type(target) == Regexp:
+            key = (TARGET_REGEXP, target.regexp)
+        elif type(target) == Pos:
+            key = (TARGET_POS, target.pos)
+        elif type(target) == AnyOf:
+            # Sub targets compiled first so they are always evaluated before
+            # the AnyOf that depends on them.
+            key = (TARGET_ANY_OF, tuple(
+                self._compile_target(subtarget) for subtarget in target.words))
+        elif type(target) == Optional:
+            key = (TARGET_NEVER, None)
+        else:
+            key = (TARGET_ALWAYS, None)
+
+        if key in self._target_ids:
+            return self._target_ids[key]
+
+        target_id = len(self._targets)
+        self._target_ids[key] = target_id
+        self._targets.append(key)
+        kind, value = key
+        if kind == TARGET_TYPE:
+            self._type_targets.append((target_id, value))
+        elif kind == TARGET_LITERAL:
+            self._literal_targets.setdefault(value, []).append(target_id)
+        elif kind == TARGET_REGEXP:
+            self._regexp_targets.append((target_id, re.compile(value)))
+        elif kind == TARGET_POS:
+            self._pos_targets.append((target_id, value))
+        elif kind == TARGET_ANY_OF:
+            self._any_of_targets.append((target_id, value))
+        elif kind == TARGET_ALWAYS:
+            self._always_targets.append(target_id)
+        return target_id
+
+    def _get_state(self, items: Tuple[Tuple[int, int], ...]) -> int:
+        """Return id of automaton state made up of given items."""
+        state = self._states.get(items)
+        if state is None:
+            # New states are added under lock so that threads adding the same
+            # state at once get the same id. Items are added before the id is
+            # visible in _states, so any id found there is always valid.
+            with self._lock:
+                state = self._states.get(items)
+                if state is None:
+                    state = len(self._state_items)
+                    self._state_items.append(items)
+                    self._states[items] = state
+        return state
+
+    ##############
+    # SIGNATURES #
+    ##############
+
+    def signature(self, word: Word) -> frozenset:
+        """Return frozenset of ids of all compiled targets that match word.
+
+        Args:
+            word (Word): Word to get signature of.
+
+        Returns:
+            frozenset: Ids of all targets word matches.
+        """
+        word_type = type(word)
+        if word_type == Word:
+            key = (word.word, word.pos)
+        elif not self._regexp_targets:
+            key = word_type
+        else:
+            # str of compound words can change so can't be cached.
+            return self._make_signature(word)
+
+        signature = self._signatures.get(key)
+        if signature is None:
+            signature = self._make_signature(word)
+            self._signatures[key] = signature
+        return signature
+
+    def can_match(self, word: Word) -> bool:
+        """Return True if word can be part of a match of any pattern, i.e. it
+        matches at least one target.
+
+        Args:
+            word (Word): Word to check.
+
+        Returns:
+            bool: False if word can't be part of any match, otherwise True.
+        """
+        if not self.compiled:
+            self.compile()
+        return bool(self.signature(word))
+
+    def _make_signature(self, word: Word) -> frozenset:
+        word_type = type(word)
+        matches = set(self._always_targets)
+
+        type_matches = self._type_signatures.get(word_type)
+        if type_matches is None:
+            type_matches = [target_id
+                            for target_id, target in self._type_targets
+                            if isinstance(word, target)]
+            self._type_signatures[word_type] = type_matches
+        matches.update(type_matches)
+
+        if word_type == Word:
+            matches.update(self._literal_targets.get(word.word.lower(), []))
+            pos_matches = self._pos_signatures.get(word.pos)
+            if pos_matches is None:
+                pos_matches = [target_id
+                               for target_id, pos in self._pos_targets
+                               if word.pos.startswith(pos)]
+                self._pos_signatures[word.pos] = pos_matches
+            matches.update(pos_matches)
+
+        for target_id, regexp in self._regexp_targets:
+            if regexp.match(str(word)):
+                matches.add(target_id)
+
+        for target_id, subtargets in self._any_of_targets:
+            if any(subtarget in matches for subtarget in subtargets):
+                matches.add(target_id)
+
+        return frozenset(matches)
+
+    ###############
+    # TRANSITIONS #
+    ###############
+
+    def _step(self, state: int, signature: frozenset) -> Tuple:
+        """Return (next_state, consumed_accepts, accepts) for a word with
+        given signature in given state. consumed_accepts are patterns that
+        matched including the word, accepts are patterns that matched ending
+        just before it. next_state is None if no patterns are left alive.
+        """
+        key = (state, signature)
+        transition = self._transitions.get(key)
+        if transition is not None:
+            return transition
+
+        next_items = []
+        consumed_accepts = []
+        accepts = []
+        for pattern_i, item_i in self._state_items[state]:
+            compiled = self._compiled[pattern_i]
+            while True:
+                if item_i >= len(compiled):
+                    accepts.append(pattern_i)
+                    break
+                optional, target_id = compiled[item_i]
+                if target_id in signature:
+                    item_i += 1
+                    if item_i == len(compiled):
+                        consumed_accepts.append(pattern_i)
+                    else:
+                        next_items.append((pattern_i, item_i))
+                    break
+                elif not optional:
+                    break
+                # Optional word not found, try next item in pattern
+                elif item_i + 1 < len(compiled):
+                    item_i += 1
+                # Optional word not found and end of pattern reached
+                else:
+                    accepts.append(pattern_i)
+                    break
+
+        next_state = None
+        if next_items:
+            next_state = self._get_state(tuple(sorted(next_items)))
+        transition = (next_state, tuple(consumed_accepts), tuple(accepts))
+        # Another thread may have added the same transition in the meantime.
+        return self._transitions.setdefault(key, transition)
+
+    def _initial_state(self, word: Word) -> Union[int, None]:
+        """Return state to start a match at word in, containing only patterns
+        whose first item can match word, or None if no patterns can.
+        """
+        candidates = self.first_token_index.candidates(word)
+        if not candidates:
+            return None
+        state = self._initial_states.get(candidates)
+        if state is None:
+            state = self._get_state(
+                tuple((pattern_i, 0) for pattern_i in candidates))
+            self._initial_states[candidates] = state
+        return state
+
+    def _end_of_sentence(self, state: int) -> Tuple[int, ...]:
+        """Return patterns that match if the sentence ends in given state, i.e.
+        patterns that only have Optional items left.
+        """
+        accepts = self._end_accepts.get(state)
+        if accepts is None:
+            accepts = tuple(
+                pattern_i
+                for pattern_i, item_i in self._state_items[state]
+                if all(optional
+                       for optional, _ in self._compiled[pattern_i][item_i:])
+            )
+            self._end_accepts[state] = accepts
+        return accepts
+
+    ############
+    # MATCHING #
+    ############
+
+    def find_matches(self, words: List[Word]) -> List[Tuple[int, int, int]]:
+        """Find every match of every pattern in words in a single pass.
+        Matches are found independently, so they can overlap.
+
+        Args:
+            words (List[Word]): Sentence to search.
+
+        Returns:
+            List[Tuple[int, int, int]]: List of (start, end, pattern_i) tuples
+                sorted by start then pattern_i.
+        """
+        if not self.compiled:
+            self.compile()
+        matches = []
+        threads = []
+        for i, word in enumerate(words):
+            signature = self.signature(word)
+            initial_state = self._initial_state(word)
+            if initial_state is not None:
+                threads.append((i, initial_state))
+            next_threads = []
+            for start, state in threads:
+                next_state, consumed_accepts, accepts = self._step(
+                    state, signature)
+                for pattern_i in accepts:
+                    matches.append((start, i, pattern_i))
+                for pattern_i in consumed_accepts:
+                    matches.append((start, i + 1, pattern_i))
+                if next_state is not None:
+                    next_threads.append((start, next_state))
+            threads = next_threads
+
+        for start, state in threads:
+            for pattern_i in self._end_of_sentence(state):
+                matches.append((start, len(words), pattern_i))
+
+        return sorted(matches, key=lambda match: (match[0], match[2]))
+
+    def active_patterns(self, word_bank=None) -> List[bool]:
+        """Return list of bools saying which patterns can be used given
+        word_bank, using the same rule as trim_patterns.
+
+        Args:
+            word_bank (Set[str]): Lower case words in procedure. If None all
+                patterns are active.
+
+        Returns:
+            List[bool]: True for every pattern that can be used.
+        """
+        if not self.compiled:
+            self.compile()
+        return self.vocabulary.active(word_bank)
+
+    def apply(
+        self, sentences: List[List[Word]], word_bank=None
+    ) -> List[List[Word]]:
+        """Apply all patterns to sentences, with the same result as calling
+        apply_pattern with every pattern in order.
+
+        Args:
+            sentences (List[List[Word]]): Sentences to find and replace
+                patterns in.
+            word_bank (Set[str]): If given, patterns containing literal words
+                not in word_bank are skipped, as with trim_patterns.
+
+        Returns:
+            List[List[Word]]: Sentences with pattern matches replaced.
+        """
+        active = self.active_patterns(word_bank)
+        for sentence in sentences:
+            self.apply_to_sentence(sentence, active)
+        return sentences
+
+    def apply_to_sentence(
+            self, words: List[Word], active: List[bool] = None) -> bool:
+        """Apply all active patterns to a single sentence in place.
+
+        Args:
+            words (List[Word]): Sentence to find and replace patterns in.
+            active (List[bool]): Patterns to use, from active_patterns. If not
+                given all patterns are used.
+
+        Returns:
+            bool: True if anything in sentence was replaced.
+        """
+        if active is None:
+            active = self.active_patterns()
+        replaced = False
+        first_matches = self._first_matches(words, active, -1)
+        while first_matches:
+            pattern_i = min(first_matches)
+            start = first_matches.pop(pattern_i)
+            pattern, word_class, replace_pos = self.patterns[pattern_i]
+            if apply_pattern_to_sentence(
+                    pattern, word_class, words, replace_pos, start=start):
+                replaced = True
+                first_matches = self._first_matches(words, active, pattern_i)
+        return replaced
+
+    def _first_matches(
+        self, words: List[Word], active: List[bool], after: int
+    ) -> Dict[int, int]:
+        """Return dict of {pattern_i: start of first match} for active
+        patterns with index greater than after that match in words.
+        """
+        first_matches = {}
+        for start, _, pattern_i in self.find_matches(words):
+            if (pattern_i > after
+                    and active[pattern_i]
+                    and pattern_i not in first_matches):
+                first_matches[pattern_i] = start
+        return first_matches
+
+def compile_patterns(
+    patterns: List[Any], word_class: Union[Type[Word], Callable] = None
+) -> PatternSet:
+    """Compile list of patterns into a PatternSet.
+
+    Args:
+        patterns (List[Any]): If word_class is given, list of patterns. If not
+            list of (pattern, word_class) or (pattern, word_class, replace_pos)
+            tuples.
+        word_class (Union[Type[Word], Callable]): Class to instantiate with
+            every pattern match.
+
+    Returns:
+        PatternSet: Compiled patterns, ready to apply to sentences.
+    """
+    if word_class is not None:
+        patterns = [(pattern, word_class) for pattern in patterns]
+    return PatternSet(patterns)
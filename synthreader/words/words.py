@@ -4,7 +4,16 @@ from typing import List
 from ..constants import *
 from ..logging import get_logger
 
+# Matches start of number in str of QuantityWord child words, e.g. '5', '~5'.
+NUMBER_START_REGEX = re.compile(r'[~-]?[0-9]')
+
 class Word(object):
+    # Plain Words are most tokens in a tagged procedure, so they are slotted
+    # to save the per instance dict. used is set on Add action subjects by
+    # action_sanitizer. Subclasses aren't slotted and still get a __dict__ for
+    # their own attributes.
+    __slots__ = ('word', 'words', 'pos', 'used', '__weakref__')
+
     def __init__(self, word, pos_tag=''):
         self.word = word
         self.words = [word]
@@ -16,7 +25,7 @@ class Word(object):
         if hasattr(self, 'word'):
             return self.word
         else:
-            return ' '.join([str(word) for word in self.words])
+            return ' '.join(map(str, self.words))
 
     def update(self):
         self.__init__(self.words)
@@ -162,7 +171,7 @@ class QuantityWord(Word):
         words_to_use = []
         at_num = False
         for word in self.words:
-            if re.match(r'[~-]?[0-9]', str(word)):
+            if NUMBER_START_REGEX.match(str(word)):
                 at_num = True
                 words_to_use.append(word)
             elif at_num:
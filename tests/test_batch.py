@@ -0,0 +1,48 @@
+import json
+
+from synthreader.batch import InputError, iter_text_to_xdl, read_procedures
+
+PROCEDURE = "The mixture was stirred for 2 h and filtered."
+
+
+def write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_procedures_bad_lines(tmp_path):
+    file_path = write_lines(tmp_path / "procedures.jsonl", [
+        json.dumps({"text": PROCEDURE}),
+        "{not json",
+        json.dumps({"procedure": PROCEDURE}),
+        json.dumps({"text": None}),
+        "",
+        json.dumps(PROCEDURE),
+    ])
+    texts = list(read_procedures(file_path))
+    assert len(texts) == 5
+    assert texts[0] == texts[4] == PROCEDURE
+    for text in texts[1:4]:
+        assert isinstance(text, InputError)
+        assert text.error.startswith("input: ")
+
+
+def test_read_procedures_csv_missing_column(tmp_path):
+    file_path = write_lines(
+        tmp_path / "procedures.csv", ["id,procedure", f'0,"{PROCEDURE}"'])
+    texts = list(read_procedures(file_path))
+    assert len(texts) == 1
+    assert isinstance(texts[0], InputError)
+
+
+def test_iter_text_to_xdl_bad_lines(tmp_path):
+    file_path = write_lines(tmp_path / "procedures.jsonl", [
+        "{not json",
+        json.dumps({"procedure": PROCEDURE}),
+        json.dumps({"text": PROCEDURE}),
+    ])
+    results = list(iter_text_to_xdl(file_path, workers=1))
+    assert [result.index for result in results] == [0, 1, 2]
+    assert [result.status for result in results] == ["error", "error", "ok"]
+    assert results[1].error == "input: KeyError: 'text'"
+    assert results[2].xdl is not None
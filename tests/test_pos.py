@@ -0,0 +1,11 @@
+from synthreader.tagging.pos import NLTKBackend
+
+
+def test_pos_tag_sents_cache_cleared():
+    backend = NLTKBackend(cache_size=3)
+    first = backend.pos_tag_sents([["a"], ["b"]])
+    # Cache is full, so it is cleared while ('a',) is part of the batch.
+    second = backend.pos_tag_sents([["a"], ["c"], ["d"]])
+    assert second[0] == first[0]
+    assert [token for token, _ in sum(second, [])] == ["a", "c", "d"]
+    assert backend.pos_tag_sents([["a"], ["c"]]) == second[:2]
@@ -0,0 +1,83 @@
+import json
+import os
+import re
+
+import pytest
+
+from synthreader.tagging.pos import SENTENCE_REPLACEMENTS
+from synthreader.tagging.preprocessing.constants import (
+    HTML_REPLACEMENTS, MISSING_SPACE_REPLACEMENTS, TACTICAL_REPLACEMENTS)
+from synthreader.tagging.preprocessing.rewriter import (
+    Rewriter, get_literal_runs)
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+CORPUS = os.path.join(HERE, "..", "benchmarks", "corpus.jsonl")
+
+PREPROCESS_REPLACEMENTS = (
+    HTML_REPLACEMENTS + MISSING_SPACE_REPLACEMENTS + TACTICAL_REPLACEMENTS)
+
+# Rules using escapes that stand for other characters than the one escaped.
+ESCAPE_REPLACEMENTS = [
+    (r"\x41bc", "abc"),
+    (r"° C", "°C"),
+    (r"\U00000044ef", "def"),
+    (r"\N{DEGREE SIGN}F", " °F"),
+    (r"\0101x", "A1x"),
+    (r"\061\062 h", "twelve h"),
+    (r"(\d)\1 mL", r"\1 mL"),
+]
+
+ESCAPE_TEXTS = [
+    "Abc was added.",
+    "The mixture was heated to 80 ° C.",
+    "Def and Def were stirred.",
+    "Cooled to 0°F.",
+    "\x081x and A1x.",
+    "Stirred for 12 h.",
+    "Water (11 mL) was added.",
+]
+
+
+def apply_in_order(s, replacements):
+    for pattern, replacement in replacements:
+        s = re.sub(pattern, replacement, s)
+    return s
+
+
+@pytest.fixture(scope="module")
+def texts():
+    with open(CORPUS) as fd:
+        procedures = [json.loads(line)["text"] for line in fd if line.strip()]
+    return procedures + [
+        sentence for text in procedures for sentence in text.split(". ")]
+
+
+@pytest.mark.parametrize("pattern, runs", [
+    (r"(^| )([t|T])wenty[ ]", ["wenty"]),
+    (r"wenty\.", ["wenty."]),
+    (r"\x41bc", ["bc"]),
+    (r"\U00000044ef", ["ef"]),
+    (r"\N{DEGREE SIGN}F", ["F"]),
+    (r"a\012b", ["a", "b"]),
+    (r"\101x", ["x"]),
+    (r"(\d)\1 mL", [" mL"]),
+])
+def test_get_literal_runs(pattern, runs):
+    assert get_literal_runs(pattern) == runs
+
+
+@pytest.mark.parametrize("replacements", [
+    PREPROCESS_REPLACEMENTS,
+    SENTENCE_REPLACEMENTS,
+    ESCAPE_REPLACEMENTS,
+])
+def test_rewriter_equivalence(texts, replacements):
+    rewriter = Rewriter(replacements)
+    for text in texts + ESCAPE_TEXTS:
+        assert rewriter.rewrite(text) == apply_in_order(text, replacements)
+
+
+def test_escape_rules_applied():
+    rewriter = Rewriter(ESCAPE_REPLACEMENTS)
+    for text in ESCAPE_TEXTS:
+        assert rewriter.rewrite(text) != text
@@ -0,0 +1,93 @@
+import copy
+import json
+import os
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from synthreader.words import Word
+from synthreader.tagging.preprocessing import preprocess
+from synthreader.tagging.pos import tokenize_and_pos_tag
+from synthreader.tagging.tagger import tag_sentences, tag_sentences_sharded
+from synthreader.tagging.vessels import VESSEL_PATTERN_SET
+from synthreader.utils.pattern_matcher import PatternSet
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+CORPUS = os.path.join(HERE, "..", "benchmarks", "corpus.jsonl")
+
+# Number of random procedures made from corpus sentences.
+N_PROCEDURES = 40
+
+
+def describe(word):
+    """Return comparable description of tagged words: class, text and child
+    words of every word.
+    """
+    if type(word) == list:
+        return [describe(child) for child in word]
+    if type(word) == Word or not hasattr(word, "words"):
+        return (type(word).__name__, str(word))
+    return (type(word).__name__, str(word), describe(word.words))
+
+
+def word_bank(sentences):
+    return {str(word).lower() for sentence in sentences for word in sentence}
+
+
+@pytest.fixture(scope="module")
+def procedures():
+    """Tokenized, POS tagged random procedures of 2 to 10 corpus sentences."""
+    with open(CORPUS) as fd:
+        texts = [json.loads(line)["text"] for line in fd if line.strip()]
+    sentences = [
+        sentence.strip() + "."
+        for text in texts
+        for sentence in text.split(". ")
+        if sentence.strip()
+    ]
+    rng = random.Random(11)
+    return [
+        tokenize_and_pos_tag(
+            preprocess(" ".join(rng.sample(sentences, rng.randint(2, 10)))))
+        for _ in range(N_PROCEDURES)
+    ]
+
+
+@pytest.fixture
+def fast_thread_switching():
+    """Switch threads as often as possible, so races show up."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_pattern_set_threads(procedures, fast_thread_switching):
+    sentences = [sentence for procedure in procedures for sentence in procedure]
+    expected = PatternSet(VESSEL_PATTERN_SET.patterns)
+    expected_matches = [expected.find_matches(words) for words in sentences]
+
+    # Fresh set so threads compile it and build its automaton at the same time.
+    pattern_set = PatternSet(VESSEL_PATTERN_SET.patterns)
+    barrier = threading.Barrier(4)
+
+    def find_matches(_):
+        barrier.wait()
+        return [pattern_set.find_matches(words) for words in sentences]
+
+    with ThreadPoolExecutor(4) as executor:
+        for matches in executor.map(find_matches, range(4)):
+            assert matches == expected_matches
+
+
+def test_tag_sentences_sharded_threads(procedures, fast_thread_switching):
+    with ThreadPoolExecutor(4) as executor:
+        for procedure in procedures:
+            bank = word_bank(procedure)
+            expected = tag_sentences(copy.deepcopy(procedure), bank)
+            tagged = tag_sentences_sharded(
+                copy.deepcopy(procedure), bank, executor, shard_size=2)
+            assert describe(tagged) == describe(expected)